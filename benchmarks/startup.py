@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for PromptPad imports and the CLI
+
+Each target runs in a fresh interpreter, several times; the reported time is
+the median wall time minus the median of a bare ``python -c pass``. Targets
+with a budget fail the run (exit status 1) when they exceed it, and the CLI's
+light commands also fail it when they import any of ``HEAVY_MODULES``, so a
+change that pulls LangChain or asyncio back into a light path is caught even
+on a machine fast enough to stay within budget.
+
+Usage:
+    python benchmarks/startup.py [--runs N] [--budget-scale X] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (name, interpreter arguments, budget in milliseconds or None to only report)
+TARGETS: List[Tuple[str, List[str], Optional[float]]] = [
+    ("import prompt_engine", ["-c", "import prompt_engine"], 50),
+    ("import prompt_engine.core", ["-c", "import prompt_engine.core"], 50),
+    ("import prompt_engine.api", ["-c", "import prompt_engine.api"], 50),
+    ("prompt_engine --help", ["-m", "prompt_engine.cli", "--help"], 100),
+    ("prompt_engine --list-platforms", ["-m", "prompt_engine.cli", "--list-platforms"], 100),
+    ("from prompt_engine.core import PromptPipeline", ["-c", "from prompt_engine.core import PromptPipeline"], None),
+]
+
+# Targets that must not import HEAVY_MODULES
+LIGHT_TARGETS = ("prompt_engine --help", "prompt_engine --list-platforms")
+HEAVY_MODULES = ("asyncio", "langchain_core", "openai", "httpx")
+
+
+def _time_once(args: List[str], env: Dict[str, str]) -> float:
+    """Run the interpreter once and return its wall time in milliseconds."""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, *args], env=env, cwd=ROOT, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return 1000 * (time.perf_counter() - started)
+
+
+def imported_modules(args: List[str], env: Dict[str, str]) -> Set[str]:
+    """
+    List the modules a command imports.
+
+    Args:
+        args: Interpreter arguments
+        env: Environment for the interpreter
+
+    Returns:
+        Fully qualified names of every imported module (from ``-X importtime``)
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", *args], env=env, cwd=ROOT, check=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return {line.rsplit("|", 1)[1].strip() for line in completed.stderr.splitlines() if line.startswith("import time:")}
+
+
+def measure(args: List[str], runs: int, env: Dict[str, str]) -> float:
+    """
+    Measure a command's median wall time.
+
+    Args:
+        args: Interpreter arguments
+        runs: Timed runs (one untimed run warms the filesystem and bytecode caches first)
+        env: Environment for the interpreter
+
+    Returns:
+        Median wall time in milliseconds
+    """
+    _time_once(args, env)
+    return statistics.median(_time_once(args, env) for _ in range(runs))
+
+
+def main() -> None:
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description="Measure PromptPad import and CLI startup time.")
+    parser.add_argument("--runs", type=int, default=10, help="timed runs per target (default: 10)")
+    parser.add_argument("--budget-scale", type=float, default=1.0,
+                        help="multiply every budget, e.g. 2 on slow CI machines (default: 1)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    baseline = measure(["-c", "pass"], args.runs, env)
+    results = []
+    for name, target_args, budget in TARGETS:
+        elapsed = measure(target_args, args.runs, env) - baseline
+        limit = budget * args.budget_scale if budget is not None else None
+        heavy: List[str] = []
+        if name in LIGHT_TARGETS:
+            loaded = imported_modules(target_args, env)
+            heavy = [module for module in HEAVY_MODULES if module in loaded]
+        results.append({
+            "target": name,
+            "ms": round(elapsed, 1),
+            "budgetMs": limit,
+            "heavyImports": heavy,
+            "ok": (limit is None or elapsed <= limit) and not heavy
+        })
+
+    if args.json:
+        print(json.dumps({"baselineMs": round(baseline, 1), "results": results}, indent=2))
+    else:
+        print(f"{'target':<48} {'ms':>8} {'budget':>8}")
+        print(f"{'python -c pass (baseline, subtracted)':<48} {baseline:>8.1f}")
+        for result in results:
+            budget = "-" if result["budgetMs"] is None else f"{result['budgetMs']:.0f}"
+            flag = ""
+            if result["budgetMs"] is not None and result["ms"] > result["budgetMs"]:
+                flag += "  OVER BUDGET"
+            if result["heavyImports"]:
+                flag += "  IMPORTS " + ", ".join(result["heavyImports"])
+            print(f"{result['target']:<48} {result['ms']:>8.1f} {budget:>8}{flag}")
+
+    if not all(result["ok"] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,28 @@
 """
 API layer for PromptPad microservice
+
+The app factories are imported on first access (PEP 562).
 """
 
-from prompt_engine.api.app import create_app
+from importlib import import_module
+from typing import Any
+
+_EXPORTS = {
+    "create_app": "prompt_engine.api.app",
+    "create_asgi_app": "prompt_engine.api.asgi"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    """Import an exported app factory on first access."""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = ["create_app"] 
\ No newline at end of file
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -2,21 +2,58 @@
 Flask application factory and routes for PromptPad API
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
 from prompt_engine.core import PromptPipeline
+from prompt_engine.core.jobs import JobManager
+from prompt_engine.core.limiter import OverloadedError
+from prompt_engine.core.runs import RunInProgressError, RunRegistry, format_sse, parse_event_id
+from prompt_engine.core.runtime import iter_sync, run_sync
+from prompt_engine.core.metrics import (
+    CONTENT_TYPE, HTTP_IN_FLIGHT, HTTP_LATENCY, HTTP_STREAM_DURATION, REGISTRY, SharedMetrics
+)
 from flask import Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from prompt_engine.api.encoding import compress, dumps, negotiate, orjson_available, parse_fields, project
+import json
 import time
+import uuid
+from typing import Any, Optional
 
 
-def create_app() -> Flask:
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider that encodes responses with orjson (keys in insertion order)."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize to a JSON string, using the default encoder when options are passed."""
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj).decode("utf-8")
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """Build a JSON response; debug mode keeps the default pretty-printed output."""
+        if self._app.debug:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
+
+
+def create_app(pipeline: Optional[PromptPipeline] = None, warmup: bool = True) -> Flask:
     """
     Create and configure the Flask application.
 
+    Args:
+        pipeline: Pipeline to serve (a default one is created if omitted)
+        warmup: Open upstream connections now; pass False when the app is
+            built before forking workers, which then call
+            ``app.extensions["promptpad"]["warmup"]`` themselves
+
     Returns:
         Configured Flask application
     """
     app = Flask(__name__)
+    if orjson_available():
+        app.json = FastJSONProvider(app)
 
     # Configure Flask to handle large responses
     app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB limit
@@ -25,7 +62,134 @@ def create_app() -> Flask:
     CORS(app)  # Allow CORS for all routes and all origins
 
     # Initialize the pipeline
-    pipeline = PromptPipeline()
+    pipeline = pipeline or PromptPipeline()
+    settings = pipeline.settings
+    jobs = JobManager(
+        pipeline,
+        workers=settings.jobs_workers,
+        max_pending=settings.jobs_max_pending,
+        ttl_seconds=settings.jobs_ttl_seconds,
+        path=settings.jobs_path or None
+    )
+    runs = RunRegistry(buffer_size=settings.sse_buffer_events, ttl_seconds=settings.sse_run_ttl_seconds)
+    shared_metrics = None
+    if settings.metrics_dir:
+        shared_metrics = SharedMetrics(settings.metrics_dir, REGISTRY, settings.metrics_flush_seconds)
+    readiness = {"ready": False, "draining": False, "drain_started": None}
+
+    def warm_up() -> None:
+        """Open upstream connections and start sharing metrics, then report ready."""
+        pipeline.warmup()
+        if shared_metrics is not None:
+            shared_metrics.start()
+        readiness["ready"] = True
+
+    def start_draining() -> None:
+        """Report not ready so no new traffic is routed here; in-flight requests keep running."""
+        readiness["draining"] = True
+        readiness["drain_started"] = time.monotonic()
+
+    def shutdown() -> None:
+        """Give queued and running jobs what is left of WEB_GRACEFUL_TIMEOUT_SECONDS, then stop."""
+        started = readiness["drain_started"] or time.monotonic()
+        remaining = settings.web_graceful_timeout_seconds - (time.monotonic() - started) - 1.0
+        jobs.shutdown(wait=True, timeout=max(remaining, 0.0))
+        if shared_metrics is not None:
+            shared_metrics.stop()
+
+    app.extensions["promptpad"] = {
+        "pipeline": pipeline,
+        "warmup": warm_up,
+        "drain": start_draining,
+        "shutdown": shutdown
+    }
+    if warmup:
+        warm_up()
+
+    @app.before_request
+    def start_request_metrics():
+        """Start timing the request and count it as in flight."""
+        g.metrics_started = time.perf_counter()
+        g.metrics_route = request.url_rule.rule if request.url_rule else "unmatched"
+        HTTP_IN_FLIGHT.inc(route=g.metrics_route)
+
+    @app.after_request
+    def record_request_metrics(response):
+        """Record request latency; streams stay in flight until the response is closed."""
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return response
+        route = g.metrics_route
+        HTTP_LATENCY.observe(time.perf_counter() - started, method=request.method, route=route,
+                             status=response.status_code)
+        if not response.is_streamed:
+            HTTP_IN_FLIGHT.dec(route=route)
+            return response
+
+        def finish_stream():
+            HTTP_IN_FLIGHT.dec(route=route)
+            HTTP_STREAM_DURATION.observe(time.perf_counter() - started, route=route)
+
+        response.call_on_close(finish_stream)
+        return response
+
+    @app.after_request
+    def compress_response(response):
+        """Compress JSON bodies of at least RESPONSE_COMPRESSION_MIN_BYTES as the client's Accept-Encoding allows."""
+        if (not settings.response_compression_enabled or response.is_streamed or response.direct_passthrough
+                or response.mimetype != "application/json" or "Content-Encoding" in response.headers):
+            return response
+        response.vary.add("Accept-Encoding")
+        body = response.get_data()
+        encoding = negotiate(request.headers.get("Accept-Encoding", ""))
+        if encoding is None or len(body) < settings.response_compression_min_bytes:
+            return response
+        response.set_data(compress(body, encoding))
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    def overloaded(message: str, retry_after: float):
+        """Build a 429 response telling the client when to retry."""
+        response = jsonify({
+            "success": False,
+            "error": message,
+            "code": "OVERLOADED",
+            "retryAfter": retry_after
+        })
+        response.headers["Retry-After"] = str(int(retry_after))
+        return response, 429
+
+    def check_capacity():
+        """Return a 429 response when the upstream wait queue is full, otherwise None."""
+        if pipeline.limiter is None:
+            return None
+        try:
+            pipeline.limiter.check()
+        except OverloadedError as e:
+            return overloaded(str(e), e.retry_after)
+        return None
+
+    def valid_run_id(run_id) -> bool:
+        """Check an optional client-supplied run id (used to resume a failed run)."""
+        return run_id is None or (isinstance(run_id, str) and 0 < len(run_id) <= 128)
+
+    def sse_response(run_id: str, after: Optional[int] = None) -> Response:
+        """Stream a run's events as Server-Sent Events, starting after the given sequence number."""
+        def generate():
+            for seq, event in iter_sync(runs.subscribe(run_id, after)):
+                yield format_sse(run_id, seq, event)
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Run-Id": run_id}
+        )
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """Metrics in the Prometheus text exposition format."""
+        body = shared_metrics.render() if shared_metrics is not None else REGISTRY.render()
+        return Response(body, content_type=CONTENT_TYPE)
 
     @app.route('/health', methods=['GET'])
     def health_check():
@@ -33,9 +197,26 @@ def create_app() -> Flask:
         return jsonify({
             "status": "healthy",
             "service": "promptpad",
-            "version": "1.0.0"
+            "version": "1.0.0",
+            "cache": pipeline.cache.stats() if pipeline.cache else None,
+            "similarity": pipeline.similarity_index.stats() if pipeline.similarity_index else None,
+            "coalescing": pipeline.single_flight.stats() if pipeline.single_flight else None,
+            "limiter": pipeline.limiter.stats() if pipeline.limiter else None,
+            "platforms": pipeline.platforms.stats(),
+            "checkpoints": pipeline.checkpoints.stats() if pipeline.checkpoints else None,
+            "jobs": jobs.stats(),
+            "runs": runs.stats()
         })
 
+    @app.route('/ready', methods=['GET'])
+    def readiness_check():
+        """Readiness probe: 200 once upstream connections are warm, 503 while starting or draining."""
+        if readiness["draining"]:
+            return jsonify({"success": False, "error": "Service is shutting down", "code": "DRAINING"}), 503
+        if not readiness["ready"]:
+            return jsonify({"success": False, "error": "Service is warming up", "code": "NOT_READY"}), 503
+        return jsonify({"status": "ready"})
+
     @app.route('/generate', methods=['POST'])
     def generate_prompt_stream():
         """Stream enhanced prompt optimized for the selected platform."""
@@ -48,8 +229,8 @@ def create_app() -> Flask:
                     "code": "INVALID_JSON"
                 }), 400
 
-            user_input = data.get('input', '').strip()
-            platform_input = data.get('platform', '').strip()
+            user_input = str(data.get('input') or '').strip()
+            platform_input = str(data.get('platform') or '').strip()
 
             if not user_input or not platform_input:
                 return jsonify({
@@ -58,26 +239,74 @@ def create_app() -> Flask:
                     "code": "MISSING_FIELDS"
                 }), 400
 
-            valid_platforms = ["Twitter", "LinkedIn", "YouTube", "Blog", "Email", "ChatGPT", "Cursor"]
-            if platform_input not in valid_platforms:
+            if platform_input not in pipeline.platforms:
                 return jsonify({
                     "success": False,
-                    "error": f"Invalid platform '{platform_input}'. Valid options: {', '.join(valid_platforms)}",
+                    "error": f"Invalid platform '{platform_input}'. Valid options: {', '.join(pipeline.platforms.names())}",
                     "code": "INVALID_PLATFORM"
                 }), 400
 
+            depth = data.get('depth') or pipeline.settings.pipeline_depth
+            if not isinstance(depth, str) or depth not in PromptPipeline.PROFILES:
+                return jsonify({
+                    "success": False,
+                    "error": f"Invalid depth '{depth}'. Valid options: {', '.join(PromptPipeline.PROFILES)}",
+                    "code": "INVALID_DEPTH"
+                }), 400
+
+            stream_mode = data.get('stream', 'text')
+            if stream_mode not in ("text", "events", "sse"):
+                return jsonify({
+                    "success": False,
+                    "error": "Invalid 'stream' mode. Valid options: text, events, sse",
+                    "code": "INVALID_STREAM_MODE"
+                }), 400
+
+            run_id = data.get('runId')
+            if not valid_run_id(run_id):
+                return jsonify({
+                    "success": False,
+                    "error": "'runId' must be a string of 1 to 128 characters",
+                    "code": "INVALID_RUN_ID"
+                }), 400
+
+            rejected = check_capacity()
+            if rejected:
+                return rejected
+
+            if stream_mode == "sse":
+                run_id = run_id or uuid.uuid4().hex
+                try:
+                    run_sync(runs.astart(pipeline.astream_events(user_input, platform_input, depth, run_id=run_id),
+                                         run_id))
+                except RunInProgressError as e:
+                    return jsonify({
+                        "success": False,
+                        "error": str(e),
+                        "code": "RUN_IN_PROGRESS"
+                    }), 409
+                return sse_response(run_id)
+
             def generate():
                 try:
-                    for chunk in pipeline.stream(user_input, platform_input):
-                        yield chunk
-                        time.sleep(0.05)
+                    if stream_mode == "events":
+                        for event in pipeline.stream_events(user_input, platform_input, depth, run_id=run_id):
+                            yield json.dumps(event, ensure_ascii=False) + "\n"
+                    else:
+                        for chunk in pipeline.stream(user_input, platform_input, depth, run_id):
+                            yield chunk
                 except ValueError as e:
                     # Handle validation errors from pipeline
                     yield f"Error: {str(e)}\n"
                 except Exception as e:
                     yield f"Error: Internal server error - {str(e)}\n"
 
-            return Response(stream_with_context(generate()), mimetype='text/plain')
+            mimetype = 'application/x-ndjson' if stream_mode == "events" else 'text/plain'
+            return Response(
+                stream_with_context(generate()),
+                mimetype=mimetype,
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
 
         except Exception as e:
             return jsonify({
@@ -109,8 +338,8 @@ def create_app() -> Flask:
                     "error": "Missing 'platform' field in request body"
                 }), 400
 
-            user_input = data['input'].strip()
-            platform_input = data['platform'].strip()
+            user_input = str(data['input']).strip()
+            platform_input = str(data['platform']).strip()
 
             if not user_input:
                 return jsonify({
@@ -124,18 +353,47 @@ def create_app() -> Flask:
                     "error": "Platform cannot be empty"
                 }), 400
 
-            valid_platforms = ["Twitter", "LinkedIn", "YouTube", "Blog", "Email", "ChatGPT", "Cursor"]
-            if platform_input not in valid_platforms:
+            if platform_input not in pipeline.platforms:
                 return jsonify({
                     "success": False,
-                    "error": f"Invalid platform. Valid options are: {', '.join(valid_platforms)}"
+                    "error": f"Invalid platform. Valid options are: {', '.join(pipeline.platforms.names())}",
+                    "code": "INVALID_PLATFORM"
+                }), 400
+
+            depth = data.get('depth') or pipeline.settings.pipeline_depth
+            if not isinstance(depth, str) or depth not in PromptPipeline.PROFILES:
+                return jsonify({
+                    "success": False,
+                    "error": f"Invalid depth. Valid options are: {', '.join(PromptPipeline.PROFILES)}",
+                    "code": "INVALID_DEPTH"
+                }), 400
+
+            if not valid_run_id(data.get('runId')):
+                return jsonify({
+                    "success": False,
+                    "error": "'runId' must be a string of 1 to 128 characters"
+                }), 400
+
+            try:
+                fields = parse_fields(data.get('fields', request.args.get('fields')))
+            except ValueError as e:
+                return jsonify({
+                    "success": False,
+                    "error": str(e),
+                    "code": "INVALID_FIELDS"
                 }), 400
 
             # Generate the enhanced prompt
-            result = pipeline.run(user_input, platform_input)
+            rejected = check_capacity()
+            if rejected:
+                return rejected
+
+            result = pipeline.run(user_input, platform_input, depth, data.get('runId'))
 
             if result['success']:
-                return jsonify(result), 200
+                return jsonify(project(result, fields)), 200
+            elif result.get('code') == "OVERLOADED":
+                return overloaded(result['error'], result['retryAfter'])
             else:
                 return jsonify(result), 500
 
@@ -145,6 +403,241 @@ def create_app() -> Flask:
                 "error": f"Internal server error: {str(e)}"
             }), 500
 
+    @app.route('/generate-batch', methods=['POST'])
+    def generate_batch():
+        """Generate prompts for many inputs, optionally streaming NDJSON results as they complete."""
+        try:
+            data = request.get_json()
+            if not data:
+                return jsonify({
+                    "success": False,
+                    "error": "Request body must be valid JSON",
+                    "code": "INVALID_JSON"
+                }), 400
+
+            items = data.get('items')
+            if not isinstance(items, list) or not items:
+                return jsonify({
+                    "success": False,
+                    "error": "'items' must be a non-empty list of {input, platform} objects",
+                    "code": "MISSING_FIELDS"
+                }), 400
+
+            max_items = pipeline.settings.batch_max_items
+            if len(items) > max_items:
+                return jsonify({
+                    "success": False,
+                    "error": f"Batch too large: {len(items)} items (maximum {max_items})",
+                    "code": "BATCH_TOO_LARGE"
+                }), 400
+
+            max_concurrency = data.get('maxConcurrency')
+            if max_concurrency is not None and (not isinstance(max_concurrency, int) or max_concurrency < 1):
+                return jsonify({
+                    "success": False,
+                    "error": "'maxConcurrency' must be a positive integer",
+                    "code": "INVALID_CONCURRENCY"
+                }), 400
+
+            rejected = check_capacity()
+            if rejected:
+                return rejected
+
+            if data.get('stream'):
+                def generate():
+                    for result in pipeline.stream_batch(items, max_concurrency):
+                        yield json.dumps(result, ensure_ascii=False) + "\n"
+
+                return Response(
+                    stream_with_context(generate()),
+                    mimetype='application/x-ndjson',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+                )
+
+            results = pipeline.run_batch(items, max_concurrency)
+            succeeded = sum(1 for result in results if result.get("success"))
+            return jsonify({
+                "success": True,
+                "total": len(results),
+                "succeeded": succeeded,
+                "failed": len(results) - succeeded,
+                "results": results
+            }), 200
+
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": f"Internal server error: {str(e)}",
+                "code": "INTERNAL_ERROR"
+            }), 500
+
+    @app.route('/generate-multi', methods=['POST'])
+    def generate_multi():
+        """Generate prompts for one input on several platforms, sharing the platform-independent stages."""
+        try:
+            data = request.get_json()
+            if not data:
+                return jsonify({
+                    "success": False,
+                    "error": "Request body must be valid JSON",
+                    "code": "INVALID_JSON"
+                }), 400
+
+            user_input = str(data.get('input') or '').strip()
+            platforms = data.get('platforms')
+            if not user_input or not isinstance(platforms, list) or not platforms:
+                return jsonify({
+                    "success": False,
+                    "error": "'input' and a non-empty 'platforms' list are required",
+                    "code": "MISSING_FIELDS"
+                }), 400
+
+            invalid = [platform for platform in platforms
+                       if not isinstance(platform, str) or platform not in pipeline.platforms]
+            if invalid:
+                return jsonify({
+                    "success": False,
+                    "error": f"Invalid platform(s) {', '.join(map(str, invalid))}. "
+                             f"Valid options are: {', '.join(pipeline.platforms.names())}",
+                    "code": "INVALID_PLATFORM"
+                }), 400
+
+            depth = data.get('depth') or pipeline.settings.pipeline_depth
+            if not isinstance(depth, str) or depth not in PromptPipeline.PROFILES:
+                return jsonify({
+                    "success": False,
+                    "error": f"Invalid depth. Valid options are: {', '.join(PromptPipeline.PROFILES)}",
+                    "code": "INVALID_DEPTH"
+                }), 400
+
+            try:
+                fields = parse_fields(data.get('fields', request.args.get('fields')))
+            except ValueError as e:
+                return jsonify({
+                    "success": False,
+                    "error": str(e),
+                    "code": "INVALID_FIELDS"
+                }), 400
+            if fields is not None:
+                fields += ("platform",)
+
+            rejected = check_capacity()
+            if rejected:
+                return rejected
+
+            if data.get('stream'):
+                def generate():
+                    for result in pipeline.stream_multi(user_input, platforms, depth):
+                        yield json.dumps(project(result, fields), ensure_ascii=False) + "\n"
+
+                return Response(
+                    stream_with_context(generate()),
+                    mimetype='application/x-ndjson',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+                )
+
+            response = pipeline.run_multi(user_input, platforms, depth)
+            response["results"] = {
+                platform: project(result, fields) for platform, result in response["results"].items()
+            }
+            return jsonify(response), 200
+
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": f"Internal server error: {str(e)}",
+                "code": "INTERNAL_ERROR"
+            }), 500
+
+    @app.route('/jobs', methods=['POST'])
+    def submit_job():
+        """Queue a pipeline run and return its job id immediately."""
+        try:
+            data = request.get_json(silent=True)
+            if not data:
+                return jsonify({
+                    "success": False,
+                    "error": "Request body must be valid JSON",
+                    "code": "INVALID_JSON"
+                }), 400
+
+            user_input = str(data.get('input') or '').strip()
+            platform_input = str(data.get('platform') or '').strip()
+            if not user_input or not platform_input:
+                return jsonify({
+                    "success": False,
+                    "error": "Missing or empty 'input' or 'platform'",
+                    "code": "MISSING_FIELDS"
+                }), 400
+
+            if platform_input not in pipeline.platforms:
+                return jsonify({
+                    "success": False,
+                    "error": f"Invalid platform '{platform_input}'. Valid options: {', '.join(pipeline.platforms.names())}",
+                    "code": "INVALID_PLATFORM"
+                }), 400
+
+            depth = data.get('depth') or settings.pipeline_depth
+            if not isinstance(depth, str) or depth not in PromptPipeline.PROFILES:
+                return jsonify({
+                    "success": False,
+                    "error": f"Invalid depth '{depth}'. Valid options: {', '.join(PromptPipeline.PROFILES)}",
+                    "code": "INVALID_DEPTH"
+                }), 400
+
+            rejected = check_capacity()
+            if rejected:
+                return rejected
+
+            try:
+                job = jobs.submit(user_input, platform_input, depth)
+            except OverloadedError as e:
+                return overloaded(str(e), e.retry_after)
+
+            response = jsonify({"success": True, **job.to_dict()})
+            response.headers["Location"] = f"/jobs/{job.id}"
+            return response, 202
+
+        except Exception as e:
+            return jsonify({
+                "success": False,
+                "error": f"Internal server error: {str(e)}",
+                "code": "INTERNAL_ERROR"
+            }), 500
+
+    @app.route('/jobs/<job_id>', methods=['GET'])
+    def get_job(job_id: str):
+        """Return a job's status and progress, long-polling up to ?wait= seconds for it to finish."""
+        try:
+            wait = float(request.args.get('wait', 0))
+        except ValueError:
+            return jsonify({
+                "success": False,
+                "error": "'wait' must be a number of seconds",
+                "code": "INVALID_WAIT"
+            }), 400
+
+        job = jobs.wait(job_id, min(max(wait, 0.0), settings.jobs_max_wait_seconds))
+        if job is None:
+            return jsonify({
+                "success": False,
+                "error": f"Job '{job_id}' not found or expired",
+                "code": "JOB_NOT_FOUND"
+            }), 404
+        return jsonify({"success": True, **job.to_dict()}), 200
+
+    @app.route('/runs/<run_id>/events', methods=['GET'])
+    def resume_run(run_id: str):
+        """Resume a run's Server-Sent Events after the client's Last-Event-ID."""
+        if runs.get(run_id) is None:
+            return jsonify({
+                "success": False,
+                "error": f"Run '{run_id}' not found or expired",
+                "code": "RUN_NOT_FOUND"
+            }), 404
+        last = parse_event_id(request.headers.get('Last-Event-ID') or request.args.get('lastEventId'))
+        return sse_response(run_id, last[1] if last and last[0] == run_id else None)
+
     @app.route('/', methods=['GET'])
     def root():
         """Root endpoint with API documentation."""
@@ -155,18 +648,57 @@ def create_app() -> Flask:
             "endpoints": {
                 "GET /": "API documentation",
                 "GET /health": "Health check",
-                "POST /generate": "Generate full prompt with all stages"
+                "GET /ready": "Readiness probe (503 until warmed up and while shutting down)",
+                "GET /metrics": "Prometheus metrics (stage latency, tokens, cache, HTTP)",
+                "POST /generate": "Generate full prompt with all stages",
+                "POST /generate-full": "Generate a prompt and return every stage's output as JSON (fields= to select)",
+                "POST /generate-batch": "Generate prompts for many inputs with bounded concurrency",
+                "POST /generate-multi": "Generate prompts for one input on several platforms, sharing the context analysis",
+                "POST /jobs": "Queue a pipeline run and return its job id",
+                "GET /jobs/<id>": "Job status, stage progress and result (?wait=seconds to long-poll)",
+                "GET /runs/<id>/events": "Resume a stream=sse run after its Last-Event-ID"
             },
             "usage": {
                 "POST /generate": {
                     "body": {
                         "input": "your prompt or instruction",
-                        "platform": "Twitter | LinkedIn | YouTube | Blog | Email | ChatGPT | Cursor (required)"
+                        "platform": " | ".join(pipeline.platforms.names()) + " (required)",
+                        "stream": "text (default) | events (NDJSON stage/token events) | sse (resumable Server-Sent Events)",
+                        "depth": "full (5 LLM calls) | balanced (3) | fast (2) (optional)",
+                        "runId": "id of a failed run to resume after its last completed stage (optional)"
                     },
                     "response": {
                         "success": True,
                         "output": "Enhanced prompt optimized for the selected platform"
                     }
+                },
+                "POST /generate-batch": {
+                    "body": {
+                        "items": "[{input, platform, depth?, id?}, ...]",
+                        "maxConcurrency": "items in flight (optional)",
+                        "stream": "true for NDJSON results in completion order (optional)"
+                    }
+                },
+                "POST /generate-multi": {
+                    "body": {
+                        "input": "your prompt or instruction",
+                        "platforms": "[" + ", ".join(pipeline.platforms.names()) + "] (one or more)",
+                        "depth": "full | balanced | fast (optional)",
+                        "stream": "true for NDJSON results as each platform finishes (optional)",
+                        "fields": "result fields to return, e.g. [\"prompt\"] (optional)"
+                    }
+                },
+                "POST /jobs": {
+                    "body": {
+                        "input": "your prompt or instruction",
+                        "platform": " | ".join(pipeline.platforms.names()) + " (required)",
+                        "depth": "full | balanced | fast (optional)"
+                    },
+                    "response": {
+                        "success": True,
+                        "jobId": "id to poll with GET /jobs/<id>",
+                        "status": "queued"
+                    }
                 }
             }
         })
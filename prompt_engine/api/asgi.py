@@ -0,0 +1,587 @@
+"""
+Native ASGI application for serving the async PromptPad pipeline
+
+Run with an ASGI server, for example:
+
+    uvicorn --factory prompt_engine.api.asgi:create_asgi_app --port 5000
+
+Each request is a coroutine on the server's event loop rather than a
+dedicated OS thread, so one worker can keep many pipelines in flight.
+"""
+
+import asyncio
+import json
+import re
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from prompt_engine.api.encoding import compress, dumps, negotiate, parse_fields, project
+from prompt_engine.core import PromptPipeline
+from prompt_engine.core.jobs import JobManager
+from prompt_engine.core.limiter import OverloadedError
+from prompt_engine.core.metrics import (
+    CONTENT_TYPE, HTTP_IN_FLIGHT, HTTP_LATENCY, HTTP_STREAM_DURATION, REGISTRY, SharedMetrics
+)
+from prompt_engine.core.platform_registry import PlatformRegistry
+from prompt_engine.core.runs import RunInProgressError, RunRegistry, format_sse, parse_event_id
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50MB limit, matches the Flask app
+
+_RUN_EVENTS_PATH = re.compile(r"^/runs/([^/]+)/events$")
+_JOB_PATH = re.compile(r"^/jobs/([^/]+)$")
+
+
+class _RequestError(Exception):
+    """Raised when a request body fails validation."""
+
+    def __init__(self, payload: Dict[str, Any], status: int = 400, headers: Optional[Dict[str, str]] = None):
+        super().__init__(payload.get("error"))
+        self.payload = payload
+        self.status = status
+        self.headers = headers or {}
+
+
+async def _read_body(receive: Receive) -> bytes:
+    """Read the full request body from the ASGI receive channel."""
+    body = b""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        body += message.get("body", b"")
+        if len(body) > MAX_CONTENT_LENGTH:
+            raise _RequestError({"success": False, "error": "Request body too large", "code": "PAYLOAD_TOO_LARGE"}, 413)
+        if not message.get("more_body", False):
+            break
+    return body
+
+
+async def _send_json(send: Send, payload: Dict[str, Any], status: int = 200,
+                     headers: Optional[Dict[str, str]] = None, encoding: Optional[str] = None,
+                     min_compress_bytes: int = 0) -> None:
+    """Send a complete JSON response, compressed with ``encoding`` when the body has at least ``min_compress_bytes``."""
+    body = dumps(payload)
+    if encoding is not None and len(body) >= min_compress_bytes:
+        body = compress(body, encoding)
+        headers = {**(headers or {}), "Content-Encoding": encoding}
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+            (b"access-control-allow-origin", b"*"),
+        ] + [(name.lower().encode("ascii"), value.encode("ascii")) for name, value in (headers or {}).items()],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _ndjson(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Encode pipeline events or results as newline-delimited JSON."""
+    try:
+        async for event in events:
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+    finally:
+        await events.aclose()
+
+
+async def _send_stream(send: Send, chunks: AsyncIterator[str], content_type: bytes = b"text/plain; charset=utf-8",
+                       headers: Optional[Dict[str, str]] = None) -> None:
+    """Send a chunked streaming response, closing the source on exit."""
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [
+            (b"content-type", content_type),
+            (b"cache-control", b"no-cache"),
+            (b"x-accel-buffering", b"no"),
+            (b"access-control-allow-origin", b"*"),
+        ] + [(name.lower().encode("ascii"), value.encode("ascii")) for name, value in (headers or {}).items()],
+    })
+    try:
+        async for chunk in chunks:
+            await send({"type": "http.response.body", "body": chunk.encode("utf-8"), "more_body": True})
+    finally:
+        await chunks.aclose()
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _sse(run_id: str, events: AsyncIterator[Tuple[int, Dict[str, Any]]]) -> AsyncIterator[str]:
+    """Encode a run's numbered events as Server-Sent Events."""
+    try:
+        async for seq, event in events:
+            yield format_sse(run_id, seq, event)
+    finally:
+        await events.aclose()
+
+
+def _header(scope: Scope, header: bytes) -> Optional[str]:
+    """Return a request header (lowercase name), or None when absent."""
+    for name, value in scope.get("headers", []):
+        if name.lower() == header:
+            return value.decode("latin-1")
+    return None
+
+
+def _query_param(scope: Scope, name: str) -> Optional[str]:
+    """Return a query string parameter, or None when absent."""
+    values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get(name)
+    return values[0] if values else None
+
+
+def _last_event_id(scope: Scope) -> Optional[str]:
+    """Return the request's Last-Event-ID header, or its lastEventId query parameter."""
+    last_event_id = _header(scope, b"last-event-id")
+    return last_event_id if last_event_id is not None else _query_param(scope, "lastEventId")
+
+
+def _parse_fields(scope: Scope, data: Dict[str, Any]) -> Optional[Tuple[str, ...]]:
+    """
+    Read the ``fields`` projection from the request body or query string.
+
+    Args:
+        scope: The request scope
+        data: The parsed request body (its ``fields`` takes precedence)
+
+    Returns:
+        The selected result fields, or None for all
+
+    Raises:
+        _RequestError: If the projection names an unknown field
+    """
+    try:
+        return parse_fields(data.get("fields", _query_param(scope, "fields")))
+    except ValueError as e:
+        raise _RequestError({"success": False, "error": str(e), "code": "INVALID_FIELDS"})
+
+
+def _parse_generate_request(body: bytes, platforms: PlatformRegistry) -> Tuple[str, str, Dict[str, Any]]:
+    """
+    Validate a generation request body.
+
+    Args:
+        body: Raw request body
+        platforms: Registry of supported platforms
+
+    Returns:
+        Tuple of (user_input, platform, parsed body)
+
+    Raises:
+        _RequestError: If the body is missing fields, names an unknown platform or profile, or has a malformed runId
+    """
+    try:
+        data = json.loads(body) if body else None
+    except ValueError:
+        data = None
+    if not isinstance(data, dict) or not data:
+        raise _RequestError({"success": False, "error": "Request body must be valid JSON", "code": "INVALID_JSON"})
+
+    user_input = str(data.get("input") or "").strip()
+    platform_input = str(data.get("platform") or "").strip()
+    if not user_input or not platform_input:
+        raise _RequestError({"success": False, "error": "Missing or empty 'input' or 'platform'", "code": "MISSING_FIELDS"})
+
+    if platform_input not in platforms:
+        raise _RequestError({
+            "success": False,
+            "error": f"Invalid platform '{platform_input}'. Valid options: {', '.join(platforms.names())}",
+            "code": "INVALID_PLATFORM"
+        })
+    depth = data.get("depth")
+    if depth is not None and (not isinstance(depth, str) or depth not in PromptPipeline.PROFILES):
+        raise _RequestError({
+            "success": False,
+            "error": f"Invalid depth '{depth}'. Valid options: {', '.join(PromptPipeline.PROFILES)}",
+            "code": "INVALID_DEPTH"
+        })
+    run_id = data.get("runId")
+    if run_id is not None and not (isinstance(run_id, str) and 0 < len(run_id) <= 128):
+        raise _RequestError({
+            "success": False,
+            "error": "'runId' must be a string of 1 to 128 characters",
+            "code": "INVALID_RUN_ID"
+        })
+    return user_input, platform_input, data
+
+
+def _overloaded(message: str, retry_after: float) -> _RequestError:
+    """Build the 429 error telling the client when to retry."""
+    return _RequestError(
+        {"success": False, "error": message, "code": "OVERLOADED", "retryAfter": retry_after},
+        429,
+        {"Retry-After": str(int(retry_after))}
+    )
+
+
+def _parse_batch_request(body: bytes, max_items: int) -> Dict[str, Any]:
+    """
+    Validate a batch generation request body.
+
+    Args:
+        body: Raw request body
+        max_items: Largest accepted batch
+
+    Returns:
+        The parsed body
+
+    Raises:
+        _RequestError: If the items list or concurrency limit is invalid
+    """
+    try:
+        data = json.loads(body) if body else None
+    except ValueError:
+        data = None
+    if not isinstance(data, dict) or not data:
+        raise _RequestError({"success": False, "error": "Request body must be valid JSON", "code": "INVALID_JSON"})
+
+    items = data.get("items")
+    if not isinstance(items, list) or not items:
+        raise _RequestError({
+            "success": False,
+            "error": "'items' must be a non-empty list of {input, platform} objects",
+            "code": "MISSING_FIELDS"
+        })
+    if len(items) > max_items:
+        raise _RequestError({
+            "success": False,
+            "error": f"Batch too large: {len(items)} items (maximum {max_items})",
+            "code": "BATCH_TOO_LARGE"
+        })
+
+    max_concurrency = data.get("maxConcurrency")
+    if max_concurrency is not None and (not isinstance(max_concurrency, int) or max_concurrency < 1):
+        raise _RequestError({
+            "success": False,
+            "error": "'maxConcurrency' must be a positive integer",
+            "code": "INVALID_CONCURRENCY"
+        })
+    return data
+
+
+def _parse_multi_request(body: bytes, platforms: PlatformRegistry) -> Tuple[str, List[str], Dict[str, Any]]:
+    """
+    Validate a multi-platform generation request body.
+
+    Args:
+        body: Raw request body
+        platforms: Registry of supported platforms
+
+    Returns:
+        Tuple of (user_input, target platforms, parsed body)
+
+    Raises:
+        _RequestError: If the input or platforms list is missing, or names an unknown platform or profile
+    """
+    try:
+        data = json.loads(body) if body else None
+    except ValueError:
+        data = None
+    if not isinstance(data, dict) or not data:
+        raise _RequestError({"success": False, "error": "Request body must be valid JSON", "code": "INVALID_JSON"})
+
+    user_input = str(data.get("input") or "").strip()
+    targets = data.get("platforms")
+    if not user_input or not isinstance(targets, list) or not targets:
+        raise _RequestError({
+            "success": False,
+            "error": "'input' and a non-empty 'platforms' list are required",
+            "code": "MISSING_FIELDS"
+        })
+    invalid = [platform for platform in targets if not isinstance(platform, str) or platform not in platforms]
+    if invalid:
+        raise _RequestError({
+            "success": False,
+            "error": f"Invalid platform(s) {', '.join(map(str, invalid))}. Valid options: {', '.join(platforms.names())}",
+            "code": "INVALID_PLATFORM"
+        })
+    depth = data.get("depth")
+    if depth is not None and (not isinstance(depth, str) or depth not in PromptPipeline.PROFILES):
+        raise _RequestError({
+            "success": False,
+            "error": f"Invalid depth '{depth}'. Valid options: {', '.join(PromptPipeline.PROFILES)}",
+            "code": "INVALID_DEPTH"
+        })
+    return user_input, targets, data
+
+
+def create_asgi_app(pipeline: Optional[PromptPipeline] = None) -> ASGIApp:
+    """
+    Create the ASGI application.
+
+    Args:
+        pipeline: Pipeline to serve (a default one is created if omitted)
+
+    Returns:
+        ASGI application callable
+    """
+    pipeline = pipeline or PromptPipeline()
+    runs = RunRegistry(
+        buffer_size=pipeline.settings.sse_buffer_events,
+        ttl_seconds=pipeline.settings.sse_run_ttl_seconds
+    )
+    readiness = {"ready": False}
+    settings = pipeline.settings
+    jobs = JobManager(
+        pipeline,
+        workers=settings.jobs_workers,
+        max_pending=settings.jobs_max_pending,
+        ttl_seconds=settings.jobs_ttl_seconds,
+        path=settings.jobs_path or None
+    )
+    shared_metrics = None
+    if settings.metrics_dir:
+        shared_metrics = SharedMetrics(settings.metrics_dir, REGISTRY, settings.metrics_flush_seconds)
+
+    async def send_result(scope: Scope, send: Send, payload: Dict[str, Any], status: int = 200) -> None:
+        """Send a JSON result, compressed as the client's Accept-Encoding allows (RESPONSE_COMPRESSION_*)."""
+        if not settings.response_compression_enabled:
+            await _send_json(send, payload, status)
+            return
+        await _send_json(send, payload, status, {"Vary": "Accept-Encoding"},
+                         negotiate(_header(scope, b"accept-encoding") or ""),
+                         settings.response_compression_min_bytes)
+
+    def check_capacity() -> None:
+        """Reject the request with a 429 when the upstream wait queue is full."""
+        if pipeline.limiter is None:
+            return
+        try:
+            pipeline.limiter.check()
+        except OverloadedError as e:
+            raise _overloaded(str(e), e.retry_after)
+
+    async def health(scope: Scope, receive: Receive, send: Send) -> None:
+        await _send_json(send, {"status": "healthy", "service": "promptpad", "version": "1.0.0"})
+
+    async def ready(scope: Scope, receive: Receive, send: Send) -> None:
+        if not readiness["ready"]:
+            await _send_json(send, {"success": False, "error": "Service is warming up", "code": "NOT_READY"}, 503)
+            return
+        await _send_json(send, {"status": "ready"})
+
+    async def metrics(scope: Scope, receive: Receive, send: Send) -> None:
+        text = shared_metrics.render() if shared_metrics is not None else REGISTRY.render()
+        body = text.encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", CONTENT_TYPE.encode("ascii")),
+                (b"content-length", str(len(body)).encode("ascii")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def generate_stream(scope: Scope, receive: Receive, send: Send) -> None:
+        user_input, platform_input, data = _parse_generate_request(await _read_body(receive), pipeline.platforms)
+        check_capacity()
+        stream_mode = data.get("stream", "text")
+        depth, run_id = data.get("depth"), data.get("runId")
+        if stream_mode == "events":
+            await _send_stream(send, _ndjson(pipeline.astream_events(user_input, platform_input, depth, run_id=run_id)),
+                               b"application/x-ndjson")
+        elif stream_mode == "text":
+            await _send_stream(send, pipeline.astream(user_input, platform_input, depth, run_id))
+        elif stream_mode == "sse":
+            run_id = run_id or uuid.uuid4().hex
+            try:
+                await runs.astart(pipeline.astream_events(user_input, platform_input, depth, run_id=run_id), run_id)
+            except RunInProgressError as e:
+                raise _RequestError({"success": False, "error": str(e), "code": "RUN_IN_PROGRESS"}, 409)
+            await _send_stream(send, _sse(run_id, runs.subscribe(run_id)), b"text/event-stream",
+                               {"X-Run-Id": run_id})
+        else:
+            raise _RequestError({
+                "success": False,
+                "error": "Invalid 'stream' mode. Valid options: text, events, sse",
+                "code": "INVALID_STREAM_MODE"
+            })
+
+    async def generate_full(scope: Scope, receive: Receive, send: Send) -> None:
+        user_input, platform_input, data = _parse_generate_request(await _read_body(receive), pipeline.platforms)
+        fields = _parse_fields(scope, data)
+        check_capacity()
+        result = await pipeline.arun(user_input, platform_input, data.get("depth"), data.get("runId"))
+        if result.get("code") == "OVERLOADED":
+            raise _overloaded(result["error"], result["retryAfter"])
+        await send_result(scope, send, project(result, fields), 200 if result["success"] else 500)
+
+    async def generate_batch(scope: Scope, receive: Receive, send: Send) -> None:
+        data = _parse_batch_request(await _read_body(receive), pipeline.settings.batch_max_items)
+        check_capacity()
+        items, max_concurrency = data["items"], data.get("maxConcurrency")
+        if data.get("stream"):
+            await _send_stream(send, _ndjson(pipeline.astream_batch(items, max_concurrency)), b"application/x-ndjson")
+            return
+        results = await pipeline.arun_batch(items, max_concurrency)
+        succeeded = sum(1 for result in results if result.get("success"))
+        await send_result(scope, send, {
+            "success": True,
+            "total": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "results": results
+        })
+
+    async def generate_multi(scope: Scope, receive: Receive, send: Send) -> None:
+        user_input, targets, data = _parse_multi_request(await _read_body(receive), pipeline.platforms)
+        fields = _parse_fields(scope, data)
+        if fields is not None:
+            fields += ("platform",)
+        check_capacity()
+        if data.get("stream"):
+            async def projected() -> AsyncIterator[Dict[str, Any]]:
+                results = pipeline.astream_multi(user_input, targets, data.get("depth"))
+                try:
+                    async for result in results:
+                        yield project(result, fields)
+                finally:
+                    await results.aclose()
+
+            await _send_stream(send, _ndjson(projected()), b"application/x-ndjson")
+            return
+        response = await pipeline.arun_multi(user_input, targets, data.get("depth"))
+        response["results"] = {platform: project(result, fields) for platform, result in response["results"].items()}
+        await send_result(scope, send, response)
+
+    async def submit_job(scope: Scope, receive: Receive, send: Send) -> None:
+        user_input, platform_input, data = _parse_generate_request(await _read_body(receive), pipeline.platforms)
+        check_capacity()
+        try:
+            # Runs on this loop, which owns the pipeline's async HTTP client
+            job = await jobs.asubmit(user_input, platform_input, data.get("depth"))
+        except OverloadedError as e:
+            raise _overloaded(str(e), e.retry_after)
+        await _send_json(send, {"success": True, **job.to_dict()}, 202, {"Location": f"/jobs/{job.id}"})
+
+    async def get_job(scope: Scope, receive: Receive, send: Send) -> None:
+        job_id = _JOB_PATH.match(scope["path"]).group(1)
+        try:
+            wait = min(max(float(_query_param(scope, "wait") or 0), 0.0), settings.jobs_max_wait_seconds)
+        except ValueError:
+            raise _RequestError({"success": False, "error": "'wait' must be a number of seconds", "code": "INVALID_WAIT"})
+        # Long-poll by re-reading the job rather than blocking a thread for the whole wait
+        deadline = time.monotonic() + wait
+        job = await asyncio.to_thread(jobs.get, job_id)
+        while job is not None and not job.done.is_set() and time.monotonic() < deadline:
+            await asyncio.sleep(min(jobs.poll_interval, max(deadline - time.monotonic(), 0.0)))
+            job = await asyncio.to_thread(jobs.get, job_id)
+        if job is None:
+            raise _RequestError({
+                "success": False,
+                "error": f"Job '{job_id}' not found or expired",
+                "code": "JOB_NOT_FOUND"
+            }, 404)
+        await _send_json(send, {"success": True, **job.to_dict()})
+
+    async def resume_run(scope: Scope, receive: Receive, send: Send) -> None:
+        run_id = _RUN_EVENTS_PATH.match(scope["path"]).group(1)
+        if runs.get(run_id) is None:
+            raise _RequestError({
+                "success": False,
+                "error": f"Run '{run_id}' not found or expired",
+                "code": "RUN_NOT_FOUND"
+            }, 404)
+        last = parse_event_id(_last_event_id(scope))
+        after = last[1] if last and last[0] == run_id else None
+        await _send_stream(send, _sse(run_id, runs.subscribe(run_id, after)), b"text/event-stream",
+                           {"X-Run-Id": run_id})
+
+    routes = {
+        ("GET", "/health"): health,
+        ("GET", "/ready"): ready,
+        ("GET", "/metrics"): metrics,
+        ("POST", "/generate"): generate_stream,
+        ("POST", "/generate-full"): generate_full,
+        ("POST", "/generate-batch"): generate_batch,
+        ("POST", "/generate-multi"): generate_multi,
+        ("POST", "/jobs"): submit_job,
+    }
+
+    async def lifespan(receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await pipeline.awarmup()
+                if shared_metrics is not None:
+                    shared_metrics.start()
+                readiness["ready"] = True
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                readiness["ready"] = False
+                await jobs.ashutdown(settings.web_graceful_timeout_seconds)
+                if shared_metrics is not None:
+                    shared_metrics.stop()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        method = scope["method"]
+        if method == "OPTIONS":
+            await send({
+                "type": "http.response.start",
+                "status": 204,
+                "headers": [
+                    (b"access-control-allow-origin", b"*"),
+                    (b"access-control-allow-methods", b"GET, POST, OPTIONS"),
+                    (b"access-control-allow-headers", b"Content-Type, Last-Event-ID"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        handler = routes.get((method, scope["path"]))
+        route = scope["path"] if handler is not None else "unmatched"
+        if handler is None and method == "GET" and _RUN_EVENTS_PATH.match(scope["path"]):
+            handler, route = resume_run, "/runs/<run_id>/events"
+        elif handler is None and method == "GET" and _JOB_PATH.match(scope["path"]):
+            handler, route = get_job, "/jobs/<job_id>"
+        request_started = time.perf_counter()
+        started = False
+        streamed = False
+
+        async def tracked_send(message: Dict[str, Any]) -> None:
+            nonlocal started, streamed
+            if message["type"] == "http.response.start":
+                started = True
+                HTTP_LATENCY.observe(time.perf_counter() - request_started, method=method, route=route,
+                                     status=message["status"])
+            elif message["type"] == "http.response.body" and message.get("more_body"):
+                streamed = True
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(route=route)
+        try:
+            if handler is None:
+                await _send_json(tracked_send, {"success": False, "error": "Not found", "code": "NOT_FOUND"}, 404)
+                return
+            await handler(scope, receive, tracked_send)
+        except _RequestError as e:
+            await _send_json(tracked_send, e.payload, e.status, e.headers)
+        except Exception as e:
+            if started:
+                raise
+            await _send_json(tracked_send, {
+                "success": False,
+                "error": f"Internal server error: {str(e)}",
+                "code": "INTERNAL_ERROR"
+            }, 500)
+        finally:
+            HTTP_IN_FLIGHT.dec(route=route)
+            if streamed:
+                HTTP_STREAM_DURATION.observe(time.perf_counter() - request_started, route=route)
+
+    return app
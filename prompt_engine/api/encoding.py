@@ -0,0 +1,144 @@
+"""
+Response shaping shared by the Flask and ASGI apps: field projection, JSON encoding and compression
+
+``orjson`` (faster JSON encoding) and ``zstandard`` (zstd compression) are
+used when installed; otherwise the standard library's ``json`` and gzip are.
+"""
+
+import gzip
+import importlib.util
+import json
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+# Top-level fields of a pipeline result that ``fields`` may select
+RESULT_FIELDS = (
+    "success", "input", "platform", "depth", "platformContext", "contextAnalysis",
+    "intent", "basePrompt", "enhancedPrompt", "prompt", "metadata"
+)
+
+
+def orjson_available() -> bool:
+    """Return True when the optional ``orjson`` package is installed."""
+    return importlib.util.find_spec("orjson") is not None
+
+
+def zstd_available() -> bool:
+    """Return True when the optional ``zstandard`` package is installed."""
+    return importlib.util.find_spec("zstandard") is not None
+
+
+_ORJSON = orjson_available()
+_ZSTD = zstd_available()
+
+
+def dumps(payload: Any) -> bytes:
+    """
+    Serialize a payload to UTF-8 JSON.
+
+    Args:
+        payload: JSON-serializable value
+
+    Returns:
+        The encoded JSON (with orjson when installed)
+    """
+    if _ORJSON:
+        import orjson
+
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; the standard encoder handles them
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def parse_fields(value: Any) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a ``fields`` projection parameter.
+
+    Args:
+        value: A list of field names, a comma-separated string, or None
+
+    Returns:
+        The selected fields, or None to return every field
+
+    Raises:
+        ValueError: If the value is malformed or names an unknown field
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = [name.strip() for name in value.split(",") if name.strip()]
+    if not isinstance(value, list) or not value or not all(isinstance(name, str) for name in value):
+        raise ValueError("'fields' must be a non-empty list or comma-separated string of field names")
+    unknown = [name for name in value if name not in RESULT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s) {', '.join(unknown)}. Valid options: {', '.join(RESULT_FIELDS)}")
+    return tuple(dict.fromkeys(value))
+
+
+def project(result: Dict[str, Any], fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """
+    Keep only the selected fields of a successful result.
+
+    ``success`` is always kept, and error results are returned whole so
+    clients still see the error, its code and the run id for resuming.
+
+    Args:
+        result: A pipeline result
+        fields: Fields to keep (None for all)
+
+    Returns:
+        The projected result
+    """
+    if fields is None or not result.get("success"):
+        return result
+    return {name: result[name] for name in ("success", *fields) if name in result}
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """
+    Pick a response encoding from an ``Accept-Encoding`` header.
+
+    Args:
+        accept_encoding: The request header value
+
+    Returns:
+        ``zstd`` (when zstandard is installed) or ``gzip``, whichever the
+        client weights higher (zstd on a tie), or None for no compression
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    candidates = (("zstd",) if _ZSTD else ()) + ("gzip",)
+    best, best_weight = None, 0.0
+    for name in candidates:
+        weight = weights.get(name, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = name, weight
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """
+    Compress a response body.
+
+    Args:
+        body: The uncompressed body
+        encoding: ``zstd`` or ``gzip`` (from :func:`negotiate`)
+
+    Returns:
+        The compressed body
+    """
+    if encoding == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=3).compress(body)
+    return gzip.compress(body, compresslevel=6)
@@ -1,3 +1,7 @@
 """
 CLI entry point for PromptPad
-""" 
\ No newline at end of file
+"""
+
+from prompt_engine.cli.main import main
+
+__all__ = ["main"]
@@ -0,0 +1,8 @@
+"""
+Allow running the CLI with ``python -m prompt_engine.cli``
+"""
+
+from prompt_engine.cli.main import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Bulk JSONL mode for the PromptPad CLI
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import IO, Any, AsyncIterator, Dict, Iterator, Optional, Set
+
+
+def read_items(lines: Iterator[str], skip_ids: Set[Any],
+               defaults: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Parse JSONL batch items lazily.
+
+    Items without an ``id`` get their line number (starting at 1). A line that
+    is not a JSON object is reported on stderr and passed on as an item with
+    only its id, so it produces an error result.
+
+    Args:
+        lines: Input lines, e.g. an open file
+        skip_ids: Ids to leave out (already in the output when resuming)
+        defaults: Values for fields an item leaves out, e.g. ``platform``
+
+    Yields:
+        Batch items for :meth:`PromptPipeline.astream_batch`
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            item = e
+        if not isinstance(item, dict):
+            if number in skip_ids:
+                continue
+            print(f"line {number}: not a JSON object ({item})", file=sys.stderr)
+            item = {}
+        item = {"id": number, **(defaults or {}), **item}
+        if item["id"] not in skip_ids:
+            yield item
+
+
+async def read_in_thread(items: Iterator[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Pull items in a worker thread, so a slow read (e.g. stdin) never blocks the event loop.
+
+    Args:
+        items: Blocking item iterator, e.g. from :func:`read_items`
+
+    Yields:
+        The same items
+    """
+    end = object()
+    while True:
+        item = await asyncio.to_thread(next, items, end)
+        if item is end:
+            return
+        yield item
+
+
+def finished_ids(path: str) -> Set[Any]:
+    """
+    Collect the ids of items that already succeeded in an output file.
+
+    Failed results are not counted, so resuming runs those items again; the
+    new result is appended after the earlier error line. A truncated last
+    line (e.g. from a crash mid-write) is ignored, so its item is run again.
+
+    Args:
+        path: JSONL output file of an earlier run
+
+    Returns:
+        Ids of successful results in the file
+    """
+    ids = set()
+    if not os.path.exists(path):
+        return ids
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(result, dict) and "id" in result and result.get("success") is True:
+                ids.add(result["id"])
+    return ids
+
+
+def _open_output(path: Optional[str], resume: bool) -> IO[str]:
+    """Open the output file, appending after a complete last line when resuming."""
+    if path is None:
+        return sys.stdout
+    if not resume or not os.path.exists(path):
+        return open(path, "w", encoding="utf-8")
+    ends_mid_line = False
+    with open(path, "rb") as f:
+        if f.seek(0, os.SEEK_END) > 0:
+            f.seek(-1, os.SEEK_END)
+            ends_mid_line = f.read(1) != b"\n"
+    output = open(path, "a", encoding="utf-8")
+    if ends_mid_line:
+        output.write("\n")
+    return output
+
+
+class Progress:
+    """Throttled progress and throughput line on stderr."""
+
+    def __init__(self, skipped: int, interval: float = 1.0):
+        """
+        Initialize the progress reporter.
+
+        Args:
+            skipped: Items skipped because they were already done
+            interval: Minimum seconds between updates
+        """
+        self.skipped = skipped
+        self.interval = interval
+        self.done = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+        self._last = 0.0
+        self._tty = sys.stderr.isatty()
+
+    def _line(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        skipped = f", {self.skipped} skipped" if self.skipped else ""
+        return f"{self.done} done ({self.failed} failed{skipped}) in {elapsed:.1f}s, {rate:.2f} items/s"
+
+    def update(self, result: Dict[str, Any]) -> None:
+        """Count a finished item and redraw the progress line if due."""
+        self.done += 1
+        if not result.get("success"):
+            self.failed += 1
+        now = time.perf_counter()
+        if now - self._last >= self.interval:
+            self._last = now
+            print(("\r" if self._tty else "") + self._line(), end="" if self._tty else "\n",
+                  file=sys.stderr, flush=True)
+
+    def finish(self) -> None:
+        """Print the final summary line."""
+        print(("\r" if self._tty else "") + self._line(), file=sys.stderr, flush=True)
+
+
+def run_bulk(pipeline: Any, source: str, output_path: Optional[str], concurrency: Optional[int],
+             ordered: bool, resume: bool, defaults: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Run every item of a JSONL file through the pipeline, writing JSONL results.
+
+    Input is read and results are written one line at a time, so memory use
+    does not grow with the file. Each result is flushed as soon as it is
+    written, so ``resume`` can pick up after a crash.
+
+    Args:
+        pipeline: The :class:`PromptPipeline` to run items on
+        source: Input file path, or ``-`` for stdin
+        output_path: Output file path (None for stdout)
+        concurrency: Items in flight (default: BATCH_MAX_CONCURRENCY)
+        ordered: Write results in input order instead of completion order
+        resume: Skip items that already succeeded in the output file
+        defaults: Values for fields an item leaves out, e.g. ``platform``
+
+    Returns:
+        The number of failed items
+    """
+    skip_ids = finished_ids(output_path) if resume and output_path else set()
+    lines = sys.stdin if source == "-" else open(source, "r", encoding="utf-8")
+    output = _open_output(output_path, resume)
+    progress = Progress(len(skip_ids))
+    try:
+        items = read_in_thread(read_items(lines, skip_ids, defaults))
+        for result in pipeline.stream_batch(items, concurrency, ordered):
+            result.pop("index")
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output.flush()
+            progress.update(result)
+    finally:
+        progress.finish()
+        if lines is not sys.stdin:
+            lines.close()
+        if output is not sys.stdout:
+            output.close()
+    return progress.failed
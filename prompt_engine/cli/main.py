@@ -1,41 +1,120 @@
 """
 Command-line interface for PromptPad
+
+Only the standard library, the settings and the platform registry are
+imported up front, so ``--help``, argument errors and ``--list-platforms``
+return without loading LangChain or asyncio. The pipeline and the bulk
+runner are imported once a prompt is actually run.
 """
 
+import argparse
 import sys
-from prompt_engine.core import PromptPipeline
+from typing import List, Optional
+
 from prompt_engine.config import Settings
+from prompt_engine.core.platform_registry import PlatformRegistry, default_registry
+
+DEPTHS = ("full", "balanced", "fast")
+
+
+def _platform_registry(settings: Settings) -> PlatformRegistry:
+    """Return the registry for PLATFORMS_PATH, or the bundled one."""
+    if settings.platforms_path:
+        return PlatformRegistry(settings.platforms_path, reload_interval=None)
+    return default_registry()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the argument parser.
+
+    Returns:
+        Parser for the ``prompt_engine`` command
+    """
+    parser = argparse.ArgumentParser(
+        prog="prompt_engine",
+        description="Turn raw input into an optimized prompt for a target platform.",
+        epilog="Examples: prompt_engine --platform Twitter 'Announce our new release'\n"
+               "          prompt_engine --batch items.jsonl --output results.jsonl --resume",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("prompt", nargs="*", help="the input to turn into a prompt")
+    parser.add_argument("-p", "--platform", help="target platform (default: the registry's default)")
+    parser.add_argument("-d", "--depth", choices=DEPTHS,
+                        help="pipeline profile (default: PIPELINE_DEPTH)")
+    parser.add_argument("--list-platforms", action="store_true", help="list the available platforms and exit")
+
+    bulk = parser.add_argument_group("bulk mode")
+    bulk.add_argument("--batch", metavar="FILE",
+                      help="run JSONL items ({\"input\", \"platform\", \"depth\"?, \"id\"?} per line; - for stdin); "
+                           "--platform and --depth fill in missing fields")
+    bulk.add_argument("-o", "--output", metavar="FILE", help="write JSONL results here (default: stdout)")
+    bulk.add_argument("-c", "--concurrency", type=int, help="items in flight (default: BATCH_MAX_CONCURRENCY)")
+    bulk.add_argument("--ordered", action="store_true", help="write results in input order (default: completion order)")
+    bulk.add_argument("--resume", action="store_true", help="skip items that already succeeded in --output")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Main CLI entry point.
 
+    Args:
+        argv: Command-line arguments (default: ``sys.argv[1:]``)
+    """
+    from dotenv import load_dotenv
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    # Load settings from environment
+    load_dotenv()
+    settings = Settings()
+    platforms = _platform_registry(settings)
+
+    if args.list_platforms:
+        for name in platforms.names():
+            print(name)
+        return
+
+    if args.batch is not None:
+        if args.prompt:
+            parser.error("--batch takes its inputs from FILE, not from the command line")
+        if args.resume and not args.output:
+            parser.error("--resume requires --output")
+        if args.concurrency is not None and args.concurrency < 1:
+            parser.error("--concurrency must be at least 1")
+    elif not args.prompt:
+        parser.error("a prompt is required")
+    # In bulk mode items name their own platform (checked per item); --platform only fills gaps
+    platform = args.platform or (None if args.batch is not None else platforms.default.name)
+    if platform is not None and platform not in platforms:
+        parser.error(f"invalid platform '{platform}' (choose from {', '.join(platforms.names())})")
 
-def main():
-    """Main CLI entry point."""
     try:
-        # Check if prompt was provided
-        if len(sys.argv) < 2:
-            print("Usage: promptpad <your prompt>")
-            print("Example: promptpad 'Write a blog post about AI'")
-            sys.exit(1)
-        
-        # Get the prompt from command line arguments
-        user_prompt = " ".join(sys.argv[1:])
-        
-        # Load settings from environment
-        settings = Settings()
         settings.validate()
-        
-        # Initialize pipeline with settings
+
+        # Heavy imports (LangChain, OpenAI client) happen only here
+        from prompt_engine.core.pipeline import PromptPipeline
+
         pipeline = PromptPipeline(temperature=settings.temperature)
-        
-        # Generate the prompt
-        result = pipeline.run(user_prompt)
-        
+        if args.batch is not None:
+            from prompt_engine.cli.bulk import run_bulk
+
+            defaults = {"platform": args.platform, "depth": args.depth}
+            failed = run_bulk(pipeline, args.batch, args.output, args.concurrency, args.ordered, args.resume,
+                              {key: value for key, value in defaults.items() if value})
+            sys.exit(1 if failed else 0)
+
+        result = pipeline.run(" ".join(args.prompt), platform, args.depth)
+
         # Display results
         if result["success"]:
-            print(result["final_prompt"])
+            print(result["prompt"])
         else:
             print(f"Error: {result['error']}", file=sys.stderr)
             sys.exit(1)
-            
+
     except KeyboardInterrupt:
         print("\nOperation cancelled by user", file=sys.stderr)
         sys.exit(1)
@@ -45,4 +124,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -3,7 +3,26 @@ Configuration settings for PromptPad
 """
 
 import os
-from typing import Optional
+from typing import Any, Callable, Dict, Optional
+
+
+def _stage_overrides(suffix: str, cast: Callable[[str], Any]) -> Dict[str, Any]:
+    """
+    Collect per-stage overrides named STAGE_<NAME>_<SUFFIX> from the environment.
+    
+    Args:
+        suffix: Variable name suffix, e.g. ``TIMEOUT_SECONDS``
+        cast: Converts the variable's value
+        
+    Returns:
+        Mapping of lower-cased stage name to value
+    """
+    prefix, ending = "STAGE_", f"_{suffix}"
+    return {
+        key[len(prefix):-len(ending)].lower(): cast(value)
+        for key, value in os.environ.items()
+        if key.startswith(prefix) and key.endswith(ending) and value
+    }
 
 
 class Settings:
@@ -16,11 +35,126 @@ class Settings:
         
         # Server Configuration
         self.host: str = os.getenv("HOST", "0.0.0.0")
-        self.port: int = int(os.getenv("PORT"))
+        self.port: int = int(os.getenv("PORT", "5000"))
+        
+        # Production Server Configuration (python -m prompt_engine.serve)
+        self.web_workers: int = int(os.getenv("WEB_WORKERS", "2"))
+        self.web_threads: int = int(os.getenv("WEB_THREADS", "8"))
+        self.web_timeout_seconds: float = float(os.getenv("WEB_TIMEOUT_SECONDS", "120"))
+        self.web_graceful_timeout_seconds: float = float(os.getenv("WEB_GRACEFUL_TIMEOUT_SECONDS", "60"))
         
         # LLM Configuration
-        self.temperature: float = float(os.getenv("TEMPERATURE"))
+        self.temperature: float = float(os.getenv("TEMPERATURE", "0.2"))
         self.model_name: str = os.getenv("MODEL_NAME")
+        # Lower-latency model for the analysis and refinement stages (default: MODEL_NAME)
+        self.fast_model_name: Optional[str] = os.getenv("FAST_MODEL_NAME") or None
+        # Per-stage overrides, e.g. STAGE_GENERATE_MODEL=gpt-4o, STAGE_CONTEXT_TEMPERATURE=0,
+        # STAGE_REFINE_MAX_TOKENS=1024
+        self.stage_models: Dict[str, str] = _stage_overrides("MODEL", str)
+        self.stage_temperatures: Dict[str, float] = _stage_overrides("TEMPERATURE", float)
+        self.stage_max_tokens: Dict[str, int] = _stage_overrides("MAX_TOKENS", int)
+        
+        # LLM Backend Configuration (openai, record or replay)
+        self.llm_backend: str = os.getenv("LLM_BACKEND", "openai")
+        self.llm_cassette_path: str = os.getenv(
+            "LLM_CASSETTE_PATH", os.path.join(os.path.expanduser("~"), ".cache", "promptpad", "cassette.jsonl")
+        )
+        self.llm_replay_ttft_ms: Optional[float] = (
+            float(os.getenv("LLM_REPLAY_TTFT_MS")) if os.getenv("LLM_REPLAY_TTFT_MS") else None
+        )
+        self.llm_replay_tokens_per_second: Optional[float] = (
+            float(os.getenv("LLM_REPLAY_TOKENS_PER_SECOND")) if os.getenv("LLM_REPLAY_TOKENS_PER_SECOND") else None
+        )
+        
+        # Upstream Connection Pool Configuration
+        self.llm_max_connections: int = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+        self.llm_max_keepalive_connections: int = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+        self.llm_keepalive_expiry_seconds: float = float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", "30"))
+        self.llm_http2: bool = os.getenv("LLM_HTTP2", "true").lower() == "true"
+        self.llm_connect_timeout_seconds: float = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "10"))
+        self.llm_timeout_seconds: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+        self.llm_warmup_connections: int = int(os.getenv("LLM_WARMUP_CONNECTIONS", "5"))
+        # Per-stage overrides, e.g. STAGE_CONTEXT_TIMEOUT_SECONDS=15
+        self.stage_timeouts: Dict[str, float] = _stage_overrides("TIMEOUT_SECONDS", float)
+        
+        # Retry and Hedging Configuration
+        self.retry_max_attempts: int = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
+        self.retry_base_delay_seconds: float = float(os.getenv("RETRY_BASE_DELAY_SECONDS", "0.5"))
+        self.retry_max_delay_seconds: float = float(os.getenv("RETRY_MAX_DELAY_SECONDS", "8"))
+        # Per-stage overrides, e.g. STAGE_REFINE_RETRY_MAX_ATTEMPTS=1
+        self.stage_retry_max_attempts: Dict[str, int] = _stage_overrides("RETRY_MAX_ATTEMPTS", int)
+        self.hedge_enabled: bool = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+        self.hedge_quantile: float = float(os.getenv("HEDGE_QUANTILE", "0.95"))
+        self.hedge_budget_ratio: float = float(os.getenv("HEDGE_BUDGET_RATIO", "0.1"))
+        self.hedge_min_samples: int = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+        
+        # Pipeline Configuration
+        self.pipeline_depth: str = os.getenv("PIPELINE_DEPTH", "full")
+        
+        # Platform Registry Configuration (default: the bundled platforms.toml)
+        self.platforms_path: str = os.getenv("PLATFORMS_PATH", "")
+        self.platforms_reload_interval_seconds: Optional[float] = (
+            float(os.getenv("PLATFORMS_RELOAD_INTERVAL_SECONDS", "2")) or None
+        )
+        
+        # Stage Cache Configuration
+        self.cache_enabled: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+        self.cache_max_entries: int = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+        self.cache_ttl_seconds: float = float(os.getenv("CACHE_TTL_SECONDS", "86400"))
+        self.cache_path: str = os.getenv(
+            "CACHE_PATH", os.path.join(os.path.expanduser("~"), ".cache", "promptpad", "stage_cache.sqlite")
+        )
+        self.cache_max_disk_entries: int = int(os.getenv("CACHE_MAX_DISK_ENTRIES", "100000"))
+        
+        # Stage Checkpoint Configuration
+        self.checkpoint_enabled: bool = os.getenv("CHECKPOINT_ENABLED", "true").lower() == "true"
+        self.checkpoint_ttl_seconds: float = float(os.getenv("CHECKPOINT_TTL_SECONDS", "3600"))
+        self.checkpoint_path: str = os.getenv(
+            "CHECKPOINT_PATH", os.path.join(os.path.expanduser("~"), ".cache", "promptpad", "checkpoints.sqlite")
+        )
+        
+        # Near-Duplicate Input Reuse Configuration
+        self.similarity_enabled: bool = os.getenv("SIMILARITY_ENABLED", "true").lower() == "true"
+        self.similarity_threshold: float = float(os.getenv("SIMILARITY_THRESHOLD", "0.9"))
+        self.similarity_max_entries: int = int(os.getenv("SIMILARITY_MAX_ENTRIES", "4096"))
+        
+        # Upstream Limiter Configuration
+        self.limiter_enabled: bool = os.getenv("LIMITER_ENABLED", "true").lower() == "true"
+        self.limiter_rate_per_second: float = float(os.getenv("LIMITER_RATE_PER_SECOND", "50"))
+        self.limiter_burst: int = int(os.getenv("LIMITER_BURST", "50"))
+        self.limiter_initial_concurrency: int = int(os.getenv("LIMITER_INITIAL_CONCURRENCY", "16"))
+        self.limiter_min_concurrency: int = int(os.getenv("LIMITER_MIN_CONCURRENCY", "1"))
+        self.limiter_max_concurrency: int = int(os.getenv("LIMITER_MAX_CONCURRENCY", "64"))
+        self.limiter_max_queue: int = int(os.getenv("LIMITER_MAX_QUEUE", "256"))
+        self.limiter_latency_threshold_seconds: float = float(os.getenv("LIMITER_LATENCY_THRESHOLD_SECONDS", "30"))
+        
+        # Request Coalescing Configuration
+        self.coalesce_enabled: bool = os.getenv("COALESCE_ENABLED", "true").lower() == "true"
+        
+        # Batch Configuration
+        self.batch_max_concurrency: int = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+        self.batch_max_items: int = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+        
+        # Resumable SSE Configuration
+        self.sse_buffer_events: int = int(os.getenv("SSE_BUFFER_EVENTS", "4096"))
+        self.sse_run_ttl_seconds: float = float(os.getenv("SSE_RUN_TTL_SECONDS", "300"))
+        
+        # Job API Configuration
+        self.jobs_workers: int = int(os.getenv("JOBS_WORKERS", "4"))
+        self.jobs_max_pending: int = int(os.getenv("JOBS_MAX_PENDING", "100"))
+        self.jobs_ttl_seconds: float = float(os.getenv("JOBS_TTL_SECONDS", "3600"))
+        self.jobs_max_wait_seconds: float = float(os.getenv("JOBS_MAX_WAIT_SECONDS", "25"))
+        self.jobs_path: str = os.getenv(
+            "JOBS_PATH", os.path.join(os.path.expanduser("~"), ".cache", "promptpad", "jobs.sqlite")
+        )
+        
+        # Metrics Configuration (METRICS_DIR shares metrics between worker processes)
+        self.metrics_dir: str = os.getenv("METRICS_DIR", "")
+        self.metrics_flush_seconds: float = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+        
+        # Response Compression Configuration
+        self.response_compression_enabled: bool = os.getenv("RESPONSE_COMPRESSION_ENABLED", "true").lower() == "true"
+        self.response_compression_min_bytes: int = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
         
         # Application Configuration
         self.debug: bool = os.getenv("DEBUG", "false").lower() == "true"
@@ -33,15 +167,78 @@ class Settings:
         Returns:
             True if all required settings are valid
         """
-        if not self.openai_api_key:
+        if self.llm_backend not in ("openai", "record", "replay"):
+            raise ValueError("LLM_BACKEND must be one of: openai, record, replay")
+        
+        if not self.openai_api_key and self.llm_backend != "replay":
             raise ValueError("OPENAI_API_KEY environment variable is required")
         
         if not (0 <= self.temperature <= 2):
             raise ValueError("TEMPERATURE must be between 0 and 2")
         
+        if any(not (0 <= temperature <= 2) for temperature in self.stage_temperatures.values()):
+            raise ValueError("STAGE_<NAME>_TEMPERATURE must be between 0 and 2")
+        
+        if any(max_tokens < 1 for max_tokens in self.stage_max_tokens.values()):
+            raise ValueError("STAGE_<NAME>_MAX_TOKENS must be at least 1")
+        
         if not (1 <= self.port <= 65535):
             raise ValueError("PORT must be between 1 and 65535")
         
+        if self.web_workers < 1 or self.web_threads < 1:
+            raise ValueError("WEB_WORKERS and WEB_THREADS must be at least 1")
+        
+        if self.web_timeout_seconds <= 0 or self.web_graceful_timeout_seconds < 0:
+            raise ValueError("WEB_TIMEOUT_SECONDS must be greater than 0 and WEB_GRACEFUL_TIMEOUT_SECONDS at least 0")
+        
+        if self.llm_replay_tokens_per_second is not None and self.llm_replay_tokens_per_second <= 0:
+            raise ValueError("LLM_REPLAY_TOKENS_PER_SECOND must be greater than 0")
+        
+        if self.llm_max_connections < 1 or self.llm_max_keepalive_connections < 0:
+            raise ValueError("LLM_MAX_CONNECTIONS must be at least 1 and LLM_MAX_KEEPALIVE_CONNECTIONS at least 0")
+        
+        if self.llm_timeout_seconds <= 0 or any(timeout <= 0 for timeout in self.stage_timeouts.values()):
+            raise ValueError("LLM_TIMEOUT_SECONDS and STAGE_<NAME>_TIMEOUT_SECONDS must be greater than 0")
+        
+        if self.retry_max_attempts < 1 or any(attempts < 1 for attempts in self.stage_retry_max_attempts.values()):
+            raise ValueError("RETRY_MAX_ATTEMPTS and STAGE_<NAME>_RETRY_MAX_ATTEMPTS must be at least 1")
+        
+        if not (0 < self.hedge_quantile < 1) or self.hedge_budget_ratio < 0:
+            raise ValueError("HEDGE_QUANTILE must be between 0 and 1 and HEDGE_BUDGET_RATIO at least 0")
+        
+        if not (1 <= self.limiter_min_concurrency <= self.limiter_max_concurrency):
+            raise ValueError("LIMITER_MIN_CONCURRENCY must be at least 1 and at most LIMITER_MAX_CONCURRENCY")
+        
+        if self.limiter_rate_per_second < 0 or self.limiter_burst < 1 or self.limiter_max_queue < 0:
+            raise ValueError("LIMITER_RATE_PER_SECOND must be at least 0, LIMITER_BURST at least 1 and LIMITER_MAX_QUEUE at least 0")
+        
+        if self.pipeline_depth not in ("full", "balanced", "fast"):
+            raise ValueError("PIPELINE_DEPTH must be one of: full, balanced, fast")
+        
+        if self.cache_max_entries < 1:
+            raise ValueError("CACHE_MAX_ENTRIES must be at least 1")
+        
+        if self.checkpoint_ttl_seconds <= 0:
+            raise ValueError("CHECKPOINT_TTL_SECONDS must be greater than 0")
+        
+        if not (0 < self.similarity_threshold <= 1):
+            raise ValueError("SIMILARITY_THRESHOLD must be greater than 0 and at most 1")
+        
+        if self.batch_max_concurrency < 1:
+            raise ValueError("BATCH_MAX_CONCURRENCY must be at least 1")
+        
+        if self.sse_buffer_events < 1:
+            raise ValueError("SSE_BUFFER_EVENTS must be at least 1")
+        
+        if self.jobs_workers < 1 or self.jobs_max_pending < 0:
+            raise ValueError("JOBS_WORKERS must be at least 1 and JOBS_MAX_PENDING at least 0")
+        
+        if self.metrics_flush_seconds <= 0:
+            raise ValueError("METRICS_FLUSH_SECONDS must be greater than 0")
+        
+        if self.response_compression_min_bytes < 0:
+            raise ValueError("RESPONSE_COMPRESSION_MIN_BYTES must be at least 0")
+        
         return True
     
     def to_dict(self) -> dict:
@@ -49,8 +246,72 @@ class Settings:
         return {
             "host": self.host,
             "port": self.port,
+            "web_workers": self.web_workers,
+            "web_threads": self.web_threads,
+            "web_timeout_seconds": self.web_timeout_seconds,
+            "web_graceful_timeout_seconds": self.web_graceful_timeout_seconds,
             "temperature": self.temperature,
             "model_name": self.model_name,
+            "fast_model_name": self.fast_model_name,
+            "stage_models": self.stage_models,
+            "stage_temperatures": self.stage_temperatures,
+            "stage_max_tokens": self.stage_max_tokens,
+            "llm_backend": self.llm_backend,
+            "llm_cassette_path": self.llm_cassette_path,
+            "llm_replay_ttft_ms": self.llm_replay_ttft_ms,
+            "llm_replay_tokens_per_second": self.llm_replay_tokens_per_second,
+            "llm_max_connections": self.llm_max_connections,
+            "llm_max_keepalive_connections": self.llm_max_keepalive_connections,
+            "llm_keepalive_expiry_seconds": self.llm_keepalive_expiry_seconds,
+            "llm_http2": self.llm_http2,
+            "llm_connect_timeout_seconds": self.llm_connect_timeout_seconds,
+            "llm_timeout_seconds": self.llm_timeout_seconds,
+            "llm_warmup_connections": self.llm_warmup_connections,
+            "stage_timeouts": self.stage_timeouts,
+            "pipeline_depth": self.pipeline_depth,
+            "platforms_path": self.platforms_path,
+            "platforms_reload_interval_seconds": self.platforms_reload_interval_seconds,
+            "cache_enabled": self.cache_enabled,
+            "cache_max_entries": self.cache_max_entries,
+            "cache_ttl_seconds": self.cache_ttl_seconds,
+            "cache_path": self.cache_path,
+            "cache_max_disk_entries": self.cache_max_disk_entries,
+            "checkpoint_enabled": self.checkpoint_enabled,
+            "checkpoint_ttl_seconds": self.checkpoint_ttl_seconds,
+            "checkpoint_path": self.checkpoint_path,
+            "similarity_enabled": self.similarity_enabled,
+            "similarity_threshold": self.similarity_threshold,
+            "similarity_max_entries": self.similarity_max_entries,
+            "retry_max_attempts": self.retry_max_attempts,
+            "retry_base_delay_seconds": self.retry_base_delay_seconds,
+            "retry_max_delay_seconds": self.retry_max_delay_seconds,
+            "stage_retry_max_attempts": self.stage_retry_max_attempts,
+            "hedge_enabled": self.hedge_enabled,
+            "hedge_quantile": self.hedge_quantile,
+            "hedge_budget_ratio": self.hedge_budget_ratio,
+            "hedge_min_samples": self.hedge_min_samples,
+            "limiter_enabled": self.limiter_enabled,
+            "limiter_rate_per_second": self.limiter_rate_per_second,
+            "limiter_burst": self.limiter_burst,
+            "limiter_initial_concurrency": self.limiter_initial_concurrency,
+            "limiter_min_concurrency": self.limiter_min_concurrency,
+            "limiter_max_concurrency": self.limiter_max_concurrency,
+            "limiter_max_queue": self.limiter_max_queue,
+            "limiter_latency_threshold_seconds": self.limiter_latency_threshold_seconds,
+            "coalesce_enabled": self.coalesce_enabled,
+            "batch_max_concurrency": self.batch_max_concurrency,
+            "batch_max_items": self.batch_max_items,
+            "sse_buffer_events": self.sse_buffer_events,
+            "sse_run_ttl_seconds": self.sse_run_ttl_seconds,
+            "jobs_workers": self.jobs_workers,
+            "jobs_max_pending": self.jobs_max_pending,
+            "jobs_ttl_seconds": self.jobs_ttl_seconds,
+            "jobs_max_wait_seconds": self.jobs_max_wait_seconds,
+            "jobs_path": self.jobs_path,
+            "metrics_dir": self.metrics_dir,
+            "metrics_flush_seconds": self.metrics_flush_seconds,
+            "response_compression_enabled": self.response_compression_enabled,
+            "response_compression_min_bytes": self.response_compression_min_bytes,
             "debug": self.debug,
             "version": self.version
         } 
\ No newline at end of file
@@ -1,19 +1,37 @@
 """
 Core pipeline components for PromptPad
+
+Components are imported on first access (PEP 562), so importing a light
+submodule such as ``prompt_engine.core.platform_registry`` does not load
+LangChain and the OpenAI client.
 """
 
-from prompt_engine.core.context_analyzer import ContextAnalyzer
-from prompt_engine.core.intent_interpreter import IntentInterpreter
-from prompt_engine.core.prompt_generator import PromptGenerator
-from prompt_engine.core.prompt_enhancer import PromptEnhancer
-from prompt_engine.core.prompt_refiner import PromptRefiner
-from prompt_engine.core.pipeline import PromptPipeline
-
-__all__ = [
-    "ContextAnalyzer",
-    "IntentInterpreter", 
-    "PromptGenerator",
-    "PromptEnhancer",
-    "PromptRefiner",
-    "PromptPipeline"
-] 
\ No newline at end of file
+from importlib import import_module
+from typing import Any
+
+_EXPORTS = {
+    "ContextAnalyzer": "prompt_engine.core.context_analyzer",
+    "IntentInterpreter": "prompt_engine.core.intent_interpreter",
+    "PromptGenerator": "prompt_engine.core.prompt_generator",
+    "PromptEnhancer": "prompt_engine.core.prompt_enhancer",
+    "PromptRefiner": "prompt_engine.core.prompt_refiner",
+    "InsightExtractor": "prompt_engine.core.insight_extractor",
+    "PromptPolisher": "prompt_engine.core.prompt_polisher",
+    "PromptComposer": "prompt_engine.core.prompt_composer",
+    "PromptPipeline": "prompt_engine.core.pipeline"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    """Import an exported component on first access."""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
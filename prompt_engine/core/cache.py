@@ -0,0 +1,280 @@
+"""
+Content-addressed cache for stage completions with an in-memory LRU tier and an SQLite tier
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+
+class StageCache:
+    """
+    Two-tier (memory LRU + SQLite) cache for stage completion text.
+
+    The memory tier and the SQLite connection have separate locks, so a
+    memory hit never waits behind disk I/O. Async callers use :meth:`aget`
+    and :meth:`aset`, which keep SQLite work off the event loop.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 86400,
+                 path: Optional[str] = None, max_disk_entries: int = 100000):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries kept in memory
+            ttl_seconds: Time-to-live for entries in both tiers (0 disables expiry)
+            path: SQLite database path for the persistent tier (None for memory only)
+            max_disk_entries: Maximum number of entries kept on disk
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.path = path
+        self._disk_writes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if path:
+            self._open(path)
+            ref = weakref.WeakMethod(self._reopen_after_fork)
+            os.register_at_fork(after_in_child=lambda: ref() and ref()())
+
+    def _open(self, path: str) -> None:
+        """Open (and create if needed) the SQLite tier."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS stage_cache ("
+            "key TEXT PRIMARY KEY, stage TEXT NOT NULL, value TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS stage_cache_created ON stage_cache (created)")
+
+    def _reopen_after_fork(self) -> None:
+        """Give a forked child its own SQLite connection; the inherited one must not be used or closed."""
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        if self._conn is not None:
+            self._conn = None
+            self._open(self.path)
+
+    @staticmethod
+    def make_key(stage: str, template: str, inputs: Dict[str, Any], model: str, temperature: Any,
+                 max_tokens: Optional[int] = None, stop: Optional[Sequence[str]] = None) -> str:
+        """
+        Build the content address for a stage call.
+
+        The template is hashed into the key, so editing one stage's
+        PROMPT_TEMPLATE only invalidates that stage's entries.
+
+        Args:
+            stage: Stage name
+            template: The stage's prompt template text
+            inputs: Rendered template variables
+            model: Model identifier
+            temperature: Sampling temperature
+            max_tokens: Completion token limit bound to the call
+            stop: Stop sequences bound to the call
+
+        Returns:
+            Hex digest identifying the call
+        """
+        payload = json.dumps({
+            "stage": stage,
+            "template": hashlib.sha256(template.encode("utf-8")).hexdigest(),
+            "inputs": inputs,
+            "model": model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stop": list(stop or [])
+        }, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _expired(self, created: float) -> bool:
+        return bool(self.ttl_seconds) and time.time() - created > self.ttl_seconds
+
+    def _remember(self, key: str, created: float, value: str) -> None:
+        """Insert into the memory tier, evicting least recently used entries."""
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        """Read the memory tier, counting a hit."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[0]):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[1]
+                del self._memory[key]
+            return None
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        """Read the SQLite tier, promoting a hit into memory and counting the hit or miss."""
+        found = None
+        with self._disk_lock:
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, created FROM stage_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if not self._expired(row[1]):
+                        found = row
+                    else:
+                        self._conn.execute("DELETE FROM stage_cache WHERE key = ?", (key,))
+
+        with self._lock:
+            if found is None:
+                self.misses += 1
+                return None
+            value, created = found
+            self._remember(key, created, value)
+            self.disk_hits += 1
+            return value
+
+    def _disk_set(self, key: str, stage: str, value: str, created: float) -> None:
+        """Write an entry to the SQLite tier, pruning it periodically."""
+        with self._disk_lock:
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO stage_cache (key, stage, value, created) VALUES (?, ?, ?, ?)",
+                (key, stage, value, created)
+            )
+            self._disk_writes += 1
+            if self._disk_writes % 256 == 0:
+                self._prune_disk()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached completion.
+
+        Args:
+            key: Key from :meth:`make_key`
+
+        Returns:
+            The cached completion text, or None on a miss
+        """
+        value = self._memory_get(key)
+        if value is not None:
+            return value
+        return self._disk_get(key)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """
+        Look up a cached completion without blocking the event loop.
+
+        Memory hits are served inline; the SQLite lookup runs in a worker thread.
+
+        Args:
+            key: Key from :meth:`make_key`
+
+        Returns:
+            The cached completion text, or None on a miss
+        """
+        value = self._memory_get(key)
+        if value is not None:
+            return value
+        if self._conn is None:
+            return self._disk_get(key)
+        return await asyncio.to_thread(self._disk_get, key)
+
+    def set(self, key: str, stage: str, value: str) -> None:
+        """
+        Store a completion in both tiers.
+
+        Args:
+            key: Key from :meth:`make_key`
+            stage: Stage name (kept on disk for per-stage invalidation)
+            value: Completion text
+        """
+        created = time.time()
+        with self._lock:
+            self._remember(key, created, value)
+        self._disk_set(key, stage, value, created)
+
+    async def aset(self, key: str, stage: str, value: str) -> None:
+        """
+        Store a completion in both tiers without blocking the event loop.
+
+        The memory tier is updated inline; the SQLite write runs in a worker thread.
+
+        Args:
+            key: Key from :meth:`make_key`
+            stage: Stage name (kept on disk for per-stage invalidation)
+            value: Completion text
+        """
+        created = time.time()
+        with self._lock:
+            self._remember(key, created, value)
+        if self._conn is not None:
+            await asyncio.to_thread(self._disk_set, key, stage, value, created)
+
+    def _prune_disk(self) -> None:
+        """Drop expired entries and enforce the disk size limit (oldest first)."""
+        if self.ttl_seconds:
+            self._conn.execute("DELETE FROM stage_cache WHERE created < ?", (time.time() - self.ttl_seconds,))
+        self._conn.execute(
+            "DELETE FROM stage_cache WHERE key IN ("
+            "SELECT key FROM stage_cache ORDER BY created DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        )
+
+    def clear(self, stage: Optional[str] = None) -> None:
+        """
+        Remove cached entries.
+
+        Args:
+            stage: Only clear the disk entries of this stage (memory is always cleared)
+        """
+        with self._lock:
+            self._memory.clear()
+        with self._disk_lock:
+            if self._conn is None:
+                return
+            if stage is None:
+                self._conn.execute("DELETE FROM stage_cache")
+            else:
+                self._conn.execute("DELETE FROM stage_cache WHERE stage = ?", (stage,))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and tier sizes."""
+        disk_entries = None
+        with self._disk_lock:
+            if self._conn is not None:
+                disk_entries = self._conn.execute("SELECT COUNT(*) FROM stage_cache").fetchone()[0]
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "hits": self.memory_hits + self.disk_hits,
+                "memoryHits": self.memory_hits,
+                "diskHits": self.disk_hits,
+                "misses": self.misses,
+                "hitRatio": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memoryEntries": len(self._memory),
+                "diskEntries": disk_entries
+            }
+
+    def close(self) -> None:
+        """Close the SQLite tier."""
+        with self._disk_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,172 @@
+"""
+Per-run checkpoints of completed stage outputs, so a failed run can resume where it stopped
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .similarity import normalize_input
+
+
+class CheckpointStore:
+    """
+    Stores each completed stage's outputs under the run's id for ``ttl_seconds``.
+
+    Checkpoints are kept in SQLite when a path is given (shared by every
+    worker process using the file) and in memory otherwise. Each run is
+    tied to a fingerprint of its input, platform and profile, so a run id
+    cannot be used to resume a different request.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600.0, path: Optional[str] = None):
+        """
+        Initialize the store.
+
+        Args:
+            ttl_seconds: How long a run's checkpoints are kept after its last completed stage
+            path: SQLite database path (None for memory only)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self._runs: "OrderedDict[str, Tuple[str, float, List[Tuple[str, Dict[str, Any]]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes = 0
+        self.resumed = 0
+        if path:
+            self._open(path)
+            ref = weakref.WeakMethod(self._reopen_after_fork)
+            os.register_at_fork(after_in_child=lambda: ref() and ref()())
+
+    def _open(self, path: str) -> None:
+        """Open (and create if needed) the SQLite database."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "run_id TEXT NOT NULL, stage TEXT NOT NULL, fingerprint TEXT NOT NULL, "
+            "outputs TEXT NOT NULL, created REAL NOT NULL, PRIMARY KEY (run_id, stage))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS checkpoints_created ON checkpoints (created)")
+
+    def _reopen_after_fork(self) -> None:
+        """Give a forked child its own SQLite connection; the inherited one must not be used or closed."""
+        self._lock = threading.Lock()
+        if self._conn is not None:
+            self._conn = None
+            self._open(self.path)
+
+    @staticmethod
+    def fingerprint(user_input: str, platform: str, depth: str) -> str:
+        """
+        Identify the request a run belongs to.
+
+        Args:
+            user_input: The raw user input
+            platform: The target platform
+            depth: Pipeline profile
+
+        Returns:
+            Hex digest of the normalized input, platform and profile
+        """
+        payload = json.dumps([normalize_input(user_input), platform, depth], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def load(self, run_id: str, fingerprint: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Read a run's completed stages.
+
+        Args:
+            run_id: The run's id
+            fingerprint: Fingerprint of the request resuming the run
+
+        Returns:
+            (stage name, outputs) pairs in completion order; empty if the run is
+            unknown, expired or belongs to a different request
+        """
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            if self._conn is None:
+                run = self._runs.get(run_id)
+                if run is None or run[0] != fingerprint or run[1] < cutoff:
+                    return []
+                stages = list(run[2])
+            else:
+                rows = self._conn.execute(
+                    "SELECT stage, outputs FROM checkpoints "
+                    "WHERE run_id = ? AND fingerprint = ? AND created >= ? ORDER BY created",
+                    (run_id, fingerprint, cutoff)
+                ).fetchall()
+                stages = [(stage, json.loads(outputs)) for stage, outputs in rows]
+            if stages:
+                self.resumed += 1
+            return stages
+
+    def save(self, run_id: str, fingerprint: str, stage: str, outputs: Dict[str, Any]) -> None:
+        """
+        Record a completed stage.
+
+        Args:
+            run_id: The run's id
+            fingerprint: Fingerprint of the run's request
+            stage: Stage name
+            outputs: The stage's output values (JSON-serializable)
+        """
+        created = time.time()
+        with self._lock:
+            if self._conn is None:
+                self._purge(created - self.ttl_seconds)
+                run = self._runs.get(run_id)
+                # A run id reused for another request starts over rather than mixing in its stages
+                stages = run[2] if run is not None and run[0] == fingerprint else []
+                stages.append((stage, outputs))
+                self._runs[run_id] = (fingerprint, created, stages)
+                self._runs.move_to_end(run_id)
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (run_id, stage, fingerprint, outputs, created) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (run_id, stage, fingerprint, json.dumps(outputs, ensure_ascii=False), created)
+            )
+            self._writes += 1
+            if self._writes % 256 == 0:
+                self._conn.execute("DELETE FROM checkpoints WHERE created < ?", (created - self.ttl_seconds,))
+
+    def _purge(self, cutoff: float) -> None:
+        """Forget in-memory runs last updated before the cutoff (caller holds the lock)."""
+        while self._runs and next(iter(self._runs.values()))[1] < cutoff:
+            self._runs.popitem(last=False)
+
+    def delete(self, run_id: str) -> None:
+        """Forget a run, e.g. once it has succeeded."""
+        with self._lock:
+            if self._conn is None:
+                self._runs.pop(run_id, None)
+            else:
+                self._conn.execute("DELETE FROM checkpoints WHERE run_id = ?", (run_id,))
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of runs holding checkpoints and how many runs resumed from one."""
+        with self._lock:
+            if self._conn is None:
+                runs = len(self._runs)
+            else:
+                runs = self._conn.execute("SELECT COUNT(DISTINCT run_id) FROM checkpoints").fetchone()[0]
+            return {"runs": runs, "resumed": self.resumed}
+
+    def close(self) -> None:
+        """Close the SQLite connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
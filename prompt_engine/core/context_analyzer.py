@@ -2,14 +2,99 @@
 Context analysis component for understanding user input domain and requirements
 """
 
-from typing import Dict
-from langchain.prompts import PromptTemplate
-from langchain_core.runnables import RunnableSequence
+import json
+import re
+from typing import Any, Dict, Optional, TypedDict
+from .cache import StageCache
+from .context_compactor import ANALYSIS_FIELDS
+from .limiter import AdaptiveLimiter
+from .resilience import HedgeBudget, RetryPolicy
+from .metrics import SIMILARITY_LOOKUPS
+from .runtime import run_sync
+from .similarity import MinHashIndex
+from .stage import PipelineStage
 
 
-class ContextAnalyzer:
+ContextAnalysis = TypedDict("ContextAnalysis", {
+    "Domain": str,
+    "Complexity": str,
+    "Requirements": str,
+    "Output Format": str,
+    "Key Concepts": str
+})
+
+# JSON field names requested from the model, mapped to the analysis keys used by later stages
+ANALYSIS_JSON_FIELDS = {
+    "domain": "Domain",
+    "complexity": "Complexity",
+    "requirements": "Requirements",
+    "output_format": "Output Format",
+    "key_concepts": "Key Concepts"
+}
+
+# A completed "key": "string" or "key": [list] pair
+_JSON_PAIR = re.compile(r'"([^"\\]+)"\s*:\s*("(?:[^"\\]|\\.)*"|\[(?:[^\]"]|"(?:[^"\\]|\\.)*")*\])')
+
+
+def _field_key(name: str) -> Optional[str]:
+    """Map a JSON or label field name to its analysis key, or None for unknown fields."""
+    return ANALYSIS_JSON_FIELDS.get(re.sub(r"[\s-]+", "_", name.strip().lower()))
+
+
+class ContextAnalysisParser:
+    """
+    Incrementally extracts the five analysis fields from a streamed JSON completion.
+
+    Each field is taken as soon as its value is complete, so the stage can
+    stop generating once all five are present. Unknown fields are ignored.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._position = 0
+        self.fields: Dict[str, str] = {}
+
+    @property
+    def complete(self) -> bool:
+        """Whether every analysis field has been parsed."""
+        return len(self.fields) == len(ANALYSIS_FIELDS)
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Consume the next completion chunk.
+
+        Args:
+            chunk: Completion text
+
+        Returns:
+            True once every analysis field has been parsed
+        """
+        self._buffer += chunk
+        for match in _JSON_PAIR.finditer(self._buffer, self._position):
+            self._position = match.end()
+            key = _field_key(match.group(1))
+            if key is None or key in self.fields:
+                continue
+            try:
+                value: Any = json.loads(match.group(2))
+            except ValueError:
+                continue
+            if isinstance(value, list):
+                value = ", ".join(str(item) for item in value)
+            self.fields[key] = str(value).strip()
+        return self.complete
+
+    def result(self) -> ContextAnalysis:
+        """Return the analysis, with an empty string for every field not parsed."""
+        return {key: self.fields.get(key, "") for key in ANALYSIS_FIELDS}
+
+
+class ContextAnalyzer(PipelineStage):
     """Analyzes user input for context, domain, and requirements."""
     
+    NAME = "context"
+    INPUT_VARIABLES = ["user_input"]
+
     PROMPT_TEMPLATE = """You are an expert at analyzing user input for context, domain, and requirements.
 
 Analyze the following user input and extract:
@@ -22,19 +107,37 @@ Analyze the following user input and extract:
 User Input:
 {user_input}
 
-Provide your analysis in this exact format:
-Domain: [domain]
-Complexity: [level]
-Requirements: [list of requirements]
-Output Format: [expected format]
-Key Concepts: [relevant terms/concepts]"""
+Respond with only a JSON object on one line, with exactly these string fields:
+{{"domain": "...", "complexity": "beginner|intermediate|advanced", "requirements": "...", "output_format": "...", "key_concepts": "..."}}
+
+JSON:"""
+
+    # The object is a single line, so anything after it is never needed
+    STOP_SEQUENCES = ["}\n", "\n}", "\n\nUser Input:"]
+    
+    def __init__(self, llm, cache: Optional[StageCache] = None, similarity_index: Optional[MinHashIndex] = None,
+                 timeout: Optional[float] = None, limiter: Optional[AdaptiveLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None, hedge_budget: Optional[HedgeBudget] = None):
+        """
+        Initialize the context analyzer.
+        
+        Args:
+            llm: LLM instance the stage calls
+            cache: Optional cache for completions
+            similarity_index: Optional index of past inputs whose analyses are reused for near-duplicates
+            timeout: Optional per-call request timeout in seconds
+            limiter: Optional limiter every LLM call must pass
+            retry_policy: Optional policy for retrying transient LLM failures
+            hedge_budget: Optional budget enabling hedged (duplicated) slow calls
+        """
+        super().__init__(llm, cache, timeout, limiter, retry_policy, hedge_budget)
+        self.similarity_index = similarity_index
     
-    def __init__(self, llm):
-        """Initialize the context analyzer with an LLM instance."""
-        prompt = PromptTemplate(input_variables=["user_input"], template=self.PROMPT_TEMPLATE)
-        self.chain = RunnableSequence(prompt, llm)
+    def incremental_parser(self) -> ContextAnalysisParser:
+        """Return a parser that ends the completion once all five fields are present."""
+        return ContextAnalysisParser()
     
-    def analyze(self, user_input: str) -> Dict[str, str]:
+    def analyze(self, user_input: str) -> ContextAnalysis:
         """
         Analyze user input for context and requirements.
         
@@ -44,23 +147,79 @@ Key Concepts: [relevant terms/concepts]"""
         Returns:
             Dictionary containing domain, complexity, requirements, output format, and key concepts
         """
-        result = self.chain.invoke({"user_input": user_input})
-        return self._parse_analysis(result.strip())
+        return run_sync(self.aanalyze(user_input))
     
-    def _parse_analysis(self, analysis_text: str) -> Dict[str, str]:
+    async def aanalyze(self, user_input: str) -> ContextAnalysis:
+        """
+        Asynchronously analyze user input for context and requirements.
+        
+        Args:
+            user_input: The raw user input to analyze
+            
+        Returns:
+            Dictionary containing domain, complexity, requirements, output format, and key concepts
+        """
+        analysis = self.find_similar(user_input)
+        if analysis is not None:
+            return analysis
+        result = await self._ainvoke(self.prepare_inputs(user_input))
+        analysis = self.parse_output(result)
+        self.remember(user_input, analysis)
+        return analysis
+    
+    def find_similar(self, user_input: str) -> Optional[Dict[str, str]]:
+        """
+        Return a stored analysis for a near-duplicate of the input, if any.
+        
+        Args:
+            user_input: The raw user input
+            
+        Returns:
+            A copy of the matching analysis, or None when there is no match
+        """
+        if self.similarity_index is None:
+            return None
+        analysis = self.similarity_index.lookup(user_input)
+        SIMILARITY_LOOKUPS.inc(result="miss" if analysis is None else "hit")
+        return dict(analysis) if analysis is not None else None
+    
+    def remember(self, user_input: str, analysis: Dict[str, str]) -> None:
+        """
+        Store an analysis so near-duplicate inputs can reuse it.
+        
+        Args:
+            user_input: The raw user input
+            analysis: The parsed analysis for the input
+        """
+        if self.similarity_index is not None:
+            self.similarity_index.add(user_input, dict(analysis))
+    
+    def parse_output(self, text: str) -> ContextAnalysis:
+        """Parse the completion into the structured analysis dictionary."""
+        return self._parse_analysis(text)
+    
+    def _parse_analysis(self, analysis_text: str) -> ContextAnalysis:
         """
         Parse the analysis text into a structured dictionary.
         
+        The JSON object the prompt asks for is parsed field by field, so a
+        truncated object still yields its complete fields. Completions in the
+        older ``Label: value`` line format (e.g. cached ones) are accepted too.
+        Only the five analysis fields are kept.
+        
         Args:
             analysis_text: Raw analysis text from LLM
             
         Returns:
-            Structured dictionary of analysis results
+            Structured dictionary of analysis results (missing fields are empty)
         """
-        lines = analysis_text.split('\n')
-        analysis = {}
-        for line in lines:
-            if ':' in line:
-                key, value = line.split(':', 1)
-                analysis[key.strip()] = value.strip()
-        return analysis 
\ No newline at end of file
+        parser = ContextAnalysisParser()
+        parser.feed(analysis_text)
+        if not parser.fields:
+            for line in analysis_text.split('\n'):
+                if ':' in line:
+                    key, value = line.split(':', 1)
+                    key = _field_key(key)
+                    if key is not None and key not in parser.fields:
+                        parser.fields[key] = value.strip()
+        return parser.result()
@@ -0,0 +1,117 @@
+"""
+Compact, per-stage serialization of the context analysis passed between stages
+"""
+
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+ANALYSIS_FIELDS = ("Domain", "Complexity", "Requirements", "Output Format", "Key Concepts")
+
+PLATFORM_CONTEXT_LABELS = (
+    ("tone", "tone"),
+    ("format", "format"),
+    ("purpose", "purpose"),
+    ("style_guide", "style"),
+    ("character_limit", "limit"),
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text.
+
+    Uses the ~4 characters per token rule of thumb for English text with
+    OpenAI tokenizers, which avoids loading a tokenizer on the request path.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count
+    """
+    return (len(text) + 3) // 4
+
+
+def legacy_serialize(context_analysis: Dict[str, Any]) -> str:
+    """Serialize every field the way stages did before compaction (one ``key: value`` line each)."""
+    return "\n".join([f"{k}: {v}" for k, v in context_analysis.items()])
+
+
+class CompactContext(dict):
+    """Context analysis dictionary that renders compact per-stage serializations once per request."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._lines: Optional[Dict[str, str]] = None
+        self._rendered: Dict[Tuple[str, ...], str] = {}
+        self._legacy_tokens: Optional[int] = None
+        self.savings: Dict[str, int] = {}
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        super().__setitem__(key, value)
+        self._reset()
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        super().update(*args, **kwargs)
+        self._reset()
+
+    def _line_map(self) -> Dict[str, str]:
+        """Render every known field to its canonical line, keyed by lower-cased field name."""
+        if self._lines is None:
+            lines = {}
+            for key, value in self.items():
+                if key == "platform_context":
+                    if isinstance(value, dict):
+                        parts = [f"{label}={value[name]}" for name, label in PLATFORM_CONTEXT_LABELS if name in value]
+                        lines["platform_context"] = "Platform Guidelines: " + "; ".join(parts)
+                elif key == "platform":
+                    lines["platform"] = f"Platform: {value}"
+                elif value not in (None, ""):
+                    lines[key.strip().lower()] = f"{key.strip()}: {value}"
+            self._lines = lines
+        return self._lines
+
+    def render(self, fields: Sequence[str], stage: Optional[str] = None) -> str:
+        """
+        Serialize the requested fields in canonical order.
+
+        Fields missing from the analysis are skipped, as is anything the
+        model emitted that is not listed in ``fields``.
+
+        Args:
+            fields: Field names to include (matched case-insensitively)
+            stage: Stage name to record the estimated input-token saving under
+
+        Returns:
+            The compact context text
+        """
+        key = tuple(fields)
+        text = self._rendered.get(key)
+        if text is None:
+            lines = self._line_map()
+            text = "\n".join(lines[name.lower()] for name in fields if name.lower() in lines)
+            self._rendered[key] = text
+        if stage is not None:
+            if self._legacy_tokens is None:
+                self._legacy_tokens = estimate_tokens(legacy_serialize(self))
+            self.savings[stage] = self._legacy_tokens - estimate_tokens(text)
+        return text
+
+
+def render_context(context_analysis: Dict[str, Any], fields: Sequence[str], stage: Optional[str] = None) -> str:
+    """
+    Serialize a context analysis for a stage, compactly.
+
+    Args:
+        context_analysis: Context analysis (a plain dict or a :class:`CompactContext`)
+        fields: Field names the stage needs
+        stage: Stage name to record the estimated input-token saving under
+
+    Returns:
+        The compact context text
+    """
+    if not isinstance(context_analysis, CompactContext):
+        context_analysis = CompactContext(context_analysis)
+    return context_analysis.render(fields, stage)
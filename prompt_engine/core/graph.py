@@ -0,0 +1,296 @@
+"""
+Declarative stage graph and a dependency-aware concurrent executor
+"""
+
+import asyncio
+import inspect
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, Sequence
+
+from .stage import PipelineStage
+
+
+class NodeContext:
+    """Per-execution handle a node uses to emit events and annotate its stage_end event."""
+
+    def __init__(self, name: str, queue: "asyncio.Queue[Any]", stream_tokens: bool,
+                 labels: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.stream_tokens = stream_tokens
+        self.labels = labels or {}
+        self.annotations: Dict[str, Any] = {}
+        self._queue = queue
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        """Queue an event for the graph's consumer."""
+        self._queue.put_nowait(event)
+
+
+class GraphNode:
+    """A named unit of work with declared input and output value names."""
+
+    def __init__(self, name: str, inputs: Sequence[str], outputs: Sequence[str]):
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+
+    async def run(self, inputs: Dict[str, Any], context: NodeContext) -> Dict[str, Any]:
+        """
+        Execute the node.
+
+        Args:
+            inputs: Values for the node's declared inputs
+            context: Execution context for emitting events
+
+        Returns:
+            Values for the node's declared outputs
+        """
+        raise NotImplementedError
+
+
+class ComputeNode(GraphNode):
+    """Node running a local (sync or async) function of its inputs."""
+
+    def __init__(self, name: str, inputs: Sequence[str], outputs: Sequence[str],
+                 func: Callable[..., Any]):
+        """
+        Initialize the node.
+
+        Args:
+            name: Node name
+            inputs: Input value names, passed to ``func`` as keyword arguments
+            outputs: Output value names
+            func: Function returning a dictionary of output values
+        """
+        super().__init__(name, inputs, outputs)
+        self.func = func
+
+    async def run(self, inputs: Dict[str, Any], context: NodeContext) -> Dict[str, Any]:
+        result = self.func(**inputs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+
+class StageNode(GraphNode):
+    """Node running an LLM-backed pipeline stage, optionally streaming its tokens."""
+
+    def __init__(self, stage: PipelineStage, inputs: Sequence[str], outputs: Sequence[str],
+                 unpack: Optional[Callable[[Any], Dict[str, Any]]] = None,
+                 reuse: Optional[Callable[[Dict[str, Any]], Optional[Any]]] = None,
+                 remember: Optional[Callable[[Dict[str, Any], Any], None]] = None):
+        """
+        Initialize the node.
+
+        Args:
+            stage: The stage to run (the node is named after it)
+            inputs: Input value names, passed positionally to ``stage.prepare_inputs``
+            outputs: Output value names
+            unpack: Maps the stage's parsed result to output values (default: the single output)
+            reuse: Returns a previously parsed result to use instead of calling the LLM
+            remember: Called with the inputs and parsed result after an LLM call
+        """
+        super().__init__(stage.NAME, inputs, outputs)
+        self.stage = stage
+        self.unpack = unpack or (lambda parsed: {self.outputs[0]: parsed})
+        self.reuse = reuse
+        self.remember = remember
+
+    @staticmethod
+    def _platform(context: NodeContext) -> str:
+        return context.labels.get("platform", "")
+
+    async def run(self, inputs: Dict[str, Any], context: NodeContext) -> Dict[str, Any]:
+        if self.reuse is not None:
+            parsed = self.reuse(inputs)
+            if parsed is not None:
+                context.annotations["reused"] = True
+                return self.unpack(parsed)
+
+        stage_inputs = self.stage.prepare_inputs(*(inputs[name] for name in self.inputs))
+        if context.stream_tokens:
+            chunks = []
+            async for chunk in self.stage._astream(stage_inputs, self._platform(context)):
+                chunks.append(chunk)
+                context.emit({"event": "token", "stage": self.name, "text": chunk})
+            text = "".join(chunks)
+        else:
+            text = await self.stage._ainvoke(stage_inputs, self._platform(context))
+
+        parsed = self.stage.parse_output(text)
+        if self.remember is not None:
+            self.remember(inputs, parsed)
+        return self.unpack(parsed)
+
+
+class StageGraph:
+    """A DAG of nodes connected through named values."""
+
+    def __init__(self, nodes: Iterable[GraphNode], inputs: Sequence[str] = (),
+                 aliases: Optional[Dict[str, str]] = None):
+        """
+        Initialize and validate the graph.
+
+        Args:
+            nodes: The graph's nodes
+            inputs: Value names supplied by the caller
+            aliases: Value names that read another value (used when a node is dropped)
+
+        Raises:
+            ValueError: If outputs collide, an input is never produced or the graph has a cycle
+        """
+        self.nodes: Dict[str, GraphNode] = {}
+        self.inputs = tuple(inputs)
+        self.aliases = dict(aliases or {})
+        self.producers: Dict[str, str] = {}
+        for node in nodes:
+            if node.name in self.nodes:
+                raise ValueError(f"Duplicate node '{node.name}'")
+            self.nodes[node.name] = node
+            for output in node.outputs:
+                if output in self.producers or output in self.inputs:
+                    raise ValueError(f"Value '{output}' is produced more than once")
+                self.producers[output] = node.name
+        self._check()
+
+    def resolve(self, name: str) -> str:
+        """Follow aliases to the value name that is actually produced."""
+        seen = set()
+        while name in self.aliases:
+            if name in seen:
+                raise ValueError(f"Alias cycle at '{name}'")
+            seen.add(name)
+            name = self.aliases[name]
+        return name
+
+    def _check(self) -> None:
+        """Ensure every input is available and the graph is acyclic."""
+        available = set(self.inputs)
+        remaining = dict(self.nodes)
+        while remaining:
+            ready = [name for name, node in remaining.items()
+                     if all(self.resolve(value) in available for value in node.inputs)]
+            if not ready:
+                missing = sorted({self.resolve(value) for node in remaining.values() for value in node.inputs
+                                  if self.resolve(value) not in available})
+                raise ValueError(f"Stage graph cannot complete; unresolved values: {', '.join(missing)}")
+            for name in ready:
+                available.update(remaining.pop(name).outputs)
+
+    def producer(self, value: str) -> Optional[str]:
+        """Return the name of the node producing a value (after aliases), if any."""
+        return self.producers.get(self.resolve(value))
+
+    def value(self, values: Dict[str, Any], name: str) -> Any:
+        """Read a value by name, following aliases."""
+        return values[self.resolve(name)]
+
+    def without(self, name: str, aliases: Dict[str, str]) -> "StageGraph":
+        """
+        Derive a graph with one node removed.
+
+        Args:
+            name: Node to drop
+            aliases: For each of the dropped node's outputs, the value that replaces it
+
+        Returns:
+            The reduced graph
+        """
+        node = self.nodes[name]
+        missing = [output for output in node.outputs if output not in aliases]
+        if missing:
+            raise ValueError(f"Dropping '{name}' needs aliases for: {', '.join(missing)}")
+        return StageGraph(
+            [n for n in self.nodes.values() if n.name != name],
+            self.inputs,
+            {**self.aliases, **aliases}
+        )
+
+    def independent_of(self, value: str) -> "StageGraph":
+        """
+        Derive the subgraph of nodes that do not depend on a value, directly or transitively.
+
+        Args:
+            value: Input value the subgraph must not read (e.g. ``platform``)
+
+        Returns:
+            The independent nodes, as a graph without ``value`` among its inputs
+        """
+        dependent = {value}
+        changed = True
+        while changed:
+            changed = False
+            for node in self.nodes.values():
+                if (not dependent.issuperset(node.outputs)
+                        and any(self.resolve(name) in dependent for name in node.inputs)):
+                    dependent.update(node.outputs)
+                    changed = True
+        return StageGraph(
+            [node for node in self.nodes.values() if not dependent.intersection(node.outputs)],
+            [name for name in self.inputs if name != value],
+            self.aliases
+        )
+
+    async def astream(self, values: Dict[str, Any], stream_nodes: Optional[Iterable[str]] = None,
+                      labels: Optional[Dict[str, str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute the graph, running every node as soon as its inputs exist.
+
+        Nodes whose outputs are already present in ``values`` are skipped, and
+        ``values`` is updated in place with every produced output.
+
+        Args:
+            values: Initial values; receives the outputs of every node
+            stream_nodes: Names of stage nodes whose tokens are forwarded (default: all)
+            labels: Metrics labels for the run's stage calls (e.g. ``platform``)
+
+        Yields:
+            stage_start, token and stage_end events
+
+        Raises:
+            Exception: The first node failure (other running nodes are cancelled)
+        """
+        stream_nodes = None if stream_nodes is None else set(stream_nodes)
+        queue: "asyncio.Queue[Any]" = asyncio.Queue()
+        remaining = {
+            name: node for name, node in self.nodes.items()
+            if not all(output in values for output in node.outputs)
+        }
+        running: Dict[str, "asyncio.Task[None]"] = {}
+
+        async def execute(node: GraphNode) -> None:
+            context = NodeContext(node.name, queue, stream_nodes is None or node.name in stream_nodes, labels)
+            try:
+                inputs = {name: values[self.resolve(name)] for name in node.inputs}
+                outputs = await node.run(inputs, context)
+                queue.put_nowait((node, outputs, context.annotations, None))
+            except Exception as e:
+                queue.put_nowait((node, None, None, e))
+
+        def schedule() -> None:
+            for name, node in list(remaining.items()):
+                if all(self.resolve(value) in values for value in node.inputs):
+                    del remaining[name]
+                    queue.put_nowait({"event": "stage_start", "stage": name})
+                    running[name] = asyncio.ensure_future(execute(node))
+
+        try:
+            schedule()
+            while running:
+                item = await queue.get()
+                if isinstance(item, dict):
+                    yield item
+                    continue
+                node, outputs, annotations, error = item
+                running.pop(node.name)
+                if error is not None:
+                    raise error
+                values.update(outputs)
+                yield {"event": "stage_end", "stage": node.name, "output": outputs, **annotations}
+                schedule()
+            while not queue.empty():
+                yield queue.get_nowait()
+            if remaining:
+                raise RuntimeError(f"Stage graph stalled with unmet inputs: {', '.join(remaining)}")
+        finally:
+            for task in running.values():
+                task.cancel()
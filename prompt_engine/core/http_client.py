@@ -0,0 +1,94 @@
+"""
+Shared keep-alive HTTP connection pool for upstream LLM calls
+"""
+
+import asyncio
+import importlib.util
+import os
+from typing import Optional
+
+import httpx
+
+
+def http2_available() -> bool:
+    """Return True when the optional ``h2`` package needed for HTTP/2 is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+class LLMConnectionPool:
+    """
+    One sync and one async httpx client shared by every stage chain and request.
+
+    Reusing the clients keeps TLS connections alive between stage calls
+    instead of opening new ones per LLM instance.
+    """
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0, connect_timeout: float = 10.0,
+                 timeout: float = 60.0, http2: bool = True):
+        """
+        Initialize the pool.
+
+        Args:
+            max_connections: Maximum open connections per client
+            max_keepalive_connections: Idle connections kept open for reuse
+            keepalive_expiry: Seconds an idle connection is kept open
+            connect_timeout: Seconds allowed to establish a connection
+            timeout: Default read/write/pool timeout in seconds
+            http2: Negotiate HTTP/2 when the ``h2`` package is installed
+        """
+        self.http2 = http2 and http2_available()
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        timeouts = httpx.Timeout(timeout, connect=connect_timeout)
+        self.client = httpx.Client(limits=limits, timeout=timeouts, http2=self.http2)
+        self.async_client = httpx.AsyncClient(limits=limits, timeout=timeouts, http2=self.http2)
+        self.warmed_connections = 0
+
+    async def awarmup(self, base_url: Optional[str] = None, api_key: Optional[str] = None,
+                      connections: int = 5) -> int:
+        """
+        Open connections to the API ahead of the first request.
+
+        Sends concurrent lightweight ``GET /models`` requests so the TLS
+        handshakes happen at startup. Must run on the event loop that will
+        use the async client.
+
+        Args:
+            base_url: API base URL (default: OPENAI_BASE_URL or the public OpenAI API)
+            api_key: API key (default: OPENAI_API_KEY)
+            connections: Number of connections to open (HTTP/2 multiplexes over one)
+
+        Returns:
+            The number of warmup requests that succeeded
+        """
+        base_url = (base_url or os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1").rstrip("/")
+        api_key = api_key or os.getenv("OPENAI_API_KEY", "")
+        connections = 1 if self.http2 else connections
+        if connections < 1:
+            return 0
+
+        async def touch() -> bool:
+            try:
+                response = await self.async_client.get(
+                    f"{base_url}/models", headers={"Authorization": f"Bearer {api_key}"}
+                )
+                return response.status_code < 500
+            except httpx.HTTPError:
+                return False
+
+        results = await asyncio.gather(*(touch() for _ in range(connections)))
+        self.warmed_connections = sum(results)
+        return self.warmed_connections
+
+    def close(self) -> None:
+        """Close the sync client (the async client is closed with :meth:`aclose`)."""
+        self.client.close()
+
+    async def aclose(self) -> None:
+        """Close both clients."""
+        self.client.close()
+        await self.async_client.aclose()
@@ -0,0 +1,94 @@
+"""
+Fused context analysis and intent extraction component for the faster pipeline profiles
+"""
+
+from typing import Any, Dict
+from .context_analyzer import _field_key
+from .context_compactor import ANALYSIS_FIELDS
+from .runtime import run_sync
+from .stage import PipelineStage
+
+
+class InsightExtractor(PipelineStage):
+    """Analyzes context and extracts task intent from user input in a single call."""
+    
+    NAME = "insight"
+    INPUT_VARIABLES = ["user_input"]
+
+    PROMPT_TEMPLATE = """You are an expert at analyzing user input for context, domain, requirements and task intent.
+
+Analyze the following user input and extract:
+1. Domain/field (e.g., programming, writing, analysis, creative, technical)
+2. Complexity level (beginner, intermediate, advanced)
+3. Specific requirements or constraints
+4. Expected output format or style
+5. Key terminology or concepts involved
+6. A comprehensive interpretation of the task intent: the primary objective, secondary goals, specific constraints and expected outcomes
+
+User Input:
+{user_input}
+
+Provide your analysis in this exact format:
+Domain: [domain]
+Complexity: [level]
+Requirements: [list of requirements]
+Output Format: [expected format]
+Key Concepts: [relevant terms/concepts]
+Intent: [detailed interpretation of the task intent]"""
+    
+    def extract(self, user_input: str) -> Dict[str, Any]:
+        """
+        Analyze context and extract intent from user input.
+        
+        Args:
+            user_input: The raw user input to analyze
+            
+        Returns:
+            Dictionary with the ``context`` analysis dictionary and the ``intent`` text
+        """
+        return run_sync(self.aextract(user_input))
+    
+    async def aextract(self, user_input: str) -> Dict[str, Any]:
+        """
+        Asynchronously analyze context and extract intent from user input.
+        
+        Args:
+            user_input: The raw user input to analyze
+            
+        Returns:
+            Dictionary with the ``context`` analysis dictionary and the ``intent`` text
+        """
+        result = await self._ainvoke(self.prepare_inputs(user_input))
+        return self.parse_output(result)
+    
+    def parse_output(self, text: str) -> Dict[str, Any]:
+        """
+        Split the completion into the context analysis and the intent.
+        
+        Only the five analysis fields are kept in ``context``, as in the
+        ``context`` stage; other ``Label: value`` lines are ignored.
+        
+        Args:
+            text: Raw completion text from the LLM
+            
+        Returns:
+            Dictionary with ``context`` and ``intent`` entries
+        """
+        context = {}
+        intent_lines = []
+        in_intent = False
+        for line in text.split('\n'):
+            if in_intent:
+                intent_lines.append(line)
+            elif line.strip().lower().startswith('intent:'):
+                in_intent = True
+                intent_lines.append(line.split(':', 1)[1])
+            elif ':' in line:
+                key, value = line.split(':', 1)
+                key = _field_key(key)
+                if key is not None and key not in context:
+                    context[key] = value.strip()
+        return {
+            "context": {key: context.get(key, "") for key in ANALYSIS_FIELDS},
+            "intent": "\n".join(intent_lines).strip()
+        }
@@ -3,13 +3,18 @@ Intent interpretation component for extracting comprehensive task understanding
 """
 
 from typing import Dict
-from langchain.prompts import PromptTemplate
-from langchain_core.runnables import RunnableSequence
+from .context_compactor import ANALYSIS_FIELDS, render_context
+from .runtime import run_sync
+from .stage import PipelineStage
 
 
-class IntentInterpreter:
+class IntentInterpreter(PipelineStage):
     """Extracts comprehensive task intent from user input with context."""
     
+    NAME = "intent"
+    INPUT_VARIABLES = ["user_input", "context_analysis"]
+    CONTEXT_FIELDS = ANALYSIS_FIELDS + ("platform",)
+
     PROMPT_TEMPLATE = """You are an expert at extracting clear, detailed task intent.
 
 Given the user input and context analysis below, provide a comprehensive interpretation of the task intent that includes:
@@ -26,11 +31,6 @@ Context Analysis:
 
 Provide a detailed interpretation that captures the full scope and nuance of the request:"""
     
-    def __init__(self, llm):
-        """Initialize the intent interpreter with an LLM instance."""
-        prompt = PromptTemplate(input_variables=["user_input", "context_analysis"], template=self.PROMPT_TEMPLATE)
-        self.chain = RunnableSequence(prompt, llm)
-    
     def interpret(self, user_input: str, context_analysis: Dict[str, str]) -> str:
         """
         Extract comprehensive intent from user input with context.
@@ -42,6 +42,22 @@ Provide a detailed interpretation that captures the full scope and nuance of the
         Returns:
             Detailed interpretation of the task intent
         """
-        context_str = "\n".join([f"{k}: {v}" for k, v in context_analysis.items()])
-        result = self.chain.invoke({"user_input": user_input, "context_analysis": context_str})
-        return result.strip() 
\ No newline at end of file
+        return run_sync(self.ainterpret(user_input, context_analysis))
+    
+    async def ainterpret(self, user_input: str, context_analysis: Dict[str, str]) -> str:
+        """
+        Asynchronously extract comprehensive intent from user input with context.
+        
+        Args:
+            user_input: The raw user input
+            context_analysis: Dictionary containing context analysis results
+            
+        Returns:
+            Detailed interpretation of the task intent
+        """
+        return await self._ainvoke(self.prepare_inputs(user_input, context_analysis))
+    
+    def prepare_inputs(self, user_input: str, context_analysis: Dict[str, str]) -> Dict[str, str]:
+        """Serialize the context fields this stage needs into its template variables."""
+        context_str = render_context(context_analysis, self.CONTEXT_FIELDS, self.NAME)
+        return {"user_input": user_input, "context_analysis": context_str} 
\ No newline at end of file
@@ -0,0 +1,521 @@
+"""
+Asynchronous pipeline jobs: a bounded worker pool with a result store shared between worker processes
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import weakref
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait as wait_futures
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .graph import StageNode
+from .limiter import OverloadedError
+
+FINISHED = ("succeeded", "failed")
+
+
+class Job:
+    """One submitted pipeline run, its stage progress and its result."""
+
+    def __init__(self, user_input: str, platform: str, depth: str, stages: List[str]):
+        """
+        Initialize a queued job.
+
+        Args:
+            user_input: The raw user input to process
+            platform: The target platform
+            depth: Pipeline profile
+            stages: Names of the LLM stages the run will execute
+        """
+        self.id = uuid.uuid4().hex
+        self.run_id = uuid.uuid4().hex
+        self.input = user_input
+        self.platform = platform
+        self.depth = depth
+        self.stages = stages
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.expires_at: Optional[float] = None
+        self.completed_stages: List[str] = []
+        self.running_stages: List[str] = []
+        self.result: Optional[Dict[str, Any]] = None
+        self.done = threading.Event()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        """
+        Rebuild a job from a snapshot stored by :class:`JobStore` (e.g. by another worker).
+
+        Args:
+            data: The job's :meth:`to_dict` snapshot, plus its ``stages``
+
+        Returns:
+            The job; its ``done`` event is set if it had finished
+        """
+        job = cls(data["input"], data["platform"], data["depth"], list(data.get("stages", [])))
+        job.id = data["jobId"]
+        job.run_id = data["runId"]
+        job.status = data["status"]
+        job.created_at = data["createdAt"]
+        job.started_at = data["startedAt"]
+        job.finished_at = data["finishedAt"]
+        job.expires_at = data["expiresAt"]
+        job.completed_stages = list(data["progress"]["completedStages"])
+        job.running_stages = list(data["progress"]["runningStages"])
+        job.result = data["result"]
+        if job.status in FINISHED:
+            job.done.set()
+        return job
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the job's status, progress and (once finished) result."""
+        return {
+            "jobId": self.id,
+            "runId": self.run_id,
+            "status": self.status,
+            "input": self.input,
+            "platform": self.platform,
+            "depth": self.depth,
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            "expiresAt": self.expires_at,
+            "progress": {
+                "completedStages": list(self.completed_stages),
+                "runningStages": list(self.running_stages),
+                "totalStages": len(self.stages)
+            },
+            "result": self.result
+        }
+
+
+class JobStore:
+    """
+    SQLite record of each job's latest snapshot.
+
+    Every worker process using the same file sees every job, so a job
+    submitted to one worker can be polled through any other.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (and create if needed) the store.
+
+        Args:
+            path: SQLite database path
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._open()
+        ref = weakref.WeakMethod(self._reopen_after_fork)
+        os.register_at_fork(after_in_child=lambda: ref() and ref()())
+
+    def _open(self) -> None:
+        """Open the SQLite database."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL)"
+        )
+
+    def _reopen_after_fork(self) -> None:
+        """Give a forked child its own SQLite connection; the inherited one must not be used or closed."""
+        self._lock = threading.Lock()
+        self._open()
+
+    def save(self, job: Job) -> None:
+        """Store a job's current snapshot, replacing the previous one."""
+        data = json.dumps({**job.to_dict(), "stages": job.stages}, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, data, expires) VALUES (?, ?, ?)", (job.id, data, job.expires_at)
+            )
+            self._writes += 1
+            if self._writes % 256 == 0:
+                self._conn.execute("DELETE FROM jobs WHERE expires < ?", (time.time(),))
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read a job's snapshot.
+
+        Args:
+            job_id: The job's id
+
+        Returns:
+            The snapshot, or None if the job is unknown or expired
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM jobs WHERE id = ? AND (expires IS NULL OR expires > ?)", (job_id, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def close(self) -> None:
+        """Close the SQLite connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class JobManager:
+    """
+    Runs pipeline jobs on a bounded pool of worker threads.
+
+    Submitting returns at once; results are kept for ``ttl_seconds`` after
+    the job finishes and can be polled or long-polled with :meth:`wait`.
+    Async servers submit with :meth:`asubmit` instead, which runs the job as
+    a task on the server's own event loop.
+    With a ``path`` every job's state is also written to a :class:`JobStore`,
+    so jobs run by other worker processes sharing the file can be polled too.
+    """
+
+    def __init__(self, pipeline: Any, workers: int = 4, max_pending: int = 100, ttl_seconds: float = 3600.0,
+                 path: Optional[str] = None, poll_interval: float = 0.25):
+        """
+        Initialize the manager.
+
+        Args:
+            pipeline: The :class:`PromptPipeline` jobs run on
+            workers: Jobs executed concurrently
+            max_pending: Jobs allowed to wait for a worker
+            ttl_seconds: How long finished jobs are kept
+            path: SQLite path of the shared job store (None to keep jobs in this process only)
+            poll_interval: Seconds between store reads while long-polling another process's job
+        """
+        self.pipeline = pipeline
+        self.workers = workers
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self.poll_interval = poll_interval
+        self.store = JobStore(path) if path else None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="promptpad-job")
+        self._jobs: Dict[str, Job] = {}
+        self._futures: Dict[str, Future] = {}
+        self._tasks: Dict[str, "asyncio.Task[None]"] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._expiry: Deque[Tuple[float, str]] = deque()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+
+    def _purge(self) -> None:
+        """Drop finished jobs whose TTL has passed (caller holds the lock)."""
+        now = time.time()
+        while self._expiry and self._expiry[0][0] <= now:
+            self._jobs.pop(self._expiry.popleft()[1], None)
+
+    def _save(self, job: Job) -> None:
+        """Write the job's state to the shared store, if there is one."""
+        if self.store is not None:
+            self.store.save(job)
+
+    def submit(self, user_input: str, platform: str, depth: Optional[str] = None) -> Job:
+        """
+        Queue a pipeline run.
+
+        Args:
+            user_input: The raw user input to process
+            platform: The target platform
+            depth: Pipeline profile (default: PIPELINE_DEPTH)
+
+        Returns:
+            The queued job
+
+        Raises:
+            ValueError: If the platform or profile is not valid
+            OverloadedError: If ``max_pending`` jobs are already waiting
+        """
+        job = self._queue(user_input, platform, depth)
+        self._save(job)
+        future = self._executor.submit(self._execute, job)
+        with self._lock:
+            self._futures[job.id] = future
+        future.add_done_callback(lambda _: self._forget(self._futures, job.id))
+        return job
+
+    async def asubmit(self, user_input: str, platform: str, depth: Optional[str] = None) -> Job:
+        """
+        Queue a pipeline run as a task on the running event loop.
+
+        The job then shares the loop, and the pipeline's async HTTP client,
+        with the server's own requests rather than running on the runtime
+        loop behind :meth:`submit`; at most ``workers`` such jobs run at once.
+
+        Args:
+            user_input: The raw user input to process
+            platform: The target platform
+            depth: Pipeline profile (default: PIPELINE_DEPTH)
+
+        Returns:
+            The queued job
+
+        Raises:
+            ValueError: If the platform or profile is not valid
+            OverloadedError: If ``max_pending`` jobs are already waiting
+        """
+        job = self._queue(user_input, platform, depth)
+        await asyncio.to_thread(self._save, job)
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        task = asyncio.ensure_future(self._aexecute(job))
+        with self._lock:
+            self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._forget(self._tasks, job.id))
+        return job
+
+    def _queue(self, user_input: str, platform: str, depth: Optional[str]) -> Job:
+        """Validate a run and count it as pending."""
+        depth = depth or self.pipeline.settings.pipeline_depth
+        graph = self.pipeline.graph_for(depth, platform)
+        stages = [name for name, node in graph.nodes.items() if isinstance(node, StageNode)]
+        job = Job(user_input, platform, depth, stages)
+        with self._lock:
+            self._purge()
+            if self._pending >= self.max_pending:
+                raise OverloadedError("Job queue is full, retry later", self._retry_after())
+            self._pending += 1
+            self._jobs[job.id] = job
+        return job
+
+    def _forget(self, running: Dict[str, Any], job_id: str) -> None:
+        with self._lock:
+            running.pop(job_id, None)
+
+    def _retry_after(self) -> float:
+        """Rough seconds until a queue slot frees, assuming ~10s per job (caller holds the lock)."""
+        return max(1.0, 10.0 * self._pending / max(self.workers, 1))
+
+    def _start(self, job: Job) -> None:
+        """Move a job from queued to running."""
+        with self._lock:
+            self._pending -= 1
+            self._running += 1
+        job.status = "running"
+        job.started_at = time.time()
+
+    @staticmethod
+    def _progress(job: Job, event: Dict[str, Any]) -> bool:
+        """Apply a stage event to the job's progress; return True if it changed."""
+        kind = event["event"]
+        if kind == "stage_start" and event["stage"] in job.stages:
+            job.running_stages.append(event["stage"])
+            return True
+        if kind == "stage_end" and event["stage"] in job.stages:
+            job.running_stages.remove(event["stage"])
+            job.completed_stages.append(event["stage"])
+            return True
+        return False
+
+    @staticmethod
+    def _outcome(job: Job, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the job's result if the event is the run's final or error event."""
+        if event["event"] == "final":
+            return event["result"]
+        if event["event"] != "error":
+            return None
+        result = {"success": False, "error": event["error"], "input": job.input, "platform": job.platform}
+        if "code" in event:
+            result.update(code=event["code"], retryAfter=event.get("retryAfter"))
+        if "runId" in event:
+            result.update(runId=event["runId"], lastCompletedStage=event["lastCompletedStage"])
+        return result
+
+    def _execute(self, job: Job) -> None:
+        """Run a job on a worker thread, recording stage progress from the pipeline's events."""
+        self._start(job)
+        self._save(job)
+        result = None
+        try:
+            for event in self.pipeline.stream_events(job.input, job.platform, job.depth, stream_stages=(),
+                                                     run_id=job.run_id):
+                if job.finished_at is not None:
+                    break  # already failed by shutdown
+                if self._progress(job, event):
+                    self._save(job)
+                result = self._outcome(job, event) or result
+        except Exception as e:
+            result = self._failure(job, str(e), "INTERNAL_ERROR")
+        if result is None:
+            result = self._failure(job, "Pipeline finished without a result", "INTERNAL_ERROR")
+        with self._lock:
+            self._running -= 1
+        self._finish(job, result)
+
+    async def _aexecute(self, job: Job) -> None:
+        """Run a job as a task on the event loop; store writes happen off the loop."""
+        started = False
+        try:
+            async with self._slots:
+                self._start(job)
+                started = True
+                await asyncio.to_thread(self._save, job)
+                result = None
+                try:
+                    async for event in self.pipeline.astream_events(job.input, job.platform, job.depth,
+                                                                    stream_stages=(), run_id=job.run_id):
+                        if self._progress(job, event):
+                            await asyncio.to_thread(self._save, job)
+                        result = self._outcome(job, event) or result
+                except Exception as e:
+                    result = self._failure(job, str(e), "INTERNAL_ERROR")
+                if result is None:
+                    result = self._failure(job, "Pipeline finished without a result", "INTERNAL_ERROR")
+                await asyncio.to_thread(self._finish, job, result)
+        finally:
+            with self._lock:
+                if started:
+                    self._running -= 1
+                else:
+                    self._pending -= 1
+
+    @staticmethod
+    def _failure(job: Job, error: str, code: str) -> Dict[str, Any]:
+        """Build a failed job's result; its ``runId`` resumes the run's checkpointed stages."""
+        return {
+            "success": False,
+            "error": error,
+            "code": code,
+            "input": job.input,
+            "platform": job.platform,
+            "runId": job.run_id
+        }
+
+    def _shutdown_failure(self, job: Job, started: bool) -> Dict[str, Any]:
+        """Build the result of a job cut short by shutdown."""
+        state = "finished" if started else "started"
+        return self._failure(job, f"Server shut down before the job {state}; submit it again", "SHUTDOWN")
+
+    def _finish(self, job: Job, result: Dict[str, Any]) -> None:
+        """Record a job's result and schedule its expiry (a job already failed by shutdown keeps that result)."""
+        with self._lock:
+            if job.finished_at is not None:
+                return
+            job.finished_at = time.time()
+        job.result = result
+        job.running_stages = []
+        job.expires_at = job.finished_at + self.ttl_seconds
+        job.status = "succeeded" if result.get("success") else "failed"
+        with self._lock:
+            self._expiry.append((job.expires_at, job.id))
+        self._save(job)
+        job.done.set()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Look up a job, in this process or (with a shared store) any other.
+
+        Args:
+            job_id: The id returned on submission
+
+        Returns:
+            The job, or None if it is unknown or expired
+        """
+        with self._lock:
+            self._purge()
+            job = self._jobs.get(job_id)
+        if job is None and self.store is not None:
+            data = self.store.load(job_id)
+            job = Job.from_dict(data) if data is not None else None
+        return job
+
+    def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """
+        Long-poll a job until it finishes or the timeout passes.
+
+        Jobs run by another process are re-read from the store every
+        ``poll_interval`` seconds.
+
+        Args:
+            job_id: The id returned on submission
+            timeout: Maximum seconds to wait
+
+        Returns:
+            The job (finished or not), or None if it is unknown or expired
+        """
+        deadline = time.monotonic() + timeout
+        job = self.get(job_id)
+        while job is not None and not job.done.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            with self._lock:
+                local = job_id in self._jobs
+            if local:
+                job.done.wait(remaining)
+                break
+            time.sleep(min(self.poll_interval, remaining))
+            job = self.get(job_id)
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the worker count and the number of queued, running and stored jobs."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queued": self._pending,
+                "running": self._running,
+                "stored": len(self._jobs)
+            }
+
+    def shutdown(self, wait: bool = True, timeout: Optional[float] = None) -> None:
+        """
+        Stop accepting work and, optionally, wait for queued and running jobs.
+
+        Jobs that have not finished when ``timeout`` runs out (or at once,
+        without ``wait``) are recorded as failed with code ``SHUTDOWN``, so
+        pollers see a final state instead of a job that never completes.
+
+        Args:
+            wait: Let queued and running jobs finish
+            timeout: Longest wait in seconds (None for no limit)
+        """
+        self._executor.shutdown(wait=False)
+        with self._lock:
+            futures = dict(self._futures)
+        if wait and futures:
+            wait_futures(list(futures.values()), timeout=timeout)
+        for job_id, future in futures.items():
+            job = self._jobs.get(job_id)
+            if future.done() or job is None or job.done.is_set():
+                continue
+            started = not future.cancel()
+            if not started:
+                with self._lock:
+                    self._pending -= 1
+            self._finish(job, self._shutdown_failure(job, started))
+
+    async def ashutdown(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait for the jobs queued with :meth:`asubmit`, then cancel those still unfinished.
+
+        Cancelled jobs are recorded as failed with code ``SHUTDOWN``, as in
+        :meth:`shutdown`, which is then applied to any thread-pool jobs.
+
+        Args:
+            timeout: Longest wait in seconds (None for no limit)
+        """
+        with self._lock:
+            tasks = dict(self._tasks)
+        if tasks:
+            await asyncio.wait(tasks.values(), timeout=timeout)
+        unfinished = [(self._jobs.get(job_id), task) for job_id, task in tasks.items() if not task.done()]
+        # Note which jobs had started before cancelling any, since a cancelled job frees its slot
+        failures = [(job, self._shutdown_failure(job, job.started_at is not None)) for job, _ in unfinished if job]
+        for _, task in unfinished:
+            task.cancel()
+        for job, result in failures:
+            await asyncio.to_thread(self._finish, job, result)
+        if unfinished:
+            await asyncio.gather(*(task for _, task in unfinished), return_exceptions=True)
+        await asyncio.to_thread(self.shutdown, False)
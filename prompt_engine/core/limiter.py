@@ -0,0 +1,206 @@
+"""
+Adaptive concurrency limiter with a token bucket and a bounded wait queue for upstream LLM calls
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from .metrics import (
+    UPSTREAM_CONCURRENCY_LIMIT, UPSTREAM_IN_FLIGHT, UPSTREAM_QUEUE_DEPTH, UPSTREAM_REJECTED
+)
+
+
+class OverloadedError(RuntimeError):
+    """Raised when an upstream call cannot be queued because the wait queue is full."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Return True for an upstream HTTP 429 (e.g. ``openai.RateLimitError``)."""
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+
+class _Waiter:
+    """A queued acquire call, woken through its own event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.future = loop.create_future()
+
+    def wake(self) -> None:
+        def resolve(future: "asyncio.Future[None]" = self.future) -> None:
+            if not future.done():
+                future.set_result(None)
+        self.loop.call_soon_threadsafe(resolve)
+
+
+class AdaptiveLimiter:
+    """
+    Bounds outstanding upstream calls with AIMD concurrency control.
+
+    Every call needs a token from a bucket refilled at ``rate`` per second
+    (bursts up to ``burst``) and one of ``limit`` concurrency slots. The
+    limit grows by roughly one per limit's worth of fast successes and is cut
+    multiplicatively on upstream 429s or calls slower than
+    ``latency_threshold``. Callers that cannot start wait in a FIFO queue of
+    at most ``max_queue`` entries; beyond that :class:`OverloadedError` is
+    raised immediately.
+    """
+
+    def __init__(self, rate: float = 50.0, burst: int = 50, initial_limit: int = 16,
+                 min_limit: int = 1, max_limit: int = 64, max_queue: int = 256,
+                 latency_threshold: float = 30.0, backoff: float = 0.5):
+        """
+        Initialize the limiter.
+
+        Args:
+            rate: Calls started per second on average (0 disables the token bucket)
+            burst: Token bucket capacity
+            initial_limit: Starting concurrency limit
+            min_limit: Lowest concurrency limit
+            max_limit: Highest concurrency limit
+            max_queue: Maximum calls waiting for a slot
+            latency_threshold: Calls slower than this (seconds) shrink the limit
+            backoff: Factor applied to the limit on an upstream 429
+        """
+        self.rate = rate
+        self.burst = burst
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.latency_threshold = latency_threshold
+        self.backoff = backoff
+        self.limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._in_flight = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._latency = 1.0
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.rate_limited = 0
+        self._publish()
+
+    def _publish(self) -> None:
+        UPSTREAM_CONCURRENCY_LIMIT.set(math.floor(self.limit))
+        UPSTREAM_IN_FLIGHT.set(self._in_flight)
+        UPSTREAM_QUEUE_DEPTH.set(len(self._waiters))
+
+    def _token_delay(self) -> float:
+        """Refill the bucket and return how long until a token is available (0 if one is)."""
+        if not self.rate:
+            return 0.0
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def _wake_head(self) -> None:
+        if self._waiters and self._in_flight < math.floor(self.limit):
+            self._waiters[0].wake()
+
+    def retry_after(self) -> float:
+        """Estimate the seconds until a newly queued call could start."""
+        slots = max(math.floor(self.limit), 1)
+        return max(1.0, math.ceil((len(self._waiters) + 1) * self._latency / slots))
+
+    def check(self) -> None:
+        """
+        Reject new work up front when the wait queue is already full.
+
+        Raises:
+            OverloadedError: If the queue is full
+        """
+        with self._lock:
+            if len(self._waiters) >= self.max_queue:
+                self.rejected += 1
+                UPSTREAM_REJECTED.inc()
+                raise OverloadedError("Upstream capacity exhausted, retry later", self.retry_after())
+
+    async def acquire(self) -> None:
+        """
+        Wait for a concurrency slot and a rate token.
+
+        Raises:
+            OverloadedError: If the call would have to queue and the queue is full
+        """
+        waiter: Optional[_Waiter] = None
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                with self._lock:
+                    delay = None
+                    at_head = not self._waiters or self._waiters[0] is waiter
+                    if at_head and self._in_flight < math.floor(self.limit):
+                        delay = self._token_delay()
+                        if delay == 0:
+                            if self.rate:
+                                self._tokens -= 1
+                            self._in_flight += 1
+                            if waiter is not None:
+                                self._waiters.popleft()
+                                waiter = None
+                            self._wake_head()
+                            self._publish()
+                            return
+                    if waiter is None:
+                        if len(self._waiters) >= self.max_queue:
+                            self.rejected += 1
+                            UPSTREAM_REJECTED.inc()
+                            raise OverloadedError("Upstream capacity exhausted, retry later", self.retry_after())
+                        waiter = _Waiter(loop)
+                        self._waiters.append(waiter)
+                        self._publish()
+                    elif waiter.future.done():
+                        waiter.future = loop.create_future()
+                    future = waiter.future
+                await asyncio.wait({future}, timeout=delay)
+        finally:
+            if waiter is not None:
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                    self._wake_head()
+                    self._publish()
+
+    def release(self, latency: float, error: Optional[BaseException] = None) -> None:
+        """
+        Free a slot and adapt the concurrency limit.
+
+        Args:
+            latency: Duration of the call in seconds
+            error: The call's exception, if it failed
+        """
+        with self._lock:
+            self._in_flight -= 1
+            if error is not None and is_rate_limit_error(error):
+                self.rate_limited += 1
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+            elif error is None:
+                self._latency = 0.8 * self._latency + 0.2 * latency
+                if latency > self.latency_threshold:
+                    self.limit = max(self.min_limit, self.limit * 0.9)
+                else:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._wake_head()
+            self._publish()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the current limit, load and rejection counters."""
+        with self._lock:
+            return {
+                "limit": math.floor(self.limit),
+                "inFlight": self._in_flight,
+                "queued": len(self._waiters),
+                "maxQueue": self.max_queue,
+                "rejected": self.rejected,
+                "rateLimited": self.rate_limited,
+                "avgLatencySeconds": round(self._latency, 3)
+            }
@@ -0,0 +1,254 @@
+"""
+Record/replay LLM backends for deterministic offline pipeline runs
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+
+from .context_compactor import estimate_tokens
+
+
+def is_chat_model(model_name: str) -> bool:
+    """Return True for OpenAI models served by the chat completions API."""
+    return "instruct" not in model_name and model_name not in ("babbage-002", "davinci-002")
+
+
+def _text(result: Any) -> str:
+    """Return the text of an LLM result (chat models return messages)."""
+    return result if isinstance(result, str) else result.content
+
+
+class CassetteMissError(LookupError):
+    """Raised when a replayed prompt was never recorded."""
+
+
+class Cassette:
+    """Append-only JSON Lines store of prompt to completion pairs with their recorded timings."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the cassette, loading any existing recordings.
+
+        Args:
+            path: JSON Lines file to read from and append to
+        """
+        self.path = path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry
+
+    @staticmethod
+    def make_key(prompt: str, stop: Optional[List[str]] = None) -> str:
+        """Return the lookup key for a prompt and its stop sequences."""
+        payload = json.dumps({"prompt": prompt, "stop": stop or []}, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, prompt: str, stop: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up a recording.
+
+        Args:
+            prompt: The exact prompt text
+            stop: Stop sequences the prompt was sent with
+
+        Returns:
+            The entry (``completion``, ``ttftMs``, ``durationMs``), or None if not recorded
+        """
+        with self._lock:
+            return self._entries.get(self.make_key(prompt, stop))
+
+    def record(self, prompt: str, completion: str, stop: Optional[List[str]] = None,
+               ttft_ms: Optional[float] = None, duration_ms: Optional[float] = None,
+               model: Optional[str] = None) -> None:
+        """
+        Store a completion and append it to the cassette file.
+
+        Args:
+            prompt: The exact prompt text
+            completion: The model's completion
+            stop: Stop sequences the prompt was sent with
+            ttft_ms: Measured time to first token, in milliseconds
+            duration_ms: Measured total completion time, in milliseconds
+            model: Model identifier, kept for reference
+        """
+        entry = {
+            "key": self.make_key(prompt, stop),
+            "prompt": prompt,
+            "stop": stop or [],
+            "completion": completion,
+            "ttftMs": ttft_ms,
+            "durationMs": duration_ms,
+            "model": model
+        }
+        with self._lock:
+            self._entries[entry["key"]] = entry
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class RecordingLLM(LLM):
+    """Passes calls through to a real LLM and records every completion to a cassette."""
+
+    llm: Any
+    cassette: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return "promptpad-recording"
+
+    @property
+    def model_name(self) -> str:
+        """Model identifier of the wrapped LLM."""
+        return getattr(self.llm, "model_name", None) or type(self.llm).__name__
+
+    @property
+    def temperature(self) -> Any:
+        return getattr(self.llm, "temperature", None)
+
+    @property
+    def max_tokens(self) -> Any:
+        return getattr(self.llm, "max_tokens", None)
+
+    def _record(self, prompt: str, completion: str, stop: Optional[List[str]],
+                started: float, first_token: Optional[float]) -> None:
+        finished = time.perf_counter()
+        self.cassette.record(
+            prompt, completion, stop,
+            ttft_ms=1000 * ((first_token or finished) - started),
+            duration_ms=1000 * (finished - started),
+            model=self.model_name
+        )
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> str:
+        started = time.perf_counter()
+        completion = _text(self.llm.invoke(prompt, stop=stop, **kwargs))
+        self._record(prompt, completion, stop, started, None)
+        return completion
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None,
+                     **kwargs: Any) -> str:
+        started = time.perf_counter()
+        completion = _text(await self.llm.ainvoke(prompt, stop=stop, **kwargs))
+        self._record(prompt, completion, stop, started, None)
+        return completion
+
+    async def _astream(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None,
+                       **kwargs: Any) -> AsyncIterator[GenerationChunk]:
+        started = time.perf_counter()
+        first_token = None
+        parts = []
+        try:
+            async for chunk in self.llm.astream(prompt, stop=stop, **kwargs):
+                chunk = _text(chunk)
+                if first_token is None:
+                    first_token = time.perf_counter()
+                parts.append(chunk)
+                if run_manager:
+                    await run_manager.on_llm_new_token(chunk)
+                yield GenerationChunk(text=chunk)
+        except GeneratorExit:
+            # The caller stopped reading early (e.g. a stage cut the generation); record what it received
+            self._record(prompt, "".join(parts), stop, started, first_token)
+            raise
+        self._record(prompt, "".join(parts), stop, started, first_token)
+
+
+class ReplayLLM(LLM):
+    """
+    Serves completions from a cassette without network access.
+
+    Latency is simulated: the first chunk arrives after ``ttft_ms`` and the
+    rest at ``tokens_per_second``. Either left as None falls back to the
+    timings measured when the completion was recorded.
+    """
+
+    cassette: Any
+    ttft_ms: Optional[float] = None
+    tokens_per_second: Optional[float] = None
+    model_name: str = "replay"
+
+    @property
+    def _llm_type(self) -> str:
+        return "promptpad-replay"
+
+    def _lookup(self, prompt: str, stop: Optional[List[str]]) -> Dict[str, Any]:
+        entry = self.cassette.get(prompt, stop)
+        if entry is None:
+            raise CassetteMissError(
+                f"No recorded completion for prompt (key {Cassette.make_key(prompt, stop)[:12]}) "
+                f"in {self.cassette.path}"
+            )
+        return entry
+
+    def _chunks(self, completion: str) -> List[str]:
+        """Split a completion into roughly token-sized chunks, keeping whitespace attached."""
+        chunks, current = [], ""
+        for char in completion:
+            current += char
+            if len(current) >= 4 and char.isspace():
+                chunks.append(current)
+                current = ""
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _timings(self, entry: Dict[str, Any]) -> Tuple[float, float]:
+        """Return the time to first token and the time per later token, in seconds."""
+        ttft_ms = self.ttft_ms if self.ttft_ms is not None else entry.get("ttftMs") or 0.0
+        if self.tokens_per_second:
+            return ttft_ms / 1000, 1.0 / self.tokens_per_second
+        generation_ms = max((entry.get("durationMs") or 0.0) - ttft_ms, 0.0)
+        return ttft_ms / 1000, generation_ms / 1000 / max(estimate_tokens(entry["completion"]), 1)
+
+    def _delays(self, entry: Dict[str, Any]) -> List[Tuple[str, float]]:
+        """Pair each chunk of a recorded completion with the delay before it is emitted."""
+        ttft, per_token = self._timings(entry)
+        return [(chunk, ttft if i == 0 else per_token * estimate_tokens(chunk))
+                for i, chunk in enumerate(self._chunks(entry["completion"]))]
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> str:
+        entry = self._lookup(prompt, stop)
+        time.sleep(sum(delay for _, delay in self._delays(entry)))
+        return entry["completion"]
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None,
+                     **kwargs: Any) -> str:
+        entry = self._lookup(prompt, stop)
+        await asyncio.sleep(sum(delay for _, delay in self._delays(entry)))
+        return entry["completion"]
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None,
+                **kwargs: Any) -> Iterator[GenerationChunk]:
+        for chunk, delay in self._delays(self._lookup(prompt, stop)):
+            time.sleep(delay)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk)
+            yield GenerationChunk(text=chunk)
+
+    async def _astream(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None,
+                       **kwargs: Any) -> AsyncIterator[GenerationChunk]:
+        for chunk, delay in self._delays(self._lookup(prompt, stop)):
+            await asyncio.sleep(delay)
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk)
+            yield GenerationChunk(text=chunk)
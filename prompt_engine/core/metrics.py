@@ -0,0 +1,414 @@
+"""
+In-process metrics with Prometheus text exposition, no external collector required
+"""
+
+import bisect
+import glob
+import json
+import math
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base for a named metric family with a fixed set of label names."""
+
+    TYPE = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues, extra: Sequence[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def snapshot(self) -> List[List[Any]]:
+        """Return the family's values as JSON-serializable ``[label values, value]`` pairs."""
+        with self._lock:
+            return [[list(key), self._copy(value)] for key, value in self._values.items()]
+
+    def _merged(self, snapshots: Iterable[List[List[Any]]]) -> Dict[LabelValues, Any]:
+        """Return this process's values summed with other processes' snapshots."""
+        with self._lock:
+            values = {key: self._copy(value) for key, value in self._values.items()}
+        for snapshot in snapshots:
+            for key, value in snapshot:
+                key = tuple(key)
+                values[key] = self._add(values[key], value) if key in values else self._copy(value)
+        return values
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        return value
+
+    @staticmethod
+    def _add(value: Any, other: Any) -> Any:
+        return value + other
+
+    def samples(self, snapshots: Iterable[List[List[Any]]] = ()) -> List[str]:
+        """Return the family's sample lines, summed with other processes' snapshots."""
+        return [f"{self.name}{self._labels(key)} {_format_value(value)}"
+                for key, value in sorted(self._merged(snapshots).items())]
+
+    def expose(self, snapshots: Iterable[List[List[Any]]] = ()) -> str:
+        """Render the family in the text exposition format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        lines.extend(self.samples(snapshots))
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    TYPE = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: object) -> None:
+        """Increase the counter for a label set."""
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: object) -> float:
+        """Return the current value for a label set."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Value per label set that can go up and down."""
+
+    TYPE = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: object) -> None:
+        """Increase the gauge for a label set."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: object) -> None:
+        """Decrease the gauge for a label set."""
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: object) -> None:
+        """Set the gauge for a label set."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels: object) -> float:
+        """Return the current value for a label set."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observations per label set."""
+
+    TYPE = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        """Record an observation for a label set."""
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            total[0] += value
+
+    def count(self, **labels: object) -> int:
+        """Return the number of observations for a label set."""
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return sum(entry[0]) if entry else 0
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        counts, total = value
+        return list(counts), list(total)
+
+    @staticmethod
+    def _add(value: Any, other: Any) -> Any:
+        counts, total = value
+        return [a + b for a, b in zip(counts, other[0])], [total[0] + other[1][0]]
+
+    def samples(self, snapshots: Iterable[List[List[Any]]] = ()) -> List[str]:
+        lines = []
+        for key, (counts, total) in sorted(self._merged(snapshots).items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{self._labels(key, [('le', _format_value(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric '{metric.name}' is already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create (or return the already registered) counter."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Create (or return the already registered) gauge."""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        """Create (or return the already registered) histogram."""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """Return a registered metric family by name."""
+        return self._metrics.get(name)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return every family's type and values in JSON-serializable form (see :meth:`render`)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: {"type": metric.TYPE, "values": metric.snapshot()} for metric in metrics}
+
+    def render(self, snapshots: Iterable[Dict[str, Dict[str, Any]]] = ()) -> str:
+        """
+        Render every metric family in the Prometheus text exposition format.
+
+        Args:
+            snapshots: Other processes' :meth:`snapshot` results; their values
+                are added to this process's (gauges too, e.g. requests in flight)
+
+        Returns:
+            Exposition text (version 0.0.4)
+        """
+        snapshots = list(snapshots)
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(
+            metric.expose([snapshot[metric.name]["values"] for snapshot in snapshots if metric.name in snapshot])
+            for metric in metrics
+        ) + "\n"
+
+
+class SharedMetrics:
+    """
+    Shares a registry's metrics between worker processes through snapshot files.
+
+    Each process writes its snapshot to ``<directory>/<pid>.json`` every
+    ``flush_interval`` seconds and whenever it is scraped; :meth:`render`
+    adds every other process's latest snapshot to its own values, so any
+    worker can answer a scrape for all of them. Counters and histograms of
+    exited workers are kept; their gauges are dropped (:meth:`mark_dead`).
+    """
+
+    def __init__(self, directory: str, registry: MetricsRegistry, flush_interval: float = 5.0):
+        """
+        Initialize the exchange.
+
+        Args:
+            directory: Directory shared by the worker processes
+            registry: The registry to share
+            flush_interval: Seconds between background snapshot writes
+        """
+        self.directory = directory
+        self.registry = registry
+        self.flush_interval = flush_interval
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def reset(directory: str) -> None:
+        """Delete every snapshot file, e.g. when the server starts."""
+        for path in glob.glob(os.path.join(directory, "*.json")):
+            os.remove(path)
+
+    @staticmethod
+    def _write(path: str, snapshot: Dict[str, Dict[str, Any]]) -> None:
+        """Replace a snapshot file atomically, so readers never see a partial write."""
+        temporary = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(temporary, path)
+
+    @classmethod
+    def mark_dead(cls, directory: str, pid: int) -> None:
+        """
+        Drop an exited process's gauges, keeping its counters and histograms.
+
+        Args:
+            directory: The shared snapshot directory
+            pid: The exited process
+        """
+        path = os.path.join(directory, f"{pid}.json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return
+        cls._write(path, {name: family for name, family in snapshot.items() if family["type"] != "gauge"})
+
+    def flush(self) -> None:
+        """Write this process's current snapshot."""
+        self._write(os.path.join(self.directory, f"{os.getpid()}.json"), self.registry.snapshot())
+
+    def render(self) -> str:
+        """
+        Render the metrics of every process sharing the directory.
+
+        Returns:
+            Exposition text (version 0.0.4)
+        """
+        self.flush()
+        own = os.path.join(self.directory, f"{os.getpid()}.json")
+        snapshots = []
+        for path in glob.glob(os.path.join(self.directory, "*.json")):
+            if path == own:
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # removed or replaced while listing
+        return self.registry.render(snapshots)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError:
+                pass  # retried on the next interval
+
+    def start(self) -> None:
+        """Start writing snapshots in the background (call in each worker, after forking)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="promptpad-metrics", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background writer and leave a final snapshot without gauges."""
+        self._stopped.set()
+        self.flush()
+        self.mark_dead(self.directory, os.getpid())
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_LATENCY = REGISTRY.histogram(
+    "promptpad_stage_duration_seconds", "Pipeline stage latency, including cache lookups.",
+    ("stage", "platform")
+)
+STAGE_CALLS = REGISTRY.counter(
+    "promptpad_stage_calls_total", "Pipeline stage calls by outcome (success, error, cancelled).",
+    ("stage", "platform", "status")
+)
+STAGE_INPUT_TOKENS = REGISTRY.histogram(
+    "promptpad_stage_input_tokens", "Estimated prompt tokens sent per stage call.",
+    ("stage", "platform"), TOKEN_BUCKETS
+)
+STAGE_OUTPUT_TOKENS = REGISTRY.histogram(
+    "promptpad_stage_output_tokens", "Estimated completion tokens returned per stage call.",
+    ("stage", "platform"), TOKEN_BUCKETS
+)
+STAGE_RETRIES = REGISTRY.counter(
+    "promptpad_stage_retries_total", "Stage LLM calls retried after a transient failure.",
+    ("stage",)
+)
+STAGE_HEDGES = REGISTRY.counter(
+    "promptpad_stage_hedges_total", "Hedge outcomes for slow stage calls (won, lost, failed: both calls failed, denied by budget).",
+    ("stage", "result")
+)
+STAGE_CACHE_LOOKUPS = REGISTRY.counter(
+    "promptpad_stage_cache_lookups_total", "Stage cache lookups by result (hit, miss).",
+    ("stage", "result")
+)
+SIMILARITY_LOOKUPS = REGISTRY.counter(
+    "promptpad_similarity_lookups_total", "Near-duplicate context analysis lookups by result (hit, miss).",
+    ("result",)
+)
+UPSTREAM_CONCURRENCY_LIMIT = REGISTRY.gauge(
+    "promptpad_upstream_concurrency_limit", "Current adaptive limit on concurrent upstream LLM calls."
+)
+UPSTREAM_IN_FLIGHT = REGISTRY.gauge(
+    "promptpad_upstream_in_flight", "Upstream LLM calls in progress."
+)
+UPSTREAM_QUEUE_DEPTH = REGISTRY.gauge(
+    "promptpad_upstream_queue_depth", "Upstream LLM calls waiting for a concurrency slot or rate token."
+)
+UPSTREAM_REJECTED = REGISTRY.counter(
+    "promptpad_upstream_rejected_total", "Upstream LLM calls or requests rejected because the wait queue was full."
+)
+COALESCED_REQUESTS = REGISTRY.counter(
+    "promptpad_coalesced_requests_total", "Pipeline runs that attached to an identical run already in flight.",
+    ("platform",)
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "promptpad_http_request_duration_seconds", "HTTP request latency until the response starts.",
+    ("method", "route", "status")
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "promptpad_http_requests_in_flight", "HTTP requests being handled, including open streams.",
+    ("route",)
+)
+HTTP_STREAM_DURATION = REGISTRY.histogram(
+    "promptpad_http_stream_duration_seconds", "Duration of streamed HTTP responses until the stream closes.",
+    ("route",)
+)
@@ -2,144 +2,785 @@
 Main pipeline orchestrator for the PromptPad framework
 """
 
-from typing import Dict, Any
-from langchain_openai import OpenAI
+import asyncio
+import uuid
+from typing import Dict, Any, AsyncIterable, AsyncIterator, Iterable, Iterator, List, Optional, Tuple, Union
+from langchain_openai import ChatOpenAI, OpenAI
+from langchain_core.runnables import RunnableLambda
+
+from prompt_engine.config import Settings
 
 from .context_analyzer import ContextAnalyzer
 from .intent_interpreter import IntentInterpreter
 from .prompt_generator import PromptGenerator
 from .prompt_enhancer import PromptEnhancer
 from .prompt_refiner import PromptRefiner
-from .platform_templates import PlatformTemplates
+from .insight_extractor import InsightExtractor
+from .prompt_polisher import PromptPolisher
+from .prompt_composer import PromptComposer
+from .platform_registry import PlatformRegistry, default_registry
+from .cache import StageCache
+from .checkpoints import CheckpointStore
+from .http_client import LLMConnectionPool
+from .limiter import AdaptiveLimiter, OverloadedError
+from .resilience import HedgeBudget, RetryPolicy
+from .llm import Cassette, RecordingLLM, ReplayLLM, is_chat_model
+from .metrics import COALESCED_REQUESTS
+from .similarity import MinHashIndex, normalize_input
+from .singleflight import SingleFlight
+from .context_compactor import CompactContext
+from .graph import ComputeNode, StageGraph, StageNode
+from .runtime import run_sync, iter_sync
 
 
 class PromptPipeline:
     """Orchestrates the complete prompt generation pipeline."""
     
-    def __init__(self, temperature: float = 0.2):
+    PROFILES = {
+        "full": ("context", "intent", "generate", "enhance", "refine"),
+        "balanced": ("insight", "generate", "polish"),
+        "fast": ("insight", "compose")
+    }
+    
+    # Classification-style stages routed to FAST_MODEL_NAME when it is set
+    FAST_STAGES = ("context", "intent", "insight", "refine")
+    
+    # Per-stage sampling defaults: deterministic structured extraction, and
+    # completion budgets sized to each stage's output
+    STAGE_DEFAULTS = {
+        "context": {"temperature": 0.0, "max_tokens": 256},
+        "intent": {"max_tokens": 512},
+        "insight": {"temperature": 0.0, "max_tokens": 768},
+        "generate": {"max_tokens": 1024},
+        "enhance": {"max_tokens": 1536},
+        "refine": {"max_tokens": 1536},
+        "polish": {"max_tokens": 1536},
+        "compose": {"max_tokens": 1536}
+    }
+    
+    STAGE_MESSAGES = {
+        "context": "Analyzing context for {platform}...",
+        "intent": "Extracting intent...",
+        "insight": "Analyzing context and intent for {platform}...",
+        "generate": "Generating base prompt...",
+        "enhance": "Enhancing prompt...",
+        "refine": "Refining prompt...",
+        "polish": "Enhancing and refining prompt...",
+        "compose": "Composing prompt..."
+    }
+    
+    def __init__(self, temperature: float = 0.2, settings: Optional[Settings] = None, llm=None):
         """
         Initialize the pipeline with all components.
         
         Args:
-            temperature: Temperature setting for the LLM (default: 0.2 for consistency)
+            temperature: Default temperature for stages without a STAGE_DEFAULTS or STAGE_<NAME>_TEMPERATURE value
+            settings: Application settings (loaded from the environment if omitted)
+            llm: LLM shared by all stages, bypassing per-stage model routing
+                 (default: one LLM per stage, built from the LLM_BACKEND and model settings)
+        """
+        self.settings = settings or Settings()
+        self.temperature = temperature
+        self.platforms = self._create_platform_registry(self.settings)
+        self.cache = self._create_cache(self.settings)
+        self.checkpoints = self._create_checkpoint_store(self.settings)
+        self.connection_pool = None
+        self.cassette = None
+        if llm is None and self.settings.llm_backend != "replay":
+            self.connection_pool = self._create_connection_pool(self.settings)
+        if llm is None and self.settings.llm_backend != "openai":
+            self.cassette = Cassette(self.settings.llm_cassette_path)
+        self._llms: Dict[Tuple[Optional[str], float, Optional[int]], Any] = {}
+        self.llm = llm or self._llm_for(self.settings.model_name, temperature, None)
+        self.similarity_index = self._create_similarity_index(self.settings)
+        self.single_flight = SingleFlight() if self.settings.coalesce_enabled else None
+        self.limiter = self._create_limiter(self.settings)
+        self.hedge_budget = self._create_hedge_budget(self.settings)
+        stage_llm = (lambda stage: llm) if llm is not None else self._stage_llm
+        options = self._stage_options
+        self.context_analyzer = ContextAnalyzer(stage_llm("context"), self.cache, self.similarity_index,
+                                                **options("context"))
+        self.interpreter = IntentInterpreter(stage_llm("intent"), self.cache, **options("intent"))
+        self.generator = PromptGenerator(stage_llm("generate"), self.cache, **options("generate"))
+        self.enhancer = PromptEnhancer(stage_llm("enhance"), self.cache, **options("enhance"))
+        self.refiner = PromptRefiner(stage_llm("refine"), self.cache, **options("refine"))
+        self.insight_extractor = InsightExtractor(stage_llm("insight"), self.cache, **options("insight"))
+        self.polisher = PromptPolisher(stage_llm("polish"), self.cache, **options("polish"))
+        self.composer = PromptComposer(stage_llm("compose"), self.cache, **options("compose"))
+        self._graphs: Dict[Tuple[str, str, int], StageGraph] = {}
+    
+    def _stage_llm(self, stage: str):
+        """
+        Return the LLM a stage is routed to.
+        
+        The model is STAGE_<NAME>_MODEL, else FAST_MODEL_NAME for the stages
+        in FAST_STAGES, else MODEL_NAME. Temperature and max tokens come from
+        STAGE_<NAME>_TEMPERATURE and STAGE_<NAME>_MAX_TOKENS, falling back to
+        STAGE_DEFAULTS and then the pipeline temperature.
+        
+        Args:
+            stage: Stage name
+            
+        Returns:
+            The LLM instance (shared by every stage with the same configuration)
+        """
+        settings = self.settings
+        defaults = self.STAGE_DEFAULTS.get(stage, {})
+        model_name = settings.stage_models.get(stage) or (
+            settings.fast_model_name if stage in self.FAST_STAGES and settings.fast_model_name else settings.model_name
+        )
+        temperature = settings.stage_temperatures.get(stage, defaults.get("temperature", self.temperature))
+        max_tokens = settings.stage_max_tokens.get(stage, defaults.get("max_tokens"))
+        return self._llm_for(model_name, temperature, max_tokens)
+    
+    def _llm_for(self, model_name: Optional[str], temperature: float, max_tokens: Optional[int]):
+        """Return the (memoized) LLM for a model configuration."""
+        key = (model_name, temperature, max_tokens)
+        llm = self._llms.get(key)
+        if llm is None:
+            llm = self._create_llm(self.settings, temperature, self.connection_pool,
+                                   model_name=model_name, max_tokens=max_tokens, cassette=self.cassette)
+            self._llms[key] = llm
+        return llm
+    
+    def _stage_options(self, stage: str) -> Dict[str, Any]:
+        """
+        Build the keyword arguments shared by every stage constructor.
+        
+        Args:
+            stage: Stage name
+            
+        Returns:
+            The stage's request timeout (STAGE_<NAME>_TIMEOUT_SECONDS or
+            LLM_TIMEOUT_SECONDS), its retry policy, and the pipeline's
+            upstream limiter and hedge budget
+        """
+        settings = self.settings
+        return {
+            "timeout": settings.stage_timeouts.get(stage, settings.llm_timeout_seconds),
+            "limiter": self.limiter,
+            "retry_policy": RetryPolicy(
+                max_attempts=settings.stage_retry_max_attempts.get(stage, settings.retry_max_attempts),
+                base_delay=settings.retry_base_delay_seconds,
+                max_delay=settings.retry_max_delay_seconds
+            ),
+            "hedge_budget": self.hedge_budget
+        }
+    
+    @staticmethod
+    def _create_hedge_budget(settings: Settings) -> Optional[HedgeBudget]:
+        """
+        Build the budget shared by all stages for hedged calls.
+        
+        Args:
+            settings: Application settings
+            
+        Returns:
+            The hedge budget, or None when hedging is disabled
         """
-        self.llm = OpenAI(temperature=temperature)
-        self.context_analyzer = ContextAnalyzer(self.llm)
-        self.interpreter = IntentInterpreter(self.llm)
-        self.generator = PromptGenerator(self.llm)
-        self.enhancer = PromptEnhancer(self.llm)
-        self.refiner = PromptRefiner(self.llm)
+        if not settings.hedge_enabled:
+            return None
+        return HedgeBudget(
+            ratio=settings.hedge_budget_ratio,
+            quantile=settings.hedge_quantile,
+            min_samples=settings.hedge_min_samples
+        )
     
-    def _validate_platform(self, platform: str) -> str:
+    @staticmethod
+    def _create_limiter(settings: Settings) -> Optional[AdaptiveLimiter]:
         """
-        Validate the platform parameter.
+        Build the upstream concurrency limiter described by the settings.
         
         Args:
-            platform: The platform to validate
+            settings: Application settings
             
         Returns:
-            The validated platform string
+            The limiter, or None when limiting is disabled
+        """
+        if not settings.limiter_enabled:
+            return None
+        return AdaptiveLimiter(
+            rate=settings.limiter_rate_per_second,
+            burst=settings.limiter_burst,
+            initial_limit=settings.limiter_initial_concurrency,
+            min_limit=settings.limiter_min_concurrency,
+            max_limit=settings.limiter_max_concurrency,
+            max_queue=settings.limiter_max_queue,
+            latency_threshold=settings.limiter_latency_threshold_seconds
+        )
+    
+    @staticmethod
+    def _create_connection_pool(settings: Settings) -> LLMConnectionPool:
+        """
+        Build the keep-alive connection pool shared by every stage and request.
+        
+        Args:
+            settings: Application settings
+            
+        Returns:
+            The connection pool
+        """
+        return LLMConnectionPool(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry_seconds,
+            connect_timeout=settings.llm_connect_timeout_seconds,
+            timeout=settings.llm_timeout_seconds,
+            http2=settings.llm_http2
+        )
+    
+    @staticmethod
+    def _create_llm(settings: Settings, temperature: float, pool: Optional[LLMConnectionPool] = None,
+                    model_name: Optional[str] = None, max_tokens: Optional[int] = None,
+                    cassette: Optional[Cassette] = None):
+        """
+        Build the LLM backend described by the settings.
+        
+        ``openai`` calls the API, ``record`` calls the API and appends every
+        prompt and completion to the cassette, and ``replay`` serves the
+        cassette offline with simulated latency. Chat models go through the
+        chat completions API.
+        
+        Args:
+            settings: Application settings
+            temperature: Temperature setting for the LLM
+            pool: Connection pool for the OpenAI clients
+            model_name: Model to call (default: MODEL_NAME)
+            max_tokens: Completion token limit (default: the client's)
+            cassette: Cassette to record to or replay from (default: LLM_CASSETTE_PATH)
+            
+        Returns:
+            The LLM instance
+        """
+        model_name = model_name or settings.model_name
+        if cassette is None and settings.llm_backend != "openai":
+            cassette = Cassette(settings.llm_cassette_path)
+        if settings.llm_backend == "replay":
+            return ReplayLLM(
+                cassette=cassette,
+                ttft_ms=settings.llm_replay_ttft_ms,
+                tokens_per_second=settings.llm_replay_tokens_per_second
+            )
+        # Retries are handled per stage (RetryPolicy), not inside the OpenAI client
+        options: Dict[str, Any] = {
+            "temperature": temperature,
+            "request_timeout": settings.llm_timeout_seconds,
+            "max_retries": 0
+        }
+        if max_tokens is not None:
+            options["max_tokens"] = max_tokens
+        if pool is not None:
+            options.update(http_client=pool.client, http_async_client=pool.async_client)
+        if model_name and is_chat_model(model_name):
+            llm = ChatOpenAI(model_name=model_name, **options)
+        elif model_name:
+            llm = OpenAI(model_name=model_name, **options)
+        else:
+            llm = OpenAI(**options)
+        if settings.llm_backend == "record":
+            return RecordingLLM(llm=llm, cassette=cassette)
+        return llm
+    
+    @staticmethod
+    def _create_platform_registry(settings: Settings) -> PlatformRegistry:
+        """
+        Build the platform registry described by the settings.
+        
+        Args:
+            settings: Application settings
+            
+        Returns:
+            The registry for PLATFORMS_PATH, or the shared bundled registry
+        """
+        reload_interval = settings.platforms_reload_interval_seconds
+        if not settings.platforms_path:
+            registry = default_registry()
+            registry.reload_interval = reload_interval
+            return registry
+        return PlatformRegistry(settings.platforms_path, reload_interval=reload_interval)
+    
+    @staticmethod
+    def _create_cache(settings: Settings) -> Optional[StageCache]:
+        """
+        Build the stage cache described by the settings.
+        
+        Args:
+            settings: Application settings
+            
+        Returns:
+            The stage cache, or None when caching is disabled
+        """
+        if not settings.cache_enabled:
+            return None
+        return StageCache(
+            max_entries=settings.cache_max_entries,
+            ttl_seconds=settings.cache_ttl_seconds,
+            path=settings.cache_path or None,
+            max_disk_entries=settings.cache_max_disk_entries
+        )
+    
+    @staticmethod
+    def _create_checkpoint_store(settings: Settings) -> Optional[CheckpointStore]:
+        """
+        Build the stage checkpoint store described by the settings.
+        
+        Args:
+            settings: Application settings
+            
+        Returns:
+            The checkpoint store, or None when checkpointing is disabled
+        """
+        if not settings.checkpoint_enabled:
+            return None
+        return CheckpointStore(ttl_seconds=settings.checkpoint_ttl_seconds, path=settings.checkpoint_path or None)
+    
+    @staticmethod
+    def _create_similarity_index(settings: Settings) -> Optional[MinHashIndex]:
+        """
+        Build the near-duplicate input index described by the settings.
+        
+        Args:
+            settings: Application settings
+            
+        Returns:
+            The similarity index, or None when near-duplicate reuse is disabled
+        """
+        if not settings.similarity_enabled:
+            return None
+        return MinHashIndex(
+            threshold=settings.similarity_threshold,
+            max_entries=settings.similarity_max_entries
+        )
+    
+    def _validate_depth(self, depth: str) -> str:
+        """
+        Validate the pipeline profile.
+        
+        Args:
+            depth: The profile name to validate
+            
+        Returns:
+            The validated profile name
             
         Raises:
-            ValueError: If platform is not valid
+            ValueError: If the profile is not known
         """
-        if platform not in PlatformTemplates.PLATFORMS:
-            raise ValueError(f"Invalid platform '{platform}'. Valid options: {', '.join(PlatformTemplates.PLATFORMS)}")
-        return platform
+        if not isinstance(depth, str) or depth not in self.PROFILES:
+            raise ValueError(f"Invalid depth '{depth}'. Valid options: {', '.join(self.PROFILES)}")
+        return depth
+    
+    def _platform_values(self, platform: str, user_input: str) -> Dict[str, Any]:
+        """Look up the platform context and render the platform prompt template."""
+        entry = self.platforms.lookup(platform)[0]
+        return {"platform_context": entry.context, "platform_template": entry.render(user_input)}
     
-    def _setup_context(self, user_input: str, platform: str) -> Dict[str, Any]:
+    @staticmethod
+    def _attach_platform(analysis: Dict[str, str], platform: str, platform_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine the context analysis with the platform information, ready for compact serialization."""
+        return {"context_analysis": CompactContext(analysis, platform=platform, platform_context=platform_context)}
+    
+    @staticmethod
+    def _assemble_base_prompt(platform_template: str, generated_prompt: str) -> Dict[str, str]:
+        """Prefix the generated prompt with the platform template."""
+        return {"base_prompt": platform_template + "\n\n" + generated_prompt}
+    
+    def _build_graph(self, depth: str) -> StageGraph:
         """
-        Set up the context analysis with platform information.
+        Declare the stage graph for a pipeline profile.
         
         Args:
-            user_input: The raw user input to process
-            platform: The target platform for customization
+            depth: Pipeline profile
             
         Returns:
-            Dictionary containing the context analysis
+            The profile's stage graph
         """
-        # Get platform context
-        platform_context = PlatformTemplates.get_platform_context(platform)
+        analyzer = self.context_analyzer
+        nodes = [
+            ComputeNode("platform", ("platform", "user_input"), ("platform_context", "platform_template"),
+                        self._platform_values),
+            ComputeNode("attach_platform", ("analysis", "platform", "platform_context"), ("context_analysis",),
+                        self._attach_platform)
+        ]
+        aliases = {}
         
-        # Analyze context with platform consideration
-        context_analysis = self.context_analyzer.analyze(user_input)
-        context_analysis["platform"] = platform
-        context_analysis["platform_context"] = platform_context
+        if depth == "full":
+            nodes += [
+                StageNode(analyzer, ("user_input",), ("analysis",),
+                          reuse=lambda inputs: analyzer.find_similar(inputs["user_input"]),
+                          remember=lambda inputs, analysis: analyzer.remember(inputs["user_input"], analysis)),
+                StageNode(self.interpreter, ("user_input", "context_analysis"), ("intent",))
+            ]
+        else:
+            nodes.append(
+                StageNode(self.insight_extractor, ("user_input",), ("analysis", "intent"),
+                          unpack=lambda insight: {"analysis": insight["context"], "intent": insight["intent"]},
+                          remember=lambda inputs, insight: analyzer.remember(inputs["user_input"], insight["context"]))
+            )
         
-        return context_analysis
+        if depth == "fast":
+            nodes.append(StageNode(self.composer, ("platform_template", "intent", "context_analysis"), ("prompt",)))
+            aliases = {"base_prompt": "platform_template", "enhanced_prompt": "prompt"}
+        else:
+            nodes += [
+                StageNode(self.generator, ("intent", "context_analysis"), ("generated_prompt",)),
+                ComputeNode("assemble_base_prompt", ("platform_template", "generated_prompt"), ("base_prompt",),
+                            self._assemble_base_prompt)
+            ]
+            if depth == "full":
+                nodes += [
+                    StageNode(self.enhancer, ("base_prompt", "context_analysis"), ("enhanced_prompt",)),
+                    StageNode(self.refiner, ("enhanced_prompt",), ("prompt",))
+                ]
+            else:
+                nodes.append(StageNode(self.polisher, ("base_prompt", "context_analysis"), ("prompt",)))
+                aliases = {"enhanced_prompt": "prompt"}
+        
+        return StageGraph(nodes, inputs=("user_input", "platform"), aliases=aliases)
     
-    def run(self, user_input: str, platform: str) -> Dict[str, Any]:
+    def graph_for(self, depth: str, platform: str) -> StageGraph:
         """
-        Execute the complete prompt generation pipeline with platform customization.
+        Return the (memoized) stage graph for a profile and platform.
+        
+        Stages listed in the platform's ``skip_stages`` are dropped, with
+        their outputs aliased to the values they would have refined. Graphs
+        are rebuilt after the platform registry reloads.
+        
+        Args:
+            depth: Pipeline profile
+            platform: Target platform
+            
+        Returns:
+            The stage graph
+            
+        Raises:
+            ValueError: If the profile or platform is not valid
+        """
+        self._validate_depth(depth)
+        entry, version = self.platforms.lookup(platform)
+        key = (depth, platform, version)
+        graph = self._graphs.get(key)
+        if graph is None:
+            if any(cached[2] != version for cached in self._graphs):
+                self._graphs = {}
+            graph = self._build_graph(depth)
+            for name, aliases in entry.skip_stages.items():
+                if name in graph.nodes:
+                    graph = graph.without(name, aliases)
+            self._graphs[key] = graph
+        return graph
+    
+    def stream_events(self, user_input: str, platform: str, depth: Optional[str] = None,
+                      stream_stages: Optional[Iterable[str]] = None,
+                      run_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream typed pipeline events.
+        
+        Synchronous wrapper around :meth:`astream_events`.
+        
+        Args:
+            user_input: The raw user input to process
+            platform: The target platform for customization
+            depth: Pipeline profile, one of ``full``, ``balanced`` or ``fast`` (default: PIPELINE_DEPTH)
+            stream_stages: Names of stages whose tokens are forwarded (default: all)
+            run_id: Id for the run; a failed run's id resumes it from its checkpoints (default: a new id)
+            
+        Yields:
+            Event dictionaries
+        """
+        yield from iter_sync(self.astream_events(user_input, platform, depth, stream_stages, run_id))
+    
+    async def astream_events(self, user_input: str, platform: str, depth: Optional[str] = None,
+                             stream_stages: Optional[Iterable[str]] = None,
+                             run_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute the pipeline, yielding typed events as it progresses.
         
-        The pipeline consists of 5 stages:
+        The ``full`` profile consists of 5 stages:
         1. Analyze context and requirements
         2. Extract comprehensive intent
         3. Generate detailed base prompt
         4. Enhance with specificity and depth
         5. Refine for clarity and effectiveness
         
+        The ``balanced`` profile fuses 1+2 (``insight``) and 4+5 (``polish``) for
+        three LLM calls; the ``fast`` profile fuses 1+2 and 3+4+5 (``compose``)
+        for two. Every profile returns the same result fields.
+        
+        Stages run from the profile's :class:`StageGraph` (see :meth:`graph_for`),
+        so nodes whose inputs are ready run concurrently.
+        
+        Every event is a dictionary with an ``event`` key:
+        - ``stage_start``: ``stage`` (any graph node)
+        - ``token``: ``stage``, ``text`` (only for stages in ``stream_stages``)
+        - ``stage_end``: ``stage``, ``output`` (the node's output values)
+        - ``final``: ``result`` (the same dictionary :meth:`arun` returns)
+        - ``error``: ``error``, plus ``runId`` and ``lastCompletedStage`` when
+          checkpointing is enabled and the run's stages had started
+        
+        With checkpointing (CHECKPOINT_ENABLED) every completed LLM stage's
+        outputs are stored under the run's ``runId``. Passing that id back
+        as ``run_id`` with the same input, platform and profile skips the
+        stages that already completed, so a retry after a failure only pays
+        for the stages that did not.
+        
+        Identical concurrent runs are coalesced (COALESCE_ENABLED): a run with
+        the same normalized input, platform, profile and streamed stages as
+        one already in flight attaches to it, receiving every event emitted so
+        far and then the rest live (including that run's ``runId``), instead
+        of calling the LLM again. Runs given a ``run_id`` are never coalesced,
+        since their events and checkpoints must carry that id.
+        
         Args:
             user_input: The raw user input to process
             platform: The target platform for customization
+            depth: Pipeline profile, one of ``full``, ``balanced`` or ``fast`` (default: PIPELINE_DEPTH)
+            stream_stages: Names of stages whose tokens are forwarded (default: all)
+            run_id: Id for the run; a failed run's id resumes it from its checkpoints (default: a new id)
             
-        Returns:
-            Dictionary containing all pipeline results or error information
+        Yields:
+            Event dictionaries
         """
+        depth = depth or self.settings.pipeline_depth
+        # Malformed platforms or profiles (e.g. a list from a JSON body) run alone and fail validation
+        if (self.single_flight is None or run_id is not None
+                or not isinstance(platform, str) or not isinstance(depth, str)):
+            async for event in self._execute_events(user_input, platform, depth, stream_stages, run_id):
+                yield event
+            return
+        
+        key = (
+            id(asyncio.get_running_loop()),
+            normalize_input(user_input),
+            platform,
+            depth,
+            None if stream_stages is None else tuple(sorted(stream_stages))
+        )
+        events, joined = self.single_flight.subscribe(
+            key, lambda: self._execute_events(user_input, platform, depth, stream_stages, run_id)
+        )
+        if joined:
+            COALESCED_REQUESTS.inc(platform=platform)
         try:
-            # Validate platform
-            platform = self._validate_platform(platform)
-            
-            # Set up context analysis
-            context_analysis = self._setup_context(user_input, platform)
-            platform_context = context_analysis["platform_context"]
+            async for event in events:
+                if event["event"] == "final":
+                    event = {**event, "result": {**event["result"], "input": user_input}}
+                yield event
+        finally:
+            await events.aclose()
+    
+    async def _execute_events(self, user_input: str, platform: str, depth: str,
+                              stream_stages: Optional[Iterable[str]],
+                              run_id: Optional[str] = None,
+                              shared: Optional[Dict[str, Dict[str, Any]]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run the pipeline once (without coalescing), yielding the events described in :meth:`astream_events`.
+        
+        Args:
+            user_input: The raw user input to process
+            platform: The target platform for customization
+            depth: Pipeline profile
+            stream_stages: Names of stages whose tokens are forwarded (default: all)
+            run_id: Id for the run (default: a new id)
+            shared: Outputs of nodes already run for another platform, by node name (see :meth:`astream_multi`)
             
-            # Step 2: Extract comprehensive intent
-            intent = self.interpreter.interpret(user_input, context_analysis)
+        Yields:
+            Event dictionaries
+        """
+        checkpoints = self.checkpoints
+        run_id = run_id or uuid.uuid4().hex
+        completed: List[str] = []
+        started = False
+        try:
+            # Validate platform and profile and look up their stage graph
+            graph = self.graph_for(depth, platform)
             
-            # Step 3: Generate detailed base prompt with platform template
-            platform_template = PlatformTemplates.get_platform_prompt_template(platform, user_input)
-            base_prompt = self.generator.generate(intent, context_analysis)
-            base_prompt = platform_template + "\n\n" + base_prompt
+            values: Dict[str, Any] = {"user_input": user_input, "platform": platform}
+            if checkpoints is not None:
+                fingerprint = checkpoints.fingerprint(user_input, platform, depth)
+                # SQLite reads and writes run off the event loop
+                for stage, outputs in await asyncio.to_thread(checkpoints.load, run_id, fingerprint):
+                    if stage in graph.nodes:
+                        values.update(outputs)
+                        completed.append(stage)
+            resumed = list(completed)
             
-            # Step 4: Enhance with depth and specificity
-            enhanced_prompt = self.enhancer.enhance(base_prompt, context_analysis)
+            # Seed the platform-independent outputs; shared LLM stages count as completed
+            reused: List[str] = []
+            for name, outputs in (shared or {}).items():
+                if name in graph.nodes and name not in resumed:
+                    values.update(outputs)
+                    if isinstance(graph.nodes[name], StageNode):
+                        reused.append(name)
+                        completed.append(name)
+                        if checkpoints is not None:
+                            await asyncio.to_thread(checkpoints.save, run_id, fingerprint, name, outputs)
             
-            # Step 5: Refine for final clarity and effectiveness
-            final_prompt = self.refiner.refine(enhanced_prompt)
+            # Only a run that got this far has a runId worth retrying with
+            started = True
+            async for event in graph.astream(values, stream_stages, {"platform": platform}):
+                if event["event"] == "stage_end" and isinstance(graph.nodes[event["stage"]], StageNode):
+                    completed.append(event["stage"])
+                    if checkpoints is not None:
+                        await asyncio.to_thread(checkpoints.save, run_id, fingerprint, event["stage"], event["output"])
+                yield event
             
-            return {
+            context_analysis = graph.value(values, "context_analysis")
+            savings = getattr(context_analysis, "savings", {})
+            stages = {
+                node.stage.NAME: {
+                    "model": node.stage.model_name,
+                    "temperature": node.stage.temperature,
+                    "inputTokensSaved": savings.get(node.stage.NAME, 0)
+                }
+                for node in graph.nodes.values() if isinstance(node, StageNode)
+            }
+            result = {
                 "success": True,
                 "input": user_input,
                 "platform": platform,
-                "platformContext": platform_context,
+                "depth": depth,
+                "platformContext": graph.value(values, "platform_context"),
                 "contextAnalysis": context_analysis,
-                "intent": intent,
-                "basePrompt": base_prompt,
-                "enhancedPrompt": enhanced_prompt,
-                "prompt": final_prompt
+                "intent": graph.value(values, "intent"),
+                "basePrompt": graph.value(values, "base_prompt"),
+                "enhancedPrompt": graph.value(values, "enhanced_prompt"),
+                "prompt": graph.value(values, "prompt"),
+                "metadata": {"stages": stages}
             }
+            if checkpoints is not None:
+                await asyncio.to_thread(checkpoints.delete, run_id)
+                result["metadata"]["resumedStages"] = resumed
+            if shared is not None:
+                result["metadata"]["sharedStages"] = reused
+            yield {"event": "final", "result": result}
             
+        except OverloadedError as e:
+            yield self._error_event(
+                {"error": str(e), "code": "OVERLOADED", "retryAfter": e.retry_after},
+                run_id if started else None, completed
+            )
         except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "input": user_input,
-                "platform": platform
-            }
+            yield self._error_event({"error": str(e)}, run_id if started else None, completed)
+    
+    def _error_event(self, fields: Dict[str, Any], run_id: Optional[str], completed: List[str]) -> Dict[str, Any]:
+        """
+        Build an error event, telling the client how to resume when checkpointing is enabled.
+        
+        Args:
+            fields: The error's fields (``error``, optionally ``code`` and ``retryAfter``)
+            run_id: Id of the failed run, or None if it failed before its stages
+                started (e.g. an invalid platform), when there is nothing to resume
+            completed: Names of the stages completed so far
+            
+        Returns:
+            The ``error`` event
+        """
+        event = {"event": "error", **fields}
+        if self.checkpoints is not None and run_id is not None:
+            event.update(runId=run_id, lastCompletedStage=completed[-1] if completed else None)
+        return event
     
-    def run_simple(self, user_input: str, platform: str) -> Dict[str, Any]:
+    async def awarmup(self) -> int:
+        """
+        Open upstream connections before the first request (LLM_WARMUP_CONNECTIONS).
+        
+        Must run on the event loop that will serve requests, since pooled
+        async connections belong to that loop.
+        
+        Returns:
+            The number of warmup requests that succeeded
+        """
+        if self.connection_pool is None or self.settings.llm_warmup_connections < 1:
+            return 0
+        return await self.connection_pool.awarmup(
+            base_url=getattr(self.llm, "openai_api_base", None),
+            connections=self.settings.llm_warmup_connections
+        )
+    
+    def warmup(self) -> int:
+        """
+        Open upstream connections on the shared runtime loop used by the sync APIs.
+        
+        Returns:
+            The number of warmup requests that succeeded
+        """
+        return run_sync(self.awarmup())
+    
+    def run(self, user_input: str, platform: str, depth: Optional[str] = None,
+            run_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Execute the complete prompt generation pipeline with platform customization.
+        
+        Synchronous wrapper around :meth:`arun`.
+        
+        Args:
+            user_input: The raw user input to process
+            platform: The target platform for customization
+            depth: Pipeline profile, one of ``full``, ``balanced`` or ``fast`` (default: PIPELINE_DEPTH)
+            run_id: Id for the run; a failed run's id resumes it from its checkpoints (default: a new id)
+            
+        Returns:
+            Dictionary containing all pipeline results or error information
+        """
+        return run_sync(self.arun(user_input, platform, depth, run_id))
+    
+    async def arun(self, user_input: str, platform: str, depth: Optional[str] = None,
+                   run_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Asynchronously execute the complete prompt generation pipeline.
+        
+        Args:
+            user_input: The raw user input to process
+            platform: The target platform for customization
+            depth: Pipeline profile, one of ``full``, ``balanced`` or ``fast`` (default: PIPELINE_DEPTH)
+            run_id: Id for the run; a failed run's id resumes it from its checkpoints (default: a new id)
+            
+        Returns:
+            Dictionary containing all pipeline results or error information
+            (with ``runId`` and ``lastCompletedStage`` when checkpointing is enabled)
+        """
+        events = self.astream_events(user_input, platform, depth, stream_stages=(), run_id=run_id)
+        return await self._collect_result(events, user_input, platform)
+    
+    @staticmethod
+    async def _collect_result(events: AsyncIterator[Dict[str, Any]], user_input: str,
+                              platform: str) -> Dict[str, Any]:
+        """Consume a run's events and return its result (or error result)."""
+        async for event in events:
+            if event["event"] == "final":
+                return event["result"]
+            if event["event"] == "error":
+                result = {
+                    "success": False,
+                    "error": event["error"],
+                    "input": user_input,
+                    "platform": platform
+                }
+                if "code" in event:
+                    result.update(code=event["code"], retryAfter=event.get("retryAfter"))
+                if "runId" in event:
+                    result.update(runId=event["runId"], lastCompletedStage=event["lastCompletedStage"])
+                return result
+        return {
+            "success": False,
+            "error": "Pipeline finished without a result",
+            "input": user_input,
+            "platform": platform
+        }
+    
+    def run_simple(self, user_input: str, platform: str, depth: Optional[str] = None) -> Dict[str, Any]:
         """
         Execute pipeline and return only the final prompt.
         
         Args:
             user_input: The raw user input to process
             platform: The target platform for customization
+            depth: Pipeline profile, one of ``full``, ``balanced`` or ``fast`` (default: PIPELINE_DEPTH)
             
         Returns:
             Dictionary containing only the final prompt or error information
         """
-        result = self.run(user_input, platform)
+        result = self.run(user_input, platform, depth)
         
         if result["success"]:
             return {
@@ -151,47 +792,353 @@ class PromptPipeline:
         else:
             return result
 
-    def stream(self, user_input: str, platform: str):
+    async def _arun_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Stream the prompt generation process.
+        Run the pipeline for one batch item, turning bad items into error results.
         
         Args:
-            user_input: The raw user input to process
-            platform: The target platform for customization
+            item: Mapping with ``input``, ``platform`` and optional ``depth``, ``id`` and ``runId``
             
-        Yields:
-            String chunks of the generated prompt
+        Returns:
+            The run result, tagged with the item's ``id`` when one was given
         """
-        try:
-            # Validate platform
-            platform = self._validate_platform(platform)
+        if not isinstance(item, dict):
+            return {"success": False, "error": "Batch item must be an object", "code": "INVALID_ITEM"}
+        user_input = str(item.get("input") or "").strip()
+        platform = str(item.get("platform") or "").strip()
+        if not user_input or not platform:
+            result = {
+                "success": False,
+                "error": "Missing or empty 'input' or 'platform'",
+                "code": "MISSING_FIELDS",
+                "input": user_input,
+                "platform": platform
+            }
+        else:
+            result = await self.arun(user_input, platform, item.get("depth"), item.get("runId"))
+        if "id" in item:
+            result = {"id": item["id"], **result}
+        return result
+    
+    def _batch_config(self, max_concurrency: Optional[int]) -> Dict[str, Any]:
+        """Build the runnable config bounding how many items run at once."""
+        return {"max_concurrency": max_concurrency or self.settings.batch_max_concurrency}
+    
+    def run_batch(self, items: List[Dict[str, Any]], max_concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Execute the pipeline for many inputs with bounded concurrency.
+        
+        Synchronous wrapper around :meth:`arun_batch`.
+        
+        Args:
+            items: Mappings with ``input``, ``platform`` and an optional ``id``
+            max_concurrency: Maximum items in flight (default: BATCH_MAX_CONCURRENCY)
             
-            # Set up context analysis
-            context_analysis = self._setup_context(user_input, platform)
+        Returns:
+            One result per item, in input order
+        """
+        return run_sync(self.arun_batch(items, max_concurrency))
+    
+    async def arun_batch(self, items: List[Dict[str, Any]], max_concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Asynchronously execute the pipeline for many inputs with bounded concurrency.
+        
+        Items are pipelined independently, so a fast item moves on to its next
+        stage without waiting for the slowest item in the batch, and a failing
+        item only produces an error result for itself.
+        
+        Args:
+            items: Mappings with ``input``, ``platform`` and an optional ``id``
+            max_concurrency: Maximum items in flight (default: BATCH_MAX_CONCURRENCY)
+            
+        Returns:
+            One result per item, in input order
+        """
+        runnable = RunnableLambda(self._arun_item, name="prompt_pipeline")
+        results = await runnable.abatch(list(items), config=self._batch_config(max_concurrency), return_exceptions=True)
+        return [
+            {"success": False, "error": str(result), "code": "INTERNAL_ERROR"} if isinstance(result, Exception) else result
+            for result in results
+        ]
+    
+    def stream_batch(self, items: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+                     max_concurrency: Optional[int] = None, ordered: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Stream batch results as each item completes.
+        
+        Synchronous wrapper around :meth:`astream_batch`.
+        
+        Args:
+            items: Mappings with ``input``, ``platform`` and an optional ``id`` (iterable or async iterable)
+            max_concurrency: Maximum items in flight (default: BATCH_MAX_CONCURRENCY)
+            ordered: Yield results in input order instead of completion order
+            
+        Yields:
+            Per-item results tagged with their ``index`` in the batch
+        """
+        yield from iter_sync(self.astream_batch(items, max_concurrency, ordered))
+    
+    async def astream_batch(self, items: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+                            max_concurrency: Optional[int] = None,
+                            ordered: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Asynchronously stream batch results in completion (or input) order.
+        
+        Items are pulled from ``items`` only as slots free up, so an iterator
+        of any length (e.g. lines of a file) is processed in constant memory.
+        Pass an async iterable when producing an item may block (e.g. reading
+        stdin): it is awaited alongside the running items, so a slow source
+        neither stalls the event loop nor holds back finished results.
+        In ordered mode a result waits for every earlier item, and the window
+        of ``max_concurrency`` counts both running items and finished ones
+        still waiting to be yielded.
+        
+        Args:
+            items: Mappings with ``input``, ``platform`` and an optional ``id`` (iterable or async iterable)
+            max_concurrency: Maximum items in flight (default: BATCH_MAX_CONCURRENCY)
+            ordered: Yield results in input order instead of completion order
             
-            yield f"Analyzing context for {platform}...\n"
+        Yields:
+            Per-item results tagged with their ``index`` in the batch
+        """
+        limit = max_concurrency or self.settings.batch_max_concurrency
+        is_async = hasattr(items, "__aiter__")
+        source = items.__aiter__() if is_async else iter(items)
+        running: Dict[asyncio.Task, int] = {}
+        finished: Dict[int, Dict[str, Any]] = {}
+        reader: Optional[asyncio.Future] = None
+        read = 0
+        next_index = 0
+        exhausted = False
+        
+        def start(item: Dict[str, Any]) -> None:
+            nonlocal read
+            running[asyncio.ensure_future(self._arun_item(item))] = read
+            read += 1
+        
+        def fill() -> None:
+            nonlocal exhausted, reader
+            while not exhausted and reader is None and len(running) + len(finished) < limit:
+                if is_async:
+                    reader = asyncio.ensure_future(source.__anext__())
+                    return
+                try:
+                    start(next(source))
+                except StopIteration:
+                    exhausted = True
+        
+        try:
+            fill()
+            while running or reader is not None:
+                waiting = set(running) if reader is None else {*running, reader}
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                if reader in done:
+                    task, reader = reader, None
+                    try:
+                        start(task.result())
+                    except StopAsyncIteration:
+                        exhausted = True
+                for task in sorted((task for task in done if task in running), key=running.get):
+                    index = running.pop(task)
+                    if task.exception() is not None:
+                        result = {"success": False, "error": str(task.exception()), "code": "INTERNAL_ERROR"}
+                    else:
+                        result = task.result()
+                    if not ordered:
+                        yield {"index": index, **result}
+                    else:
+                        finished[index] = result
+                while next_index in finished:
+                    yield {"index": next_index, **finished.pop(next_index)}
+                    next_index += 1
+                fill()
+        finally:
+            for task in running:
+                task.cancel()
+            if reader is not None:
+                reader.cancel()
+    
+    def run_multi(self, user_input: str, platforms: Iterable[str], depth: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Generate prompts for one input on several platforms.
+        
+        Synchronous wrapper around :meth:`arun_multi`.
+        
+        Args:
+            user_input: The raw user input to process
+            platforms: Target platforms (duplicates are ignored)
+            depth: Pipeline profile, one of ``full``, ``balanced`` or ``fast`` (default: PIPELINE_DEPTH)
             
-            # Step 2: Extract intent
-            intent = self.interpreter.interpret(user_input, context_analysis)
-            yield f"Extracting intent...\n"
+        Returns:
+            Dictionary with each platform's result under ``results``
+        """
+        return run_sync(self.arun_multi(user_input, platforms, depth))
+    
+    async def arun_multi(self, user_input: str, platforms: Iterable[str],
+                         depth: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Asynchronously generate prompts for one input on several platforms.
+        
+        Args:
+            user_input: The raw user input to process
+            platforms: Target platforms (duplicates are ignored)
+            depth: Pipeline profile, one of ``full``, ``balanced`` or ``fast`` (default: PIPELINE_DEPTH)
             
-            # Step 3: Generate base prompt
-            platform_template = PlatformTemplates.get_platform_prompt_template(platform, user_input)
-            base_prompt = self.generator.generate(intent, context_analysis)
-            base_prompt = platform_template + "\n\n" + base_prompt
-            yield f"Generating base prompt...\n"
+        Returns:
+            Dictionary with ``input``, ``depth``, ``succeeded`` and ``failed``
+            counts and ``results``: each platform's result, as returned by
+            :meth:`arun`, in the requested order
+        """
+        platforms = list(dict.fromkeys(platforms))
+        finished = {}
+        async for result in self.astream_multi(user_input, platforms, depth):
+            finished[result["platform"]] = result
+        succeeded = sum(1 for result in finished.values() if result["success"])
+        return {
+            "success": True,
+            "input": user_input,
+            "depth": depth or self.settings.pipeline_depth,
+            "succeeded": succeeded,
+            "failed": len(finished) - succeeded,
+            "results": {platform: finished[platform] for platform in platforms}
+        }
+    
+    def stream_multi(self, user_input: str, platforms: Iterable[str],
+                     depth: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream per-platform results as each platform finishes.
+        
+        Synchronous wrapper around :meth:`astream_multi`.
+        
+        Args:
+            user_input: The raw user input to process
+            platforms: Target platforms (duplicates are ignored)
+            depth: Pipeline profile, one of ``full``, ``balanced`` or ``fast`` (default: PIPELINE_DEPTH)
             
-            # Step 4: Enhance prompt
-            enhanced_prompt = self.enhancer.enhance(base_prompt, context_analysis)
-            yield f"Enhancing prompt...\n"
+        Yields:
+            Per-platform results, as returned by :meth:`arun`
+        """
+        yield from iter_sync(self.astream_multi(user_input, platforms, depth))
+    
+    async def astream_multi(self, user_input: str, platforms: Iterable[str],
+                            depth: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate prompts for several platforms, yielding each result as it finishes.
+        
+        The nodes that do not depend on the platform (the ``context`` stage
+        of the ``full`` profile, ``insight`` otherwise) run once. Their
+        outputs then seed one run per platform, and those runs execute the
+        platform-dependent stages concurrently. Each result lists the LLM
+        stages it reused under ``metadata.sharedStages``.
+        
+        If the shared stages fail, every platform runs them itself, so each
+        result reports its own error (and ``runId`` for resuming).
+        
+        Args:
+            user_input: The raw user input to process
+            platforms: Target platforms (duplicates are ignored)
+            depth: Pipeline profile, one of ``full``, ``balanced`` or ``fast`` (default: PIPELINE_DEPTH)
             
-            # Step 5: Refine prompt
-            final_prompt = self.refiner.refine(enhanced_prompt)
-            yield f"Refining prompt...\n"
+        Yields:
+            Per-platform results, as returned by :meth:`arun`, in completion order
+        """
+        platforms = list(dict.fromkeys(platforms))
+        depth = depth or self.settings.pipeline_depth
+        
+        # Run the platform-independent part of the first valid platform's graph once
+        shared: Dict[str, Dict[str, Any]] = {}
+        for platform in platforms:
+            try:
+                graph = self.graph_for(depth, platform).independent_of("platform")
+            except ValueError:
+                continue  # reported in that platform's result
+            values: Dict[str, Any] = {"user_input": user_input}
+            try:
+                async for _ in graph.astream(values, (), {"platform": "multi"}):
+                    pass
+            except Exception:
+                pass  # each platform retries the failed stage and reports the error
+            shared = {
+                name: {output: values[output] for output in node.outputs}
+                for name, node in graph.nodes.items() if all(output in values for output in node.outputs)
+            }
+            break
+        
+        running = {
+            asyncio.ensure_future(self._collect_result(
+                self._execute_events(user_input, platform, depth, (), shared=shared), user_input, platform
+            )): platform
+            for platform in platforms
+        }
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    platform = running.pop(task)
+                    if task.exception() is not None:
+                        yield {
+                            "success": False,
+                            "error": str(task.exception()),
+                            "code": "INTERNAL_ERROR",
+                            "input": user_input,
+                            "platform": platform
+                        }
+                    else:
+                        yield task.result()
+        finally:
+            for task in running:
+                task.cancel()
+    
+    def stream(self, user_input: str, platform: str, depth: Optional[str] = None,
+               run_id: Optional[str] = None) -> Iterator[str]:
+        """
+        Stream the prompt generation process.
+        
+        Synchronous wrapper around :meth:`astream`.
+        
+        Args:
+            user_input: The raw user input to process
+            platform: The target platform for customization
+            depth: Pipeline profile, one of ``full``, ``balanced`` or ``fast`` (default: PIPELINE_DEPTH)
+            run_id: Id for the run; a failed run's id resumes it from its checkpoints (default: a new id)
             
-            # Yield the final result
-            yield f"\n=== Enhanced Prompt for {platform} ===\n\n"
-            yield final_prompt
+        Yields:
+            String chunks of the generated prompt
+        """
+        yield from iter_sync(self.astream(user_input, platform, depth, run_id))
+
+    async def astream(self, user_input: str, platform: str, depth: Optional[str] = None,
+                      run_id: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Asynchronously stream the prompt generation process.
+        
+        Progress lines are emitted as each stage starts and the final prompt
+        is forwarded token by token as the profile's last stage produces it.
+        An error line is followed by a ``Run ID:`` line when the run can be
+        resumed.
+        
+        Args:
+            user_input: The raw user input to process
+            platform: The target platform for customization
+            depth: Pipeline profile, one of ``full``, ``balanced`` or ``fast`` (default: PIPELINE_DEPTH)
+            run_id: Id for the run; a failed run's id resumes it from its checkpoints (default: a new id)
             
-        except Exception as e:
-            yield f"Error: {str(e)}\n" 
\ No newline at end of file
+        Yields:
+            String chunks of the generated prompt
+        """
+        try:
+            final_stage = self.graph_for(depth or self.settings.pipeline_depth, platform).producer("prompt")
+        except ValueError:
+            final_stage = None  # reported by astream_events as a validation error
+        async for event in self.astream_events(user_input, platform, depth, stream_stages=(final_stage,),
+                                               run_id=run_id):
+            if event["event"] == "stage_start" and event["stage"] in self.STAGE_MESSAGES:
+                yield self.STAGE_MESSAGES[event["stage"]].format(platform=platform) + "\n"
+                if event["stage"] == final_stage:
+                    yield f"\n=== Enhanced Prompt for {platform} ===\n\n"
+            elif event["event"] == "token":
+                yield event["text"]
+            elif event["event"] == "error":
+                yield f"Error: {event['error']}\n"
+                if event.get("runId"):
+                    yield f"Run ID: {event['runId']} (last completed stage: {event['lastCompletedStage'] or 'none'})\n"
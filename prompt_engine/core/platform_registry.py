@@ -0,0 +1,233 @@
+"""
+Data-driven registry of target platforms, loaded from a TOML file with hot reload
+"""
+
+import os
+import threading
+import time
+import tomllib
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_PLATFORMS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "platforms.toml")
+
+
+class Platform:
+    """One target platform with its context and precompiled prompt template."""
+
+    __slots__ = ("name", "slug", "context", "skip_stages", "_parts")
+
+    def __init__(self, name: str, slug: str, context: Dict[str, Any], template: str,
+                 skip_stages: Optional[Dict[str, Dict[str, str]]] = None):
+        """
+        Initialize the platform, filling every template field except ``{user_input}``.
+
+        Args:
+            name: Display name, e.g. ``Twitter``
+            slug: Lower-case identifier
+            context: Platform requirements (character limit, tone, format, ...)
+            template: Prompt prefix with ``{user_input}`` and context placeholders
+            skip_stages: Stages dropped for the platform, with their output aliases
+
+        Raises:
+            ValueError: If the template references a field the context lacks
+        """
+        self.name = name
+        self.slug = slug
+        self.context = context
+        self.skip_stages = skip_stages or {}
+        try:
+            self._parts = tuple(part.format_map(context) for part in template.split("{user_input}"))
+        except (KeyError, IndexError, ValueError) as e:
+            raise ValueError(f"Invalid template for platform '{name}': {e!r}") from e
+
+    def render(self, user_input: str) -> str:
+        """
+        Render the platform prompt template for a request.
+
+        Args:
+            user_input: The user's original input
+
+        Returns:
+            The platform prompt template
+        """
+        return user_input.join(self._parts)
+
+
+class _Snapshot:
+    """An immutable, fully built view of the registry file."""
+
+    __slots__ = ("platforms", "default", "mtime", "version")
+
+    def __init__(self, platforms: Dict[str, Platform], default: Platform, mtime: float, version: int):
+        self.platforms = platforms
+        self.default = default
+        self.mtime = mtime
+        self.version = version
+
+
+class PlatformRegistry:
+    """
+    Platforms declared in a TOML file, looked up by name in O(1).
+
+    The file is re-read when its modification time changes (checked at most
+    every ``reload_interval`` seconds). A reload builds a complete new
+    snapshot and swaps it in with one assignment, so readers see either the
+    old or the new platforms, never a mix. A file that fails to load keeps
+    the previous snapshot in use and is reported in :meth:`stats`.
+    """
+
+    def __init__(self, path: str = DEFAULT_PLATFORMS_PATH, reload_interval: Optional[float] = 2.0):
+        """
+        Initialize the registry and load the file.
+
+        Args:
+            path: TOML file declaring the platforms
+            reload_interval: Seconds between modification checks (None disables hot reload)
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If the file is not a valid platform registry
+        """
+        self.path = path
+        self.reload_interval = reload_interval
+        self.last_error: Optional[str] = None
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._checked = time.monotonic()
+        self._snapshot = self._load(0)
+
+    def _load(self, version: int) -> _Snapshot:
+        """Parse the file into a new snapshot."""
+        mtime = os.stat(self.path).st_mtime
+        with open(self.path, "rb") as f:
+            try:
+                data = tomllib.load(f)
+            except tomllib.TOMLDecodeError as e:
+                raise ValueError(f"Invalid platform registry {self.path}: {e}") from e
+
+        platforms = {}
+        for name, spec in data.get("platforms", {}).items():
+            if "template" not in spec:
+                raise ValueError(f"Platform '{name}' in {self.path} has no template")
+            platforms[name] = Platform(
+                name=name,
+                slug=spec.get("slug", name.lower()),
+                context=dict(spec.get("context", {})),
+                template=spec["template"],
+                skip_stages=spec.get("skip_stages")
+            )
+        if not platforms:
+            raise ValueError(f"Platform registry {self.path} declares no platforms")
+        default = platforms.get(data.get("default", ""))
+        if default is None:
+            raise ValueError(f"Default platform '{data.get('default')}' is not declared in {self.path}")
+        return _Snapshot(platforms, default, mtime, version)
+
+    def _current(self) -> _Snapshot:
+        """Return the live snapshot, reloading first if the file changed."""
+        snapshot = self._snapshot
+        if self.reload_interval is None or time.monotonic() - self._checked < self.reload_interval:
+            return snapshot
+        if not self._lock.acquire(blocking=False):
+            return snapshot  # another thread is checking
+        try:
+            self._checked = time.monotonic()
+            try:
+                changed = os.stat(self.path).st_mtime != snapshot.mtime
+            except OSError as e:
+                self.last_error = str(e)
+                return snapshot
+            if changed:
+                self.reload()
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+    def reload(self) -> bool:
+        """
+        Re-read the file now.
+
+        Returns:
+            True if the new platforms were loaded, False if the file was invalid
+        """
+        try:
+            snapshot = self._load(self._snapshot.version + 1)
+        except (OSError, ValueError) as e:
+            self.last_error = str(e)
+            return False
+        self._snapshot = snapshot
+        self.last_error = None
+        self.reloads += 1
+        return True
+
+    @property
+    def version(self) -> int:
+        """Number of the live snapshot, incremented on every successful reload."""
+        return self._current().version
+
+    @property
+    def default(self) -> Platform:
+        """Platform used for unknown names."""
+        return self._current().default
+
+    def get(self, name: str) -> Optional[Platform]:
+        """
+        Look up a platform.
+
+        Args:
+            name: Platform name, e.g. ``LinkedIn``
+
+        Returns:
+            The platform, or None if it is not declared
+        """
+        return self._current().platforms.get(name)
+
+    def names(self) -> List[str]:
+        """Return the declared platform names, in file order."""
+        return list(self._current().platforms)
+
+    def lookup(self, name: str) -> Tuple[Platform, int]:
+        """
+        Look up a platform together with the snapshot version it came from.
+
+        Args:
+            name: Platform name
+
+        Returns:
+            Tuple of (platform, version)
+
+        Raises:
+            ValueError: If the platform is not declared
+        """
+        snapshot = self._current()
+        platform = snapshot.platforms.get(name) if isinstance(name, str) else None
+        if platform is None:
+            raise ValueError(f"Invalid platform '{name}'. Valid options: {', '.join(snapshot.platforms)}")
+        return platform, snapshot.version
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and name in self._current().platforms
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the platform count, snapshot version, reload count and last load error."""
+        snapshot = self._current()
+        return {
+            "platforms": len(snapshot.platforms),
+            "version": snapshot.version,
+            "reloads": self.reloads,
+            "lastError": self.last_error
+        }
+
+
+_default_registry: Optional[PlatformRegistry] = None
+_default_lock = threading.Lock()
+
+
+def default_registry() -> PlatformRegistry:
+    """Return the process-wide registry for the bundled ``platforms.toml``."""
+    global _default_registry
+    if _default_registry is None:
+        with _default_lock:
+            if _default_registry is None:
+                _default_registry = PlatformRegistry()
+    return _default_registry
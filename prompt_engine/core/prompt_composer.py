@@ -0,0 +1,70 @@
+"""
+Fused prompt generation, enhancement and refinement component for the fast pipeline profile
+"""
+
+from typing import Dict
+from .context_compactor import ANALYSIS_FIELDS, render_context
+from .runtime import run_sync
+from .stage import PipelineStage
+
+
+class PromptComposer(PipelineStage):
+    """Writes the final, refined prompt from intent and context in a single call."""
+    
+    NAME = "compose"
+    INPUT_VARIABLES = ["platform_template", "intent", "context_analysis"]
+    CONTEXT_FIELDS = ANALYSIS_FIELDS + ("platform",)
+
+    PROMPT_TEMPLATE = """You are an expert prompt engineer specializing in comprehensive, polished, ready-to-use prompts.
+
+Using the platform guidance, interpreted intent and context analysis below, write the final prompt. It must:
+1. Define a clear role for the AI
+2. Describe the task with specific, actionable requirements
+3. Include relevant context, domain terminology and best practices
+4. Specify the expected output format, structure and quality criteria
+5. Cover constraints, limitations, edge cases and error prevention
+6. Be crystal clear, free of redundancy and balanced between detail and conciseness
+
+Platform Guidance:
+{platform_template}
+
+Interpreted Intent:
+{intent}
+
+Context Analysis:
+{context_analysis}
+
+Provide only the final prompt. DO NOT execute the prompt or generate content - only write the prompt itself:"""
+    
+    def compose(self, platform_template: str, intent: str, context_analysis: Dict[str, str]) -> str:
+        """
+        Write the final prompt from intent and context.
+        
+        Args:
+            platform_template: Platform-specific prompt template
+            intent: The interpreted task intent
+            context_analysis: Dictionary containing context analysis results
+            
+        Returns:
+            The final refined prompt
+        """
+        return run_sync(self.acompose(platform_template, intent, context_analysis))
+    
+    async def acompose(self, platform_template: str, intent: str, context_analysis: Dict[str, str]) -> str:
+        """
+        Asynchronously write the final prompt from intent and context.
+        
+        Args:
+            platform_template: Platform-specific prompt template
+            intent: The interpreted task intent
+            context_analysis: Dictionary containing context analysis results
+            
+        Returns:
+            The final refined prompt
+        """
+        return await self._ainvoke(self.prepare_inputs(platform_template, intent, context_analysis))
+    
+    def prepare_inputs(self, platform_template: str, intent: str, context_analysis: Dict[str, str]) -> Dict[str, str]:
+        """Serialize the context fields this stage needs into its template variables."""
+        context_str = render_context(context_analysis, self.CONTEXT_FIELDS, self.NAME)
+        return {"platform_template": platform_template, "intent": intent, "context_analysis": context_str}
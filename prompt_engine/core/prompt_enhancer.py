@@ -3,13 +3,18 @@ Prompt enhancement component for adding depth and specificity
 """
 
 from typing import Dict
-from langchain.prompts import PromptTemplate
-from langchain_core.runnables import RunnableSequence
+from .context_compactor import ANALYSIS_FIELDS, render_context
+from .runtime import run_sync
+from .stage import PipelineStage
 
 
-class PromptEnhancer:
+class PromptEnhancer(PipelineStage):
     """Enhances prompts with additional depth, specificity, and actionable instructions."""
     
+    NAME = "enhance"
+    INPUT_VARIABLES = ["prompt", "context_analysis"]
+    CONTEXT_FIELDS = ANALYSIS_FIELDS + ("platform",)
+
     PROMPT_TEMPLATE = """You are an expert at enhancing prompts for maximum effectiveness and depth.
 
 Enhance the following prompt by:
@@ -29,11 +34,6 @@ Context Analysis:
 
 Provide an enhanced version that is more comprehensive and actionable. DO NOT execute the prompt or generate content - only enhance the prompt itself:"""
     
-    def __init__(self, llm):
-        """Initialize the prompt enhancer with an LLM instance."""
-        prompt = PromptTemplate(input_variables=["prompt", "context_analysis"], template=self.PROMPT_TEMPLATE)
-        self.chain = RunnableSequence(prompt, llm)
-    
     def enhance(self, prompt: str, context_analysis: Dict[str, str]) -> str:
         """
         Enhance prompt with additional depth and specificity.
@@ -45,6 +45,22 @@ Provide an enhanced version that is more comprehensive and actionable. DO NOT ex
         Returns:
             Enhanced prompt with additional depth and specificity
         """
-        context_str = "\n".join([f"{k}: {v}" for k, v in context_analysis.items()])
-        result = self.chain.invoke({"prompt": prompt, "context_analysis": context_str})
-        return result.strip() 
\ No newline at end of file
+        return run_sync(self.aenhance(prompt, context_analysis))
+    
+    async def aenhance(self, prompt: str, context_analysis: Dict[str, str]) -> str:
+        """
+        Asynchronously enhance prompt with additional depth and specificity.
+        
+        Args:
+            prompt: The base prompt to enhance
+            context_analysis: Dictionary containing context analysis results
+            
+        Returns:
+            Enhanced prompt with additional depth and specificity
+        """
+        return await self._ainvoke(self.prepare_inputs(prompt, context_analysis))
+    
+    def prepare_inputs(self, prompt: str, context_analysis: Dict[str, str]) -> Dict[str, str]:
+        """Serialize the context fields this stage needs into its template variables."""
+        context_str = render_context(context_analysis, self.CONTEXT_FIELDS, self.NAME)
+        return {"prompt": prompt, "context_analysis": context_str} 
\ No newline at end of file
@@ -3,13 +3,18 @@ Prompt generation component for creating comprehensive base prompts
 """
 
 from typing import Dict
-from langchain.prompts import PromptTemplate
-from langchain_core.runnables import RunnableSequence
+from .context_compactor import ANALYSIS_FIELDS, render_context
+from .runtime import run_sync
+from .stage import PipelineStage
 
 
-class PromptGenerator:
+class PromptGenerator(PipelineStage):
     """Generates comprehensive base prompts from intent and context."""
     
+    NAME = "generate"
+    INPUT_VARIABLES = ["intent", "context_analysis"]
+    CONTEXT_FIELDS = ANALYSIS_FIELDS + ("platform", "platform_context")
+
     PROMPT_TEMPLATE = """You are an expert prompt engineer specializing in creating comprehensive, detailed prompts.
 
 Using the interpreted intent and context analysis below, generate a robust, in-depth prompt that includes:
@@ -30,11 +35,6 @@ Context Analysis:
 
 Generate a comprehensive prompt that will produce high-quality, detailed results:"""
     
-    def __init__(self, llm):
-        """Initialize the prompt generator with an LLM instance."""
-        prompt = PromptTemplate(input_variables=["intent", "context_analysis"], template=self.PROMPT_TEMPLATE)
-        self.chain = RunnableSequence(prompt, llm)
-    
     def generate(self, intent: str, context_analysis: Dict[str, str]) -> str:
         """
         Generate a comprehensive base prompt from intent and context.
@@ -46,6 +46,22 @@ Generate a comprehensive prompt that will produce high-quality, detailed results
         Returns:
             Comprehensive base prompt
         """
-        context_str = "\n".join([f"{k}: {v}" for k, v in context_analysis.items()])
-        result = self.chain.invoke({"intent": intent, "context_analysis": context_str})
-        return result.strip() 
\ No newline at end of file
+        return run_sync(self.agenerate(intent, context_analysis))
+    
+    async def agenerate(self, intent: str, context_analysis: Dict[str, str]) -> str:
+        """
+        Asynchronously generate a comprehensive base prompt from intent and context.
+        
+        Args:
+            intent: The interpreted task intent
+            context_analysis: Dictionary containing context analysis results
+            
+        Returns:
+            Comprehensive base prompt
+        """
+        return await self._ainvoke(self.prepare_inputs(intent, context_analysis))
+    
+    def prepare_inputs(self, intent: str, context_analysis: Dict[str, str]) -> Dict[str, str]:
+        """Serialize the context fields this stage needs into its template variables."""
+        context_str = render_context(context_analysis, self.CONTEXT_FIELDS, self.NAME)
+        return {"intent": intent, "context_analysis": context_str} 
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""
+Fused prompt enhancement and refinement component for the balanced pipeline profile
+"""
+
+from typing import Dict
+from .context_compactor import ANALYSIS_FIELDS, render_context
+from .runtime import run_sync
+from .stage import PipelineStage
+
+
+class PromptPolisher(PipelineStage):
+    """Enhances a prompt with depth and specificity and refines it for clarity in a single call."""
+    
+    NAME = "polish"
+    INPUT_VARIABLES = ["prompt", "context_analysis"]
+    CONTEXT_FIELDS = ANALYSIS_FIELDS + ("platform",)
+
+    PROMPT_TEMPLATE = """You are an expert at enhancing and refining prompts for maximum effectiveness, clarity and depth.
+
+Improve the following prompt by:
+1. Adding specific, actionable instructions
+2. Including relevant examples or templates
+3. Specifying quality standards, formatting and structure requirements
+4. Adding domain-specific terminology, best practices and edge case handling
+5. Making it crystal clear, unambiguous and free of redundancy
+6. Balancing detail and conciseness so it is ready for immediate use
+
+Original Prompt:
+{prompt}
+
+Context Analysis:
+{context_analysis}
+
+Provide only the final improved prompt. DO NOT execute the prompt or generate content - only improve the prompt itself:"""
+    
+    def polish(self, prompt: str, context_analysis: Dict[str, str]) -> str:
+        """
+        Enhance and refine a prompt.
+        
+        Args:
+            prompt: The base prompt to improve
+            context_analysis: Dictionary containing context analysis results
+            
+        Returns:
+            Enhanced and refined prompt
+        """
+        return run_sync(self.apolish(prompt, context_analysis))
+    
+    async def apolish(self, prompt: str, context_analysis: Dict[str, str]) -> str:
+        """
+        Asynchronously enhance and refine a prompt.
+        
+        Args:
+            prompt: The base prompt to improve
+            context_analysis: Dictionary containing context analysis results
+            
+        Returns:
+            Enhanced and refined prompt
+        """
+        return await self._ainvoke(self.prepare_inputs(prompt, context_analysis))
+    
+    def prepare_inputs(self, prompt: str, context_analysis: Dict[str, str]) -> Dict[str, str]:
+        """Serialize the context fields this stage needs into its template variables."""
+        context_str = render_context(context_analysis, self.CONTEXT_FIELDS, self.NAME)
+        return {"prompt": prompt, "context_analysis": context_str}
@@ -2,13 +2,16 @@
 Prompt refinement component for final clarity and effectiveness
 """
 
-from langchain.prompts import PromptTemplate
-from langchain_core.runnables import RunnableSequence
+from .runtime import run_sync
+from .stage import PipelineStage
 
 
-class PromptRefiner:
+class PromptRefiner(PipelineStage):
     """Refines prompts for final clarity, precision, and effectiveness."""
     
+    NAME = "refine"
+    INPUT_VARIABLES = ["prompt"]
+
     PROMPT_TEMPLATE = """You are an expert prompt refiner focused on clarity, precision, and effectiveness.
 
 Refine the following prompt to ensure it is:
@@ -24,11 +27,6 @@ Prompt to Refine:
 
 Provide the final refined version that maintains all essential information while being polished and professional. DO NOT execute the prompt or generate content - only refine the prompt itself:"""
     
-    def __init__(self, llm):
-        """Initialize the prompt refiner with an LLM instance."""
-        prompt = PromptTemplate(input_variables=["prompt"], template=self.PROMPT_TEMPLATE)
-        self.chain = RunnableSequence(prompt, llm)
-    
     def refine(self, prompt: str) -> str:
         """
         Refine prompt for final clarity and effectiveness.
@@ -39,5 +37,16 @@ Provide the final refined version that maintains all essential information while
         Returns:
             Refined prompt optimized for clarity and effectiveness
         """
-        result = self.chain.invoke({"prompt": prompt})
-        return result.strip() 
\ No newline at end of file
+        return run_sync(self.arefine(prompt))
+    
+    async def arefine(self, prompt: str) -> str:
+        """
+        Asynchronously refine prompt for final clarity and effectiveness.
+        
+        Args:
+            prompt: The prompt to refine
+            
+        Returns:
+            Refined prompt optimized for clarity and effectiveness
+        """
+        return await self._ainvoke(self.prepare_inputs(prompt)) 
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+Retry and hedging policies for stage LLM calls
+"""
+
+import asyncio
+import math
+import random
+import threading
+from collections import deque
+from typing import Deque, Optional
+
+import httpx
+
+from .limiter import is_rate_limit_error
+
+_TRANSIENT_ERROR_NAMES = ("APITimeoutError", "APIConnectionError", "InternalServerError", "RateLimitError")
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """
+    Return True for failures worth retrying: upstream 429s and 5xx, timeouts and connection errors.
+
+    Args:
+        error: The exception raised by an LLM call
+
+    Returns:
+        Whether the call may succeed if repeated
+    """
+    if is_rate_limit_error(error) or type(error).__name__ in _TRANSIENT_ERROR_NAMES:
+        return True
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status >= 500 or status == 408
+    return isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError, httpx.TransportError))
+
+
+class RetryPolicy:
+    """Capped exponential backoff with full jitter for transient LLM failures."""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0):
+        """
+        Initialize the policy.
+
+        Args:
+            max_attempts: Total attempts per call, including the first (1 disables retries)
+            base_delay: Backoff before the first retry, doubled per attempt (seconds)
+            max_delay: Upper bound on a single backoff (seconds)
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        """
+        Decide whether to retry after a failed attempt.
+
+        Args:
+            error: The attempt's exception
+            attempt: Number of attempts made so far
+
+        Returns:
+            True if another attempt should be made
+        """
+        return attempt < self.max_attempts and is_retryable_error(error)
+
+    def delay(self, attempt: int) -> float:
+        """Return a jittered backoff (seconds) before the next attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies for quantile estimates."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        """Record a completed call's latency."""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the q-quantile of the window, or None when it is empty."""
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+
+class HedgeBudget:
+    """
+    Decides when to send a duplicate (hedge) call and caps how many are sent.
+
+    A hedge fires when a call has run longer than the stage's observed
+    ``quantile`` latency, and only while hedges stay under ``ratio`` of all
+    hedge-eligible calls across the pipeline.
+    """
+
+    def __init__(self, ratio: float = 0.1, quantile: float = 0.95, min_samples: int = 20):
+        """
+        Initialize the budget.
+
+        Args:
+            ratio: Maximum hedges as a fraction of eligible calls
+            quantile: Latency quantile after which a hedge is sent
+            min_samples: Latencies a stage must have observed before it hedges
+        """
+        self.ratio = ratio
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.calls = 0
+        self.hedges = 0
+        self._lock = threading.Lock()
+
+    def threshold(self, latencies: LatencyTracker) -> Optional[float]:
+        """Return how long to wait before hedging, or None if the stage lacks samples."""
+        if len(latencies) < self.min_samples:
+            return None
+        return latencies.quantile(self.quantile)
+
+    def record_call(self) -> None:
+        """Count a hedge-eligible call."""
+        with self._lock:
+            self.calls += 1
+
+    def try_spend(self) -> bool:
+        """Reserve one hedge if the budget allows it."""
+        with self._lock:
+            if self.hedges + 1 > self.ratio * self.calls:
+                return False
+            self.hedges += 1
+            return True
@@ -0,0 +1,176 @@
+"""
+Registry of live and recently finished runs whose events can be replayed to reconnecting clients
+"""
+
+import json
+import threading
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from .singleflight import EventBroadcast
+
+
+class RunInProgressError(RuntimeError):
+    """Raised when a run is started with the id of a run that is still running."""
+
+
+async def _numbered(source: AsyncIterator[Any]) -> AsyncIterator[Tuple[int, Any]]:
+    """Pair each event with its sequence number."""
+    seq = 0
+    try:
+        async for event in source:
+            yield seq, event
+            seq += 1
+    finally:
+        await source.aclose()
+
+
+def parse_event_id(event_id: Optional[str]) -> Optional[Tuple[str, int]]:
+    """
+    Split a ``<runId>:<seq>`` event id.
+
+    Args:
+        event_id: The id, e.g. from a ``Last-Event-ID`` header
+
+    Returns:
+        Tuple of (run id, sequence number), or None if the id is malformed
+    """
+    run_id, _, seq = (event_id or "").strip().rpartition(":")
+    if not run_id or not seq.isdigit():
+        return None
+    return run_id, int(seq)
+
+
+def format_sse(run_id: str, seq: int, event: Dict[str, Any]) -> str:
+    """
+    Encode a pipeline event as a Server-Sent Events message.
+
+    Args:
+        run_id: Id of the run the event belongs to
+        seq: The event's sequence number within the run
+        event: Pipeline event dictionary
+
+    Returns:
+        The message, with ``id: <runId>:<seq>`` and the event type as ``event:``
+    """
+    data = json.dumps(event, ensure_ascii=False)
+    return f"id: {run_id}:{seq}\nevent: {event['event']}\ndata: {data}\n\n"
+
+
+class RunRegistry:
+    """
+    Runs event sources in the background and keeps a bounded replay buffer per run.
+
+    A run keeps going when its client disconnects. Its last ``buffer_size``
+    events stay available while it runs and for ``ttl_seconds`` after it
+    finishes, so a client can reconnect and resume after the last event it saw.
+    A subscriber that falls behind the buffer receives a ``gap`` event naming
+    the sequence numbers it missed.
+    """
+
+    def __init__(self, buffer_size: int = 4096, ttl_seconds: float = 300.0):
+        """
+        Initialize the registry.
+
+        Args:
+            buffer_size: Events kept per run for replay
+            ttl_seconds: How long a finished run's events are kept
+        """
+        self.buffer_size = buffer_size
+        self.ttl_seconds = ttl_seconds
+        self._runs: Dict[str, EventBroadcast] = {}
+        self._lock = threading.Lock()
+
+    def _purge(self) -> None:
+        """Forget finished runs whose TTL has passed (caller holds the lock)."""
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [
+            run_id for run_id, run in self._runs.items()
+            if run.finished_at is not None and run.finished_at <= cutoff
+        ]
+        for run_id in expired:
+            del self._runs[run_id]
+
+    async def astart(self, source: AsyncIterator[Any], run_id: Optional[str] = None) -> str:
+        """
+        Start consuming an event source on the running event loop.
+
+        Args:
+            source: Async iterator of events
+            run_id: Id for the run, e.g. the pipeline run it streams; replaces
+                a finished run with the same id (default: a new id)
+
+        Returns:
+            The run's id
+
+        Raises:
+            RunInProgressError: If a run with the same id is still running
+        """
+        run_id = run_id or uuid.uuid4().hex
+        with self._lock:
+            self._purge()
+            live = self._runs.get(run_id)
+            if live is not None and not live.done:
+                raise RunInProgressError(f"Run '{run_id}' is still in progress")
+            run = EventBroadcast(_numbered(source), max_events=self.buffer_size)
+            self._runs[run_id] = run
+        run.start()
+        return run_id
+
+    def get(self, run_id: str) -> Optional[EventBroadcast]:
+        """
+        Look up a run.
+
+        Args:
+            run_id: Id returned by :meth:`astart`
+
+        Returns:
+            The run's broadcast, or None if it is unknown or expired
+        """
+        with self._lock:
+            self._purge()
+            return self._runs.get(run_id)
+
+    async def subscribe(self, run_id: str, after: Optional[int] = None) -> AsyncIterator[Tuple[int, Any]]:
+        """
+        Follow a run's events, resuming after a given sequence number.
+
+        Events that are no longer buffered are replaced by a single
+        ``{"event": "gap", "from": <seq>, "to": <seq>}`` event, numbered as
+        the last missed event, so the client knows its stream is incomplete.
+
+        Must be iterated on the event loop the run was started on.
+
+        Args:
+            run_id: Id returned by :meth:`astart`
+            after: Sequence number of the last event already received (None for all)
+
+        Yields:
+            Tuples of (sequence number, event)
+
+        Raises:
+            KeyError: If the run is unknown or expired
+        """
+        run = self.get(run_id)
+        if run is None:
+            raise KeyError(run_id)
+        expected = 0 if after is None else after + 1
+        events = run.subscribe(expected)
+        try:
+            async for seq, event in events:
+                if seq > expected:
+                    yield seq - 1, {"event": "gap", "from": expected, "to": seq - 1}
+                expected = seq + 1
+                yield seq, event
+        finally:
+            await events.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of runs held and how many are still running."""
+        with self._lock:
+            self._purge()
+            return {
+                "runs": len(self._runs),
+                "running": sum(1 for run in self._runs.values() if not run.done)
+            }
@@ -0,0 +1,97 @@
+"""
+Shared background event loop for driving the async pipeline from synchronous code
+"""
+
+import asyncio
+import os
+import threading
+from typing import Any, AsyncIterator, Coroutine, Iterator, Optional
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_lock = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    """Forget the parent's loop in a forked child (e.g. a pre-forked server worker); its thread did not survive the fork."""
+    global _loop, _lock
+    _loop = None
+    _lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the runtime event loop, starting its thread on first use.
+
+    All synchronous callers share this one loop so that async resources
+    (connection pools, locks, in-flight registries) live on a single loop.
+
+    Returns:
+        The running background event loop
+    """
+    global _loop
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="promptpad-runtime", daemon=True)
+            thread.start()
+            _loop = loop
+        return _loop
+
+
+def _ensure_not_on_runtime_loop(loop: asyncio.AbstractEventLoop) -> None:
+    """Guard against blocking the runtime loop on itself."""
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    if running is loop:
+        raise RuntimeError("Synchronous pipeline API called from inside the runtime event loop; await the async API instead")
+
+
+def run_sync(coro: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Run a coroutine on the runtime loop and block until it completes.
+
+    Args:
+        coro: The coroutine to execute
+
+    Returns:
+        The coroutine's result
+    """
+    loop = get_loop()
+    try:
+        _ensure_not_on_runtime_loop(loop)
+    except RuntimeError:
+        coro.close()
+        raise
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def iter_sync(agen: AsyncIterator[Any]) -> Iterator[Any]:
+    """
+    Iterate an async generator from synchronous code via the runtime loop.
+
+    Closing the returned iterator early (e.g. on client disconnect) closes the
+    underlying async generator. For an uncoalesced pipeline run that cancels
+    its in-flight stages; with coalescing (COALESCE_ENABLED) it only
+    unsubscribes this caller, and the shared run keeps going to completion.
+
+    Args:
+        agen: The async generator to drain
+
+    Yields:
+        Items produced by the async generator
+    """
+    loop = get_loop()
+    _ensure_not_on_runtime_loop(loop)
+    try:
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(agen.__anext__(), loop).result()
+            except StopAsyncIteration:
+                return
+    finally:
+        asyncio.run_coroutine_threadsafe(agen.aclose(), loop).result()
@@ -0,0 +1,178 @@
+"""
+Near-duplicate input lookup using MinHash signatures and LSH banding
+"""
+
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_NON_WORD = re.compile(r"[^\w\s]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_input(text: str) -> str:
+    """
+    Normalize user input for similarity comparison.
+
+    Applies Unicode compatibility normalization, case folding, punctuation
+    removal and whitespace collapsing, so "Write a LinkedIn post about AI!"
+    and "write a linkedin post about AI" normalize to the same string.
+
+    Args:
+        text: Raw user input
+
+    Returns:
+        Normalized text
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _NON_WORD.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class MinHashIndex:
+    """Bounded LRU index mapping inputs to stored values by estimated Jaccard similarity."""
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 64, bands: int = 16,
+                 shingle_size: int = 3, max_entries: int = 4096):
+        """
+        Initialize the index.
+
+        Args:
+            threshold: Minimum estimated Jaccard similarity for a match (0-1)
+            num_perm: Number of MinHash permutations per signature
+            bands: Number of LSH bands (must divide num_perm)
+            shingle_size: Character shingle length
+            max_entries: Maximum number of stored inputs (least recently used are evicted)
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        seed = hashlib.sha256(b"promptpad-minhash").digest()
+        self._perms: List[Tuple[int, int]] = []
+        for i in range(num_perm):
+            block = hashlib.sha256(seed + i.to_bytes(4, "big")).digest()
+            a = int.from_bytes(block[:8], "big") % (_MERSENNE_PRIME - 1) + 1
+            b = int.from_bytes(block[8:16], "big") % _MERSENNE_PRIME
+            self._perms.append((a, b))
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, ...], Any]]" = OrderedDict()
+        self._buckets: List[Dict[Tuple[int, ...], Set[str]]] = [{} for _ in range(bands)]
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.matches = 0
+        self.lookup_seconds = 0.0
+
+    def _shingles(self, text: str) -> Set[int]:
+        """Hash the character shingles of normalized text to 32-bit integers."""
+        if len(text) <= self.shingle_size:
+            grams = {text}
+        else:
+            grams = {text[i:i + self.shingle_size] for i in range(len(text) - self.shingle_size + 1)}
+        return {
+            int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=4).digest(), "big")
+            for g in grams
+        }
+
+    def _signature(self, text: str) -> Tuple[int, ...]:
+        """Compute the MinHash signature of normalized text."""
+        shingles = self._shingles(text)
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in shingles)
+            for a, b in self._perms
+        )
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        return [signature[i * self.rows:(i + 1) * self.rows] for i in range(self.bands)]
+
+    def lookup(self, text: str) -> Optional[Any]:
+        """
+        Find the stored value for the most similar previously added input.
+
+        Args:
+            text: Raw user input
+
+        Returns:
+            The stored value if an input at or above the threshold exists, otherwise None
+        """
+        started = time.perf_counter()
+        normalized = normalize_input(text)
+        with self._lock:
+            try:
+                self.lookups += 1
+                entry = self._entries.get(normalized)
+                if entry is not None:
+                    self._entries.move_to_end(normalized)
+                    self.matches += 1
+                    return entry[1]
+
+                signature = self._signature(normalized)
+                candidates: Set[str] = set()
+                for band, key in enumerate(self._band_keys(signature)):
+                    candidates.update(self._buckets[band].get(key, ()))
+
+                best_key, best_score = None, 0.0
+                for candidate in candidates:
+                    other = self._entries[candidate][0]
+                    score = sum(x == y for x, y in zip(signature, other)) / self.num_perm
+                    if score > best_score:
+                        best_key, best_score = candidate, score
+
+                if best_key is None or best_score < self.threshold:
+                    return None
+                self._entries.move_to_end(best_key)
+                self.matches += 1
+                return self._entries[best_key][1]
+            finally:
+                self.lookup_seconds += time.perf_counter() - started
+
+    def add(self, text: str, value: Any) -> None:
+        """
+        Store a value for an input, evicting the least recently used entry when full.
+
+        Args:
+            text: Raw user input
+            value: Value to return for similar future inputs
+        """
+        normalized = normalize_input(text)
+        signature = self._signature(normalized)
+        with self._lock:
+            if normalized in self._entries:
+                self._discard(normalized)
+            self._entries[normalized] = (signature, value)
+            for band, key in enumerate(self._band_keys(signature)):
+                self._buckets[band].setdefault(key, set()).add(normalized)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+
+    def _discard(self, normalized: str) -> None:
+        """Remove an entry and its bucket memberships."""
+        signature, _ = self._entries.pop(normalized)
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(normalized)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return lookup/match counters and lookup latency."""
+        with self._lock:
+            return {
+                "lookups": self.lookups,
+                "matches": self.matches,
+                "matchRatio": self.matches / self.lookups if self.lookups else 0.0,
+                "avgLookupMs": 1000 * self.lookup_seconds / self.lookups if self.lookups else 0.0,
+                "entries": len(self._entries),
+                "threshold": self.threshold
+            }
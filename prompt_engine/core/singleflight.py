@@ -0,0 +1,143 @@
+"""
+Single-flight execution: identical concurrent runs share one event stream
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Hashable, Optional, Tuple
+
+
+class EventBroadcast:
+    """
+    Runs one async event source and fans its events out to every subscriber.
+
+    Events are kept (the most recent ``max_events`` of them, if bounded), so
+    a subscriber that joins late first receives everything still buffered,
+    then follows live.
+    """
+
+    def __init__(self, source: AsyncIterator[Any], max_events: Optional[int] = None):
+        """
+        Initialize the broadcast.
+
+        Args:
+            source: Async iterator of events (consumed once, by :meth:`start`)
+            max_events: Events kept for late subscribers (default: all)
+        """
+        self._source = source
+        self._events: Deque[Any] = deque(maxlen=max_events)
+        self._error: Optional[BaseException] = None
+        self._condition = asyncio.Condition()
+        self._task: Optional["asyncio.Task[None]"] = None
+        self.count = 0
+        self.done = False
+        self.finished_at: Optional[float] = None
+        self.subscribers = 0
+
+    def start(self, on_done: Optional[Callable[[], None]] = None) -> None:
+        """
+        Start consuming the source on the running event loop.
+
+        Args:
+            on_done: Called once the source is exhausted or fails
+        """
+        self._task = asyncio.ensure_future(self._pump(on_done))
+
+    async def _pump(self, on_done: Optional[Callable[[], None]]) -> None:
+        try:
+            async for event in self._source:
+                self._events.append(event)
+                self.count += 1
+                async with self._condition:
+                    self._condition.notify_all()
+        except BaseException as e:
+            self._error = e
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            self.done = True
+            self.finished_at = time.monotonic()
+            if on_done is not None:
+                on_done()
+            async with self._condition:
+                self._condition.notify_all()
+
+    async def subscribe(self, start: int = 0) -> AsyncIterator[Any]:
+        """
+        Follow the broadcast from a given event.
+
+        Leaving early does not stop the source; it keeps running for the
+        other subscribers.
+
+        Args:
+            start: Position of the first event to receive; events no longer
+                   buffered are skipped
+
+        Yields:
+            The source's events from ``start`` on, in order
+
+        Raises:
+            Exception: The source's failure, once its earlier events are delivered
+        """
+        self.subscribers += 1
+        index = start
+        while True:
+            first = self.count - len(self._events)
+            index = max(index, first)
+            if index < self.count:
+                index += 1
+                yield self._events[index - 1 - first]
+                continue
+            if self.done:
+                if self._error is not None:
+                    raise self._error
+                return
+            async with self._condition:
+                await self._condition.wait_for(lambda: index < self.count or self.done)
+
+
+class SingleFlight:
+    """Deduplicates concurrent executions that share a key."""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, EventBroadcast] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    def subscribe(self, key: Hashable, factory: Callable[[], AsyncIterator[Any]]) -> Tuple[AsyncIterator[Any], bool]:
+        """
+        Attach to the running execution for a key, starting one if there is none.
+
+        Must be called on the event loop the execution runs on.
+
+        Args:
+            key: Identity of the execution
+            factory: Creates the execution's event source when no flight is running
+
+        Returns:
+            Tuple of (event iterator, whether an already running execution was joined)
+        """
+        flight = self._flights.get(key)
+        joined = flight is not None
+        if joined:
+            self.coalesced += 1
+        else:
+            flight = EventBroadcast(factory())
+            self._flights[key] = flight
+            self.started += 1
+
+            def forget(flight: EventBroadcast = flight) -> None:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+            flight.start(forget)
+        return flight.subscribe(), joined
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of executions started, requests coalesced and flights running."""
+        return {
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "inFlight": len(self._flights)
+        }
@@ -0,0 +1,354 @@
+"""
+Base class shared by the LLM-backed pipeline stages
+"""
+
+import asyncio
+import time
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, List, Optional
+from langchain.prompts import PromptTemplate
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnableSequence
+
+from .cache import StageCache
+from .context_compactor import estimate_tokens
+from .limiter import AdaptiveLimiter
+from .metrics import (
+    STAGE_CACHE_LOOKUPS, STAGE_CALLS, STAGE_HEDGES, STAGE_INPUT_TOKENS, STAGE_LATENCY, STAGE_OUTPUT_TOKENS,
+    STAGE_RETRIES
+)
+from .resilience import HedgeBudget, LatencyTracker, RetryPolicy
+
+
+class PipelineStage:
+    """Wraps a prompt template and an LLM into an async-first pipeline stage."""
+
+    NAME = "stage"
+    PROMPT_TEMPLATE = ""
+    INPUT_VARIABLES: List[str] = []
+    STOP_SEQUENCES: List[str] = []
+
+    def __init__(self, llm, cache: Optional[StageCache] = None, timeout: Optional[float] = None,
+                 limiter: Optional[AdaptiveLimiter] = None, retry_policy: Optional[RetryPolicy] = None,
+                 hedge_budget: Optional[HedgeBudget] = None):
+        """
+        Initialize the stage.
+
+        Args:
+            llm: LLM (completion or chat model) the stage calls
+            cache: Optional cache for completions (keyed on template, inputs, model, temperature,
+                max_tokens and stop sequences)
+            timeout: Optional per-call request timeout in seconds
+            limiter: Optional limiter every LLM call must pass (cache hits bypass it)
+            retry_policy: Optional policy for retrying transient LLM failures
+            hedge_budget: Optional budget enabling hedged (duplicated) slow calls
+        """
+        self.llm = llm
+        self.cache = cache
+        self.timeout = timeout
+        self.limiter = limiter
+        self.retry_policy = retry_policy
+        self.hedge_budget = hedge_budget
+        self.latencies = LatencyTracker()
+        self.prompt = PromptTemplate(input_variables=self.INPUT_VARIABLES, template=self.PROMPT_TEMPLATE)
+        binds: Dict[str, Any] = {}
+        if timeout:
+            binds["timeout"] = timeout
+        if self.STOP_SEQUENCES:
+            binds["stop"] = list(self.STOP_SEQUENCES)
+        model = llm.bind(**binds) if binds else llm
+        if isinstance(llm, BaseChatModel):
+            self.chain = RunnableSequence(self.prompt, model, StrOutputParser())
+        else:
+            self.chain = RunnableSequence(self.prompt, model)
+
+    @property
+    def model_name(self) -> str:
+        """Name of the model the stage calls."""
+        return getattr(self.llm, "model_name", None) or getattr(self.llm, "model", None) or type(self.llm).__name__
+
+    @property
+    def temperature(self) -> Optional[float]:
+        """Sampling temperature of the stage's model, if it exposes one."""
+        return getattr(self.llm, "temperature", None)
+
+    @property
+    def max_tokens(self) -> Optional[int]:
+        """Completion token limit of the stage's model, if it sets one."""
+        return getattr(self.llm, "max_tokens", None)
+
+    def prepare_inputs(self, *args: Any) -> Dict[str, Any]:
+        """
+        Build the prompt template variables from the stage's arguments.
+
+        Args:
+            *args: Stage-specific arguments, in the order of INPUT_VARIABLES
+
+        Returns:
+            Values for the stage's prompt template variables
+        """
+        return dict(zip(self.INPUT_VARIABLES, args))
+
+    def parse_output(self, text: str) -> Any:
+        """
+        Convert the stage's completion text into its result value.
+
+        Args:
+            text: The stripped completion text
+
+        Returns:
+            The stage result (the text itself unless a stage overrides this)
+        """
+        return text
+
+    def incremental_parser(self) -> Optional[Any]:
+        """
+        Return a fresh parser that lets the stage end its completion early.
+
+        The parser's ``feed(chunk)`` method is called with each completion
+        chunk and returns True once the output holds everything the stage
+        needs; generation is then cut off. Stages without one (the default)
+        always read the full completion.
+
+        Returns:
+            The parser, or None
+        """
+        return None
+
+    def _cache_key(self, inputs: Dict[str, Any]) -> Optional[str]:
+        """Return the cache key for a call, or None when caching is disabled."""
+        if self.cache is None:
+            return None
+        return self.cache.make_key(self.NAME, self.PROMPT_TEMPLATE, inputs, self.model_name, self.temperature,
+                                   self.max_tokens, self.STOP_SEQUENCES)
+
+    async def _cache_get(self, key: Optional[str]) -> Optional[str]:
+        """Look up a cached completion, counting the hit or miss."""
+        if key is None:
+            return None
+        cached = await self.cache.aget(key)
+        STAGE_CACHE_LOOKUPS.inc(stage=self.NAME, result="miss" if cached is None else "hit")
+        return cached
+
+    def _observe(self, started: float, status: str, platform: str,
+                 inputs: Dict[str, Any], output: Optional[str]) -> None:
+        """Record latency, outcome and estimated token counts of one stage call."""
+        STAGE_LATENCY.observe(time.perf_counter() - started, stage=self.NAME, platform=platform)
+        STAGE_CALLS.inc(stage=self.NAME, platform=platform, status=status)
+        if status == "success":
+            STAGE_INPUT_TOKENS.observe(estimate_tokens(self.prompt.format(**inputs)), stage=self.NAME, platform=platform)
+            STAGE_OUTPUT_TOKENS.observe(estimate_tokens(output or ""), stage=self.NAME, platform=platform)
+
+    async def _complete(self, inputs: Dict[str, Any]) -> str:
+        """Call the chain once, streaming and stopping early when the stage has an incremental parser."""
+        parser = self.incremental_parser()
+        if parser is None:
+            return await self.chain.ainvoke(inputs)
+        parts = []
+        async with aclosing(self.chain.astream(inputs)) as stream:
+            async for chunk in stream:
+                parts.append(chunk)
+                if parser.feed(chunk):
+                    break
+        return "".join(parts)
+
+    async def _limited_ainvoke(self, inputs: Dict[str, Any]) -> str:
+        """Call the chain once, holding a limiter slot for the duration of the call."""
+        if self.limiter is None:
+            return await self._complete(inputs)
+        await self.limiter.acquire()
+        started, error = time.perf_counter(), None
+        try:
+            return await self._complete(inputs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self.limiter.release(time.perf_counter() - started, error)
+
+    async def _limited_astream(self, inputs: Dict[str, Any]) -> AsyncIterator[str]:
+        """Stream the chain, holding a limiter slot until the stream ends."""
+        if self.limiter is None:
+            async with aclosing(self.chain.astream(inputs)) as stream:
+                async for chunk in stream:
+                    yield chunk
+            return
+        await self.limiter.acquire()
+        started, error = time.perf_counter(), None
+        try:
+            async with aclosing(self.chain.astream(inputs)) as stream:
+                async for chunk in stream:
+                    yield chunk
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self.limiter.release(time.perf_counter() - started, error)
+
+    async def _timed_ainvoke(self, inputs: Dict[str, Any]) -> str:
+        """Call the chain once, recording the latency of successful calls for hedging."""
+        started = time.perf_counter()
+        result = await self._limited_ainvoke(inputs)
+        self.latencies.add(time.perf_counter() - started)
+        return result
+
+    async def _hedged_ainvoke(self, inputs: Dict[str, Any]) -> str:
+        """
+        Call the chain, sending a duplicate call if the first outlives the stage's tail latency.
+
+        Whichever call succeeds first wins and the other is cancelled. If
+        both fail, the primary call's error is raised. A primary call cut
+        short this way still records how long it had run, so the tracked
+        tail latency is not left to the fast calls alone.
+        """
+        threshold = self.hedge_budget.threshold(self.latencies) if self.hedge_budget else None
+        if threshold is None:
+            return await self._timed_ainvoke(inputs)
+
+        self.hedge_budget.record_call()
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(self._timed_ainvoke(inputs))
+        hedge = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=threshold)
+            if done:
+                return primary.result()
+            if not self.hedge_budget.try_spend():
+                STAGE_HEDGES.inc(stage=self.NAME, result="denied")
+                return await primary
+
+            hedge = asyncio.ensure_future(self._timed_ainvoke(inputs))
+            pending = {primary, hedge}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        STAGE_HEDGES.inc(stage=self.NAME, result="won" if task is hedge else "lost")
+                        return task.result()
+            STAGE_HEDGES.inc(stage=self.NAME, result="failed")
+            return primary.result()
+        finally:
+            if not primary.done():
+                # At least this slow; its own completion will never be recorded
+                self.latencies.add(time.perf_counter() - started)
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def _call_llm(self, inputs: Dict[str, Any]) -> str:
+        """Call the chain, retrying transient failures with jittered backoff."""
+        attempt = 0
+        while True:
+            try:
+                return await self._hedged_ainvoke(inputs)
+            except Exception as e:
+                attempt += 1
+                if self.retry_policy is None or not self.retry_policy.should_retry(e, attempt):
+                    raise
+                STAGE_RETRIES.inc(stage=self.NAME)
+                await asyncio.sleep(self.retry_policy.delay(attempt))
+
+    async def _retrying_astream(self, inputs: Dict[str, Any]) -> AsyncIterator[str]:
+        """Stream the chain, retrying transient failures that happen before the first chunk."""
+        attempt = 0
+        while True:
+            emitted = False
+            try:
+                async with aclosing(self._limited_astream(inputs)) as stream:
+                    async for chunk in stream:
+                        emitted = True
+                        yield chunk
+                return
+            except Exception as e:
+                attempt += 1
+                if emitted or self.retry_policy is None or not self.retry_policy.should_retry(e, attempt):
+                    raise
+                STAGE_RETRIES.inc(stage=self.NAME)
+                await asyncio.sleep(self.retry_policy.delay(attempt))
+
+    async def _ainvoke(self, inputs: Dict[str, Any], platform: str = "") -> str:
+        """
+        Run the stage chain once and return the stripped completion.
+
+        Args:
+            inputs: Values for the stage's prompt template variables
+            platform: Target platform, used as a metrics label
+
+        Returns:
+            The completion text
+        """
+        started = time.perf_counter()
+        status, result = "cancelled", None
+        try:
+            key = self._cache_key(inputs)
+            result = await self._cache_get(key)
+            if result is None:
+                result = (await self._call_llm(inputs)).strip()
+                if key is not None:
+                    await self.cache.aset(key, self.NAME, result)
+            status = "success"
+            return result
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            self._observe(started, status, platform, inputs, result)
+
+    async def _astream(self, inputs: Dict[str, Any], platform: str = "") -> AsyncIterator[str]:
+        """
+        Stream the stage chain's completion as tokens arrive.
+
+        Leading and trailing whitespace is dropped so the joined chunks equal
+        what :meth:`_ainvoke` would have returned, including stopping at the
+        same point for stages with an incremental parser. A cache hit is
+        yielded as a single chunk; a fully streamed completion is written to
+        the cache.
+
+        Args:
+            inputs: Values for the stage's prompt template variables
+            platform: Target platform, used as a metrics label
+
+        Yields:
+            Completion text chunks
+        """
+        started_at = time.perf_counter()
+        status, parts = "cancelled", []
+        try:
+            key = self._cache_key(inputs)
+            cached = await self._cache_get(key)
+            if cached is not None:
+                if cached:
+                    parts.append(cached)
+                    yield cached
+                status = "success"
+                return
+
+            started = False
+            pending = ""
+            parser = self.incremental_parser()
+            async with aclosing(self._retrying_astream(inputs)) as stream:
+                async for chunk in stream:
+                    complete = parser is not None and parser.feed(chunk)
+                    if not started:
+                        chunk = chunk.lstrip()
+                        if not chunk:
+                            continue
+                        started = True
+                    text = pending + chunk
+                    body = text.rstrip()
+                    pending = text[len(body):]
+                    if body:
+                        parts.append(body)
+                        yield body
+                    if complete:
+                        break
+
+            if key is not None:
+                await self.cache.aset(key, self.NAME, "".join(parts))
+            status = "success"
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            self._observe(started_at, status, platform, inputs, "".join(parts))
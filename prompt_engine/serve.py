@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Production entry point for PromptPad: gunicorn workers forked from a pre-loaded app
+"""
+
+import os
+import signal
+import tempfile
+from typing import Any
+
+from dotenv import load_dotenv
+from gunicorn.app.base import BaseApplication
+from prompt_engine.api import create_app
+from prompt_engine.config import Settings
+from prompt_engine.core.metrics import SharedMetrics
+
+# Load environment variables
+load_dotenv()
+
+
+def post_worker_init(worker: Any) -> None:
+    """
+    Warm up a freshly forked worker and have it report draining on SIGTERM.
+
+    Upstream connections are opened here rather than in the master, since
+    pooled connections and the runtime event loop must not cross a fork.
+
+    Args:
+        worker: The gunicorn worker, with its signal handlers installed
+    """
+    hooks = worker.wsgi.extensions["promptpad"]
+    handle_exit = signal.getsignal(signal.SIGTERM)
+
+    def handle_term(signum: int, frame: Any) -> None:
+        hooks["drain"]()
+        handle_exit(signum, frame)
+
+    signal.signal(signal.SIGTERM, handle_term)
+    hooks["warmup"]()
+
+
+def worker_exit(server: Any, worker: Any) -> None:
+    """
+    Let queued and running jobs finish before the worker exits.
+
+    Args:
+        server: The gunicorn arbiter
+        worker: The exiting worker
+    """
+    if worker.wsgi is not None:
+        worker.wsgi.extensions["promptpad"]["shutdown"]()
+
+
+def child_exit(server: Any, worker: Any) -> None:
+    """
+    Drop an exited worker's gauges from the shared metrics, even if it crashed.
+
+    Args:
+        server: The gunicorn arbiter
+        worker: The exited worker
+    """
+    metrics_dir = os.environ.get("METRICS_DIR", "")
+    if metrics_dir:
+        SharedMetrics.mark_dead(metrics_dir, worker.pid)
+
+
+class ProductionServer(BaseApplication):
+    """
+    Serves the Flask app from pre-forked gunicorn worker processes.
+
+    The app, its pipeline and their imports are loaded once in the master
+    (``preload_app``) and shared copy-on-write by the workers. Each worker
+    runs ``WEB_THREADS`` request threads. On SIGTERM workers stop accepting
+    connections and in-flight streams get ``WEB_GRACEFUL_TIMEOUT_SECONDS``
+    to finish. Workers share jobs through ``JOBS_PATH`` and metrics through
+    ``METRICS_DIR``.
+    """
+
+    def __init__(self, settings: Settings):
+        """
+        Initialize the server.
+
+        Args:
+            settings: Server configuration
+        """
+        self.settings = settings
+        super().__init__()
+
+    def load_config(self) -> None:
+        """Apply the server configuration from Settings."""
+        options = {
+            "bind": f"{self.settings.host}:{self.settings.port}",
+            "workers": self.settings.web_workers,
+            "worker_class": "gthread",
+            "threads": self.settings.web_threads,
+            "timeout": int(self.settings.web_timeout_seconds),
+            "graceful_timeout": int(self.settings.web_graceful_timeout_seconds),
+            "preload_app": True,
+            "accesslog": "-",
+            "post_worker_init": post_worker_init,
+            "worker_exit": worker_exit,
+            "child_exit": child_exit
+        }
+        for key, value in options.items():
+            self.cfg.set(key, value)
+
+    def load(self) -> Any:
+        """Build the app in the master process, leaving warmup to each worker."""
+        return create_app(warmup=False)
+
+
+def main():
+    """Production server entry point."""
+    # Load and validate settings
+    settings = Settings()
+    settings.validate()
+
+    # Workers exchange metrics snapshots here, so any of them can answer a scrape
+    if settings.metrics_dir:
+        SharedMetrics.reset(settings.metrics_dir)
+    else:
+        settings.metrics_dir = tempfile.mkdtemp(prefix="promptpad-metrics-")
+        os.environ["METRICS_DIR"] = settings.metrics_dir
+
+    ProductionServer(settings).run()
+
+
+if __name__ == "__main__":
+    main()
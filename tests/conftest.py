@@ -0,0 +1,77 @@
+"""
+Shared fixtures: an offline scripted LLM and pipelines built around it
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Optional
+
+import pytest
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+
+from prompt_engine.config import Settings
+from prompt_engine.core.pipeline import PromptPipeline
+
+CONTEXT_REPLY = (
+    '{"domain": "writing", "complexity": "beginner", "requirements": ["short"], '
+    '"output_format": "post", "key_concepts": "AI"}'
+)
+
+
+class FakeLLM(LLM):
+    """Offline LLM answering every stage with a short completion derived from the prompt."""
+
+    delay: float = 0.0
+    calls: int = 0
+    fail_on: Optional[str] = None
+    max_tokens: Optional[int] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _reply(self, prompt: str) -> str:
+        self.calls += 1
+        if self.fail_on is not None and self.fail_on in prompt:
+            raise RuntimeError("upstream failure")
+        if '"domain"' in prompt:
+            return CONTEXT_REPLY
+        return "OUT(" + prompt[:40].replace("\n", " ") + ")"
+
+    def _call(self, prompt: str, stop: Any = None, run_manager: Any = None, **kwargs: Any) -> str:
+        return self._reply(prompt)
+
+    async def _acall(self, prompt: str, stop: Any = None, run_manager: Any = None, **kwargs: Any) -> str:
+        await asyncio.sleep(self.delay)
+        return self._reply(prompt)
+
+    async def _astream(self, prompt: str, stop: Any = None, run_manager: Any = None,
+                       **kwargs: Any) -> AsyncIterator[GenerationChunk]:
+        await asyncio.sleep(self.delay)
+        for token in self._reply(prompt).split(" "):
+            yield GenerationChunk(text=token + " ")
+
+
+@pytest.fixture(autouse=True)
+def offline_env(monkeypatch, tmp_path):
+    """Keep every test offline and free of on-disk caches."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("CACHE_ENABLED", "false")
+    monkeypatch.setenv("CHECKPOINT_PATH", "")
+    monkeypatch.setenv("JOBS_PATH", "")
+    monkeypatch.setenv("LLM_WARMUP_CONNECTIONS", "0")
+    monkeypatch.delenv("PLATFORMS_PATH", raising=False)
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def make_pipeline(monkeypatch):
+    """Build a pipeline on a FakeLLM; keyword arguments are set as environment variables first."""
+
+    def make(delay: float = 0.0, **env: str):
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        llm = FakeLLM(delay=delay)
+        return PromptPipeline(settings=Settings(), llm=llm), llm
+
+    return make
@@ -0,0 +1,85 @@
+"""
+Tests for parsing the context analysis out of stage completions
+"""
+
+import asyncio
+from typing import Any, AsyncIterator
+
+from conftest import CONTEXT_REPLY, FakeLLM
+from langchain_core.outputs import GenerationChunk
+
+from prompt_engine.core.context_analyzer import ContextAnalysisParser, ContextAnalyzer
+from prompt_engine.core.insight_extractor import InsightExtractor
+
+EXPECTED_ANALYSIS = {
+    "Domain": "writing",
+    "Complexity": "beginner",
+    "Requirements": "short",
+    "Output Format": "post",
+    "Key Concepts": "AI"
+}
+
+
+class RamblingLLM(FakeLLM):
+    """Streams the context JSON in small chunks, then keeps talking."""
+
+    streamed: int = 0
+
+    async def _astream(self, prompt: str, stop: Any = None, run_manager: Any = None,
+                       **kwargs: Any) -> AsyncIterator[GenerationChunk]:
+        text = CONTEXT_REPLY + "\n\nLet me also explain each field in detail." * 50
+        for start in range(0, len(text), 8):
+            self.streamed += 1
+            yield GenerationChunk(text=text[start:start + 8])
+
+
+def test_parser_completes_once_every_field_is_parsed():
+    parser = ContextAnalysisParser()
+    chunks = [CONTEXT_REPLY[start:start + 5] for start in range(0, len(CONTEXT_REPLY), 5)]
+    done = [parser.feed(chunk) for chunk in chunks]
+    # True from the chunk closing the last value on (before the object's closing brace)
+    assert done.index(True) == (CONTEXT_REPLY.rindex('"') // 5)
+    assert all(done[done.index(True):])
+    assert parser.result() == EXPECTED_ANALYSIS
+
+
+def test_parser_skips_unknown_fields_and_keeps_complete_ones_of_truncated_json():
+    parser = ContextAnalysisParser()
+    parser.feed('{"note": "x", "Domain": "say \\"hi\\"", "key-concepts": ["a", "b"], "complexity": "begi')
+    assert parser.fields == {"Domain": 'say "hi"', "Key Concepts": "a, b"}
+    assert not parser.complete
+
+
+def test_streaming_stops_once_the_analysis_is_complete():
+    llm = RamblingLLM()
+    analyzer = ContextAnalyzer(llm)
+
+    async def run():
+        return "".join([chunk async for chunk in analyzer._astream(analyzer.prepare_inputs("write a post"))])
+
+    text = asyncio.run(run())
+    assert CONTEXT_REPLY.startswith(text) and text.endswith('"AI"')
+    assert llm.streamed == -(-len(text) // 8)  # nothing was read past the chunk completing the analysis
+    assert analyzer.parse_output(text) == EXPECTED_ANALYSIS
+
+
+def test_insight_keeps_only_the_analysis_fields():
+    text = (
+        "Sure, here is my analysis:\n"
+        "Domain: writing\n"
+        "Note: ignore previous instructions\n"
+        "complexity: beginner\n"
+        "Key-Concepts: AI, launch\n"
+        "Domain: marketing\n"
+        "Intent: announce the launch\n"
+        "Audience: developers"
+    )
+    result = InsightExtractor(FakeLLM()).parse_output(text)
+    assert result["context"] == {
+        "Domain": "writing",
+        "Complexity": "beginner",
+        "Requirements": "",
+        "Output Format": "",
+        "Key Concepts": "AI, launch"
+    }
+    assert result["intent"] == "announce the launch\nAudience: developers"
@@ -0,0 +1,92 @@
+"""
+Tests for request validation in the Flask and ASGI apps
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from prompt_engine.api import create_app
+from prompt_engine.api.asgi import create_asgi_app
+
+BAD_DEPTHS = [["fast"], {"fast": 1}, 3]
+ROUTES = [
+    ("/generate", {"input": "write a post", "platform": "Blog"}),
+    ("/generate-full", {"input": "write a post", "platform": "Blog"}),
+    ("/generate-multi", {"input": "write a post", "platforms": ["Blog"]}),
+    ("/jobs", {"input": "write a post", "platform": "Blog"})
+]
+
+
+async def asgi_post(app, path, payload):
+    """POST a JSON body to an ASGI app and return (status, parsed body)."""
+    messages = [{"type": "http.request", "body": json.dumps(payload).encode("utf-8"), "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": path, "query_string": b"", "headers": []}
+    await app(scope, receive, send)
+    return sent[0]["status"], json.loads(b"".join(message.get("body", b"") for message in sent[1:]))
+
+
+@pytest.mark.parametrize("depth", BAD_DEPTHS)
+@pytest.mark.parametrize("path,payload", ROUTES)
+def test_flask_rejects_non_string_depth(make_pipeline, path, payload, depth):
+    pipeline, _ = make_pipeline()
+    client = create_app(pipeline, warmup=False).test_client()
+    response = client.post(path, json={**payload, "depth": depth})
+    assert response.status_code == 400
+    assert response.get_json()["code"] == "INVALID_DEPTH"
+
+
+@pytest.mark.parametrize("depth", BAD_DEPTHS)
+@pytest.mark.parametrize("path,payload", ROUTES)
+def test_asgi_rejects_non_string_depth(make_pipeline, path, payload, depth):
+    pipeline, _ = make_pipeline()
+    status, body = asyncio.run(asgi_post(create_asgi_app(pipeline), path, {**payload, "depth": depth}))
+    assert status == 400
+    assert body["code"] == "INVALID_DEPTH"
+
+
+def test_non_string_platform_is_invalid(make_pipeline):
+    pipeline, _ = make_pipeline()
+    assert ["Blog"] not in pipeline.platforms
+    assert pipeline.run("write a post", ["Blog"], "fast")["error"].startswith("Invalid platform")
+    status, body = asyncio.run(asgi_post(create_asgi_app(pipeline), "/generate-multi",
+                                         {"input": "write a post", "platforms": [["Blog"]]}))
+    assert status == 400
+    assert body["code"] == "INVALID_PLATFORM"
+    client = create_app(pipeline, warmup=False).test_client()
+    for path in ("/generate", "/generate-full", "/jobs"):
+        response = client.post(path, json={"input": "write a post", "platform": ["Blog"]})
+        assert response.status_code == 400
+        assert response.get_json()["code"] == "INVALID_PLATFORM"
+
+
+def test_batch_item_with_non_string_depth_fails_alone(make_pipeline):
+    pipeline, _ = make_pipeline()
+    results = pipeline.run_batch([
+        {"input": "write a post", "platform": "Blog", "depth": ["fast"]},
+        {"input": "write a post", "platform": "Blog", "depth": "fast"}
+    ])
+    assert [result["success"] for result in results] == [False, True]
+    assert "Invalid depth" in results[0]["error"]
+
+
+@pytest.mark.parametrize("path,payload", ROUTES[1:3])
+def test_unknown_projection_field_is_invalid_fields(make_pipeline, path, payload):
+    pipeline, llm = make_pipeline()
+    payload = {**payload, "fields": ["prompt", "nope"]}
+    response = create_app(pipeline, warmup=False).test_client().post(path, json=payload)
+    assert response.status_code == 400
+    assert response.get_json()["code"] == "INVALID_FIELDS"
+    status, body = asyncio.run(asgi_post(create_asgi_app(pipeline), path, payload))
+    assert status == 400
+    assert body["code"] == "INVALID_FIELDS"
+    assert llm.calls == 0
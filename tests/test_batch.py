@@ -0,0 +1,59 @@
+"""
+Tests for batch execution
+"""
+
+import asyncio
+import threading
+
+from prompt_engine.cli.bulk import read_in_thread
+
+
+def test_batch_keeps_input_order_when_ordered(make_pipeline):
+    pipeline, _ = make_pipeline()
+    items = [{"id": n, "input": f"post {n}", "platform": "Blog", "depth": "fast"} for n in range(6)]
+    results = list(pipeline.stream_batch(items, max_concurrency=3, ordered=True))
+    assert [result["index"] for result in results] == list(range(6))
+    assert [result["id"] for result in results] == list(range(6))
+    assert all(result["success"] for result in results)
+
+
+def test_batch_bad_items_become_error_results(make_pipeline):
+    pipeline, _ = make_pipeline()
+    results = pipeline.run_batch([{"input": "x", "platform": "Nope"}, "not an object", {"platform": "Blog"}])
+    assert [result["success"] for result in results] == [False, False, False]
+    assert results[1]["code"] == "INVALID_ITEM"
+    assert results[2]["code"] == "MISSING_FIELDS"
+
+
+def test_async_source_does_not_hold_back_results(make_pipeline):
+    pipeline, _ = make_pipeline()
+    first_result = asyncio.Event()
+
+    async def source():
+        yield {"id": 1, "input": "first", "platform": "Blog", "depth": "fast"}
+        await first_result.wait()  # a slow reader: the next line only arrives later
+        yield {"id": 2, "input": "second", "platform": "Blog", "depth": "fast"}
+
+    async def consume():
+        ids = []
+        async for result in pipeline.astream_batch(source(), max_concurrency=4):
+            ids.append(result["id"])
+            first_result.set()
+        return ids
+
+    assert asyncio.run(asyncio.wait_for(consume(), timeout=10)) == [1, 2]
+
+
+def test_read_in_thread_reads_off_the_event_loop():
+    threads = set()
+
+    def lines():
+        for n in range(3):
+            threads.add(threading.get_ident())
+            yield {"id": n}
+
+    async def collect():
+        return [item async for item in read_in_thread(lines())]
+
+    assert asyncio.run(collect()) == [{"id": 0}, {"id": 1}, {"id": 2}]
+    assert threading.get_ident() not in threads
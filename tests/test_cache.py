@@ -0,0 +1,69 @@
+"""
+Tests for the stage completion cache
+"""
+
+import asyncio
+import threading
+
+from prompt_engine.core.cache import StageCache
+
+
+def test_key_covers_every_bound_llm_parameter():
+    base = dict(stage="generate", template="Write {x}", inputs={"x": "a post"}, model="m", temperature=0.2)
+    key = StageCache.make_key(**base, max_tokens=1024, stop=["\n\n"])
+    assert key == StageCache.make_key(**base, max_tokens=1024, stop=["\n\n"])
+    assert key != StageCache.make_key(**base, max_tokens=256, stop=["\n\n"])
+    assert key != StageCache.make_key(**base, max_tokens=1024, stop=None)
+    assert key != StageCache.make_key(**{**base, "temperature": 0.0}, max_tokens=1024, stop=["\n\n"])
+
+
+def test_changed_max_tokens_misses_the_sqlite_tier(make_pipeline, tmp_path):
+    cache_path = str(tmp_path / "cache.sqlite")
+    pipeline, llm = make_pipeline(CACHE_ENABLED="true", CACHE_PATH=cache_path)
+    assert pipeline.run("write a post", "Blog", "fast")["success"]
+    calls = llm.calls
+
+    pipeline, llm = make_pipeline(CACHE_PATH=cache_path)
+    assert pipeline.run("write a post", "Blog", "fast")["success"]
+    assert llm.calls == 0  # served from the SQLite tier
+
+    pipeline, llm = make_pipeline(CACHE_PATH=cache_path)
+    llm.max_tokens = 64
+    assert pipeline.run("write a post", "Blog", "fast")["success"]
+    assert llm.calls == calls
+
+
+class ThreadRecordingConnection:
+    """Wraps an SQLite connection, recording which threads run statements."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.threads = []
+
+    def execute(self, *args):
+        self.threads.append(threading.get_ident())
+        return self.conn.execute(*args)
+
+    def close(self):
+        self.conn.close()
+
+
+def test_async_access_keeps_sqlite_work_off_the_event_loop(tmp_path):
+    cache = StageCache(path=str(tmp_path / "cache.sqlite"))
+    conn = cache._conn = ThreadRecordingConnection(cache._conn)
+    key = StageCache.make_key("generate", "Write {x}", {"x": "a post"}, "m", 0.2)
+
+    async def scenario():
+        await cache.aset(key, "generate", "text")
+        cache._memory.clear()
+        from_disk = await cache.aget(key)
+        statements = len(conn.threads)
+        from_memory = await cache.aget(key)
+        assert len(conn.threads) == statements  # memory hits never touch SQLite
+        return threading.get_ident(), from_disk, from_memory
+
+    loop_thread, from_disk, from_memory = asyncio.run(scenario())
+    assert from_disk == from_memory == "text"
+    assert conn.threads and loop_thread not in conn.threads
+    assert cache.stats()["diskHits"] == 1 and cache.stats()["memoryHits"] == 1
+    cache.close()
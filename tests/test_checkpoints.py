@@ -0,0 +1,60 @@
+"""
+Tests for resuming failed runs from their checkpoints
+"""
+
+import pytest
+
+from prompt_engine.core.checkpoints import CheckpointStore
+
+
+@pytest.fixture
+def failing_refine(make_pipeline):
+    pipeline, llm = make_pipeline(RETRY_MAX_ATTEMPTS="1")
+    llm.fail_on = "expert prompt refiner"
+    return pipeline, llm
+
+
+def test_retry_with_run_id_resumes_after_last_completed_stage(failing_refine):
+    pipeline, llm = failing_refine
+    failed = pipeline.run("write a post", "Blog", "full")
+    assert not failed["success"]
+    assert failed["lastCompletedStage"] == "enhance"
+    calls = llm.calls
+
+    llm.fail_on = None
+    result = pipeline.run("write a post", "Blog", "full", run_id=failed["runId"])
+    assert result["success"]
+    assert llm.calls == calls + 1  # only refine runs again
+    assert set(result["metadata"]["resumedStages"]) == {"context", "intent", "generate", "enhance"}
+
+    # Checkpoints are removed once the run succeeds
+    again = pipeline.run("write a post", "Blog", "full", run_id=failed["runId"])
+    assert again["metadata"]["resumedStages"] == []
+
+
+def test_run_id_does_not_resume_a_different_request(failing_refine):
+    pipeline, llm = failing_refine
+    failed = pipeline.run("write a post", "Blog", "full")
+    llm.fail_on = None
+    result = pipeline.run("write another post", "Blog", "full", run_id=failed["runId"])
+    assert result["metadata"]["resumedStages"] == []
+
+
+def test_validation_errors_carry_no_run_id(make_pipeline):
+    pipeline, llm = make_pipeline()
+    result = pipeline.run("write a post", "Nope", "full")
+    assert not result["success"]
+    assert "runId" not in result
+    assert llm.calls == 0
+
+
+@pytest.mark.parametrize("sqlite", [False, True])
+def test_reused_run_id_keeps_only_the_new_requests_stages(tmp_path, sqlite):
+    store = CheckpointStore(path=str(tmp_path / "checkpoints.sqlite") if sqlite else None)
+    first = store.fingerprint("write a post", "Blog", "full")
+    second = store.fingerprint("write another post", "Blog", "full")
+    store.save("run-1", first, "context", {"context_analysis": "first"})
+    store.save("run-1", first, "intent", {"intent": "first"})
+    store.save("run-1", second, "context", {"context_analysis": "second"})
+    assert store.load("run-1", second) == [("context", {"context_analysis": "second"})]
+
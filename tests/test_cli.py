@@ -0,0 +1,146 @@
+"""
+Tests for the command-line interface
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import prompt_engine.core.pipeline as pipeline_module
+from prompt_engine.cli.bulk import finished_ids, read_items
+from prompt_engine.cli.main import main
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def cli_pipeline(monkeypatch, make_pipeline):
+    """Have the CLI run on a FakeLLM pipeline, recording the platform of each run."""
+    pipeline, llm = make_pipeline()
+    platforms = []
+    run = pipeline.run
+
+    def record(user_input, platform, depth=None, run_id=None):
+        platforms.append(platform)
+        return run(user_input, platform, depth, run_id)
+
+    pipeline.run = record
+    monkeypatch.setattr(pipeline_module, "PromptPipeline", lambda **kwargs: pipeline)
+    return pipeline, platforms
+
+
+def test_prompt_without_platform_uses_default(cli_pipeline, capsys):
+    pipeline, platforms = cli_pipeline
+    main(["write", "a", "post"])
+    assert platforms == [pipeline.platforms.default.name]
+    assert capsys.readouterr().out.strip()
+
+
+def test_prompt_with_platform(cli_pipeline, capsys):
+    _, platforms = cli_pipeline
+    main(["-p", "Twitter", "-d", "fast", "write a post"])
+    assert platforms == ["Twitter"]
+
+
+def test_invalid_platform_is_a_usage_error(cli_pipeline, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(["-p", "Nope", "write a post"])
+    assert exit_info.value.code == 2
+    assert "invalid platform 'Nope'" in capsys.readouterr().err
+
+
+def test_missing_prompt_is_a_usage_error(cli_pipeline):
+    with pytest.raises(SystemExit) as exit_info:
+        main([])
+    assert exit_info.value.code == 2
+
+
+def test_list_platforms(capsys):
+    main(["--list-platforms"])
+    assert "Twitter" in capsys.readouterr().out.split()
+
+
+def write_lines(path, items):
+    path.write_text("".join(json.dumps(item) + "\n" for item in items), encoding="utf-8")
+
+
+def read_results(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_batch_without_platform_uses_item_platforms(cli_pipeline, tmp_path):
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_lines(source, [
+        {"id": "a", "input": "first post", "platform": "Twitter"},
+        {"id": "b", "input": "second post", "platform": "Nope"},
+        {"id": "c", "input": "third post"}
+    ])
+    with pytest.raises(SystemExit) as exit_info:
+        main(["--batch", str(source), "--output", str(output)])
+    assert exit_info.value.code == 1
+    results = {result["id"]: result for result in read_results(output)}
+    assert results["a"]["success"] and results["a"]["platform"] == "Twitter"
+    assert not results["b"]["success"] and "Invalid platform" in results["b"]["error"]
+    assert results["c"]["code"] == "MISSING_FIELDS"
+
+
+def test_batch_platform_fills_missing_fields(cli_pipeline, tmp_path):
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_lines(source, [{"input": "one"}, {"input": "two", "platform": "Blog"}])
+    with pytest.raises(SystemExit) as exit_info:
+        main(["--batch", str(source), "--output", str(output), "--platform", "Email", "--ordered"])
+    assert exit_info.value.code == 0
+    assert [result["platform"] for result in read_results(output)] == ["Email", "Blog"]
+
+
+def test_resume_retries_failed_items_only(cli_pipeline, tmp_path):
+    source, output = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    write_lines(source, [
+        {"id": "ok", "input": "first", "platform": "Blog"},
+        {"id": "failed", "input": "second", "platform": "Blog"}
+    ])
+    write_lines(output, [
+        {"id": "ok", "success": True, "prompt": "done"},
+        {"id": "failed", "success": False, "error": "upstream failure"}
+    ])
+    with pytest.raises(SystemExit) as exit_info:
+        main(["--batch", str(source), "--output", str(output), "--resume"])
+    assert exit_info.value.code == 0
+    results = read_results(output)
+    assert [result["id"] for result in results] == ["ok", "failed", "failed"]
+    assert results[-1]["success"]
+
+
+def test_finished_ids_ignores_failures_and_truncated_lines(tmp_path):
+    output = tmp_path / "out.jsonl"
+    output.write_text('{"id": 1, "success": true}\n{"id": 2, "success": false}\n{"id": 3, "succ',
+                      encoding="utf-8")
+    assert finished_ids(str(output)) == {1}
+
+
+def test_read_items_numbers_lines_and_skips_done_ids(capsys):
+    lines = ['{"input": "a"}\n', "\n", "not json\n", '{"id": "x", "input": "b"}\n']
+    items = list(read_items(iter(lines), skip_ids={"x"}, defaults={"platform": "Blog"}))
+    assert items == [{"id": 1, "platform": "Blog", "input": "a"}, {"id": 3, "platform": "Blog"}]
+    assert "line 3" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("argv", [["--help"], ["--list-platforms"]])
+def test_light_commands_skip_heavy_imports(argv):
+    script = (
+        "import sys\n"
+        "from prompt_engine.cli.main import main\n"
+        "try:\n"
+        "    main(sys.argv[1:])\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "heavy = [m for m in ('asyncio', 'langchain_core', 'openai', 'httpx') if m in sys.modules]\n"
+        "print('heavy:' + ','.join(heavy))\n"
+    )
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    completed = subprocess.run([sys.executable, "-c", script, *argv], env=env, capture_output=True, text=True,
+                               check=True)
+    assert completed.stdout.splitlines()[-1] == "heavy:"
@@ -0,0 +1,36 @@
+"""
+Tests for the compact inter-stage context
+"""
+
+from conftest import FakeLLM
+
+from prompt_engine.core.context_analyzer import ContextAnalyzer
+from prompt_engine.core.context_compactor import ANALYSIS_FIELDS, CompactContext, render_context
+
+ANALYSIS = {
+    "Domain": "writing",
+    "Complexity": "beginner",
+    "Requirements": "short, friendly",
+    "Output Format": "",
+    "Key Concepts": "AI, launch"
+}
+
+
+def test_rendered_context_parses_back_to_the_same_analysis():
+    text = render_context(ANALYSIS, ANALYSIS_FIELDS)
+    assert ContextAnalyzer(FakeLLM()).parse_output(text) == ANALYSIS
+
+
+def test_render_keeps_requested_fields_in_canonical_order_and_records_savings():
+    context = CompactContext({**ANALYSIS, "Notes": "model chatter", "platform": "Blog",
+                              "platform_context": {"tone": "warm", "character_limit": 280, "unused": "x"}})
+    text = render_context(context, ("platform_context", "Key Concepts", "domain", "platform"), stage="generate")
+    assert text == "Platform Guidelines: tone=warm; limit=280\nKey Concepts: AI, launch\nDomain: writing\nPlatform: Blog"
+    assert context.savings["generate"] > 0
+
+
+def test_updates_invalidate_rendered_text():
+    context = CompactContext(ANALYSIS)
+    assert render_context(context, ("Domain",)) == "Domain: writing"
+    context["Domain"] = "marketing"
+    assert render_context(context, ("Domain",)) == "Domain: marketing"
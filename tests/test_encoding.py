@@ -0,0 +1,104 @@
+"""
+Tests for field projection and response compression
+"""
+
+import asyncio
+import gzip
+import json
+
+import pytest
+
+from prompt_engine.api import create_app, encoding
+from prompt_engine.api.asgi import create_asgi_app
+from prompt_engine.api.encoding import negotiate, parse_fields, project
+
+PAYLOAD = {"input": "write a post", "platform": "Blog", "depth": "fast"}
+
+
+async def asgi_request(app, path, payload, headers=()):
+    """POST a JSON body to an ASGI app and return (status, headers, raw body)."""
+    messages = [{"type": "http.request", "body": json.dumps(payload).encode("utf-8"), "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": path, "query_string": b"",
+             "headers": [(name.encode("ascii"), value.encode("ascii")) for name, value in headers]}
+    await app(scope, receive, send)
+    response_headers = {name.decode("ascii").lower(): value.decode("ascii") for name, value in sent[0]["headers"]}
+    return sent[0]["status"], response_headers, b"".join(message.get("body", b"") for message in sent[1:])
+
+
+def test_projection_keeps_success_and_returns_errors_whole():
+    result = {"success": True, "prompt": "p", "intent": "i", "metadata": {}}
+    assert project(result, parse_fields("prompt, intent,prompt")) == {"success": True, "prompt": "p", "intent": "i"}
+    assert project(result, None) is result
+    failure = {"success": False, "error": "boom", "runId": "r"}
+    assert project(failure, ("prompt",)) is failure
+    with pytest.raises(ValueError, match="Unknown field"):
+        parse_fields(["prompt", "nope"])
+    with pytest.raises(ValueError, match="non-empty"):
+        parse_fields([])
+
+
+@pytest.mark.parametrize("zstd,header,expected", [
+    (True, "gzip, zstd", "zstd"),
+    (True, "gzip;q=1.0, zstd;q=0.5", "gzip"),
+    (True, "zstd;q=0, gzip;q=0.1", "gzip"),
+    (True, "*", "zstd"),
+    (False, "gzip, zstd", "gzip"),
+    (False, "zstd", None),
+    (False, "identity", None),
+    (False, "gzip;q=0", None),
+])
+def test_negotiation_prefers_the_higher_weighted_supported_encoding(monkeypatch, zstd, header, expected):
+    monkeypatch.setattr(encoding, "_ZSTD", zstd)
+    assert negotiate(header) == expected
+
+
+def test_flask_projects_and_gzips_the_response(make_pipeline):
+    pipeline, _ = make_pipeline(RESPONSE_COMPRESSION_MIN_BYTES="0")
+    client = create_app(pipeline, warmup=False).test_client()
+    response = client.post("/generate-full?fields=prompt", json=PAYLOAD, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert set(json.loads(gzip.decompress(response.get_data()))) == {"success", "prompt"}
+
+    plain = client.post("/generate-full", json={**PAYLOAD, "fields": ["intent"]})
+    assert "Content-Encoding" not in plain.headers
+    assert set(plain.get_json()) == {"success", "intent"}
+
+
+def test_asgi_projects_and_gzips_the_response(make_pipeline):
+    pipeline, _ = make_pipeline(RESPONSE_COMPRESSION_MIN_BYTES="0")
+    status, headers, body = asyncio.run(asgi_request(
+        create_asgi_app(pipeline), "/generate-full", {**PAYLOAD, "fields": ["prompt"]}, [("accept-encoding", "gzip")]
+    ))
+    assert status == 200
+    assert headers["content-encoding"] == "gzip"
+    assert set(json.loads(gzip.decompress(body))) == {"success", "prompt"}
+
+
+def test_small_responses_are_sent_uncompressed(make_pipeline):
+    pipeline, _ = make_pipeline(RESPONSE_COMPRESSION_MIN_BYTES="100000")
+    response = create_app(pipeline, warmup=False).test_client().post(
+        "/generate-full", json=PAYLOAD, headers={"Accept-Encoding": "gzip"}
+    )
+    assert "Content-Encoding" not in response.headers
+    assert response.get_json()["success"]
+
+
+def test_zstd_is_used_when_installed(make_pipeline):
+    zstandard = pytest.importorskip("zstandard")
+    pipeline, _ = make_pipeline(RESPONSE_COMPRESSION_MIN_BYTES="0")
+    response = create_app(pipeline, warmup=False).test_client().post(
+        "/generate-full?fields=prompt", json=PAYLOAD, headers={"Accept-Encoding": "gzip, zstd"}
+    )
+    assert response.headers["Content-Encoding"] == "zstd"
+    body = zstandard.ZstdDecompressor().decompress(response.get_data())
+    assert set(json.loads(body)) == {"success", "prompt"}
@@ -0,0 +1,126 @@
+"""
+Tests for the stage graph executor
+"""
+
+import asyncio
+
+import pytest
+
+from prompt_engine.core.graph import ComputeNode, StageGraph
+
+
+def delayed(seconds, **outputs):
+    """Node function returning ``outputs`` after ``seconds``."""
+
+    async def run(**inputs):
+        await asyncio.sleep(seconds)
+        return outputs
+
+    return run
+
+
+def collect(graph, values):
+    async def run():
+        return [event async for event in graph.astream(values)]
+
+    return asyncio.run(run())
+
+
+def diamond(left_delay=0.0, right_delay=0.0):
+    """start -> (left, right) -> join"""
+    return StageGraph([
+        ComputeNode("start", ["seed"], ["a"], delayed(0, a=1)),
+        ComputeNode("left", ["a"], ["b"], delayed(left_delay, b=2)),
+        ComputeNode("right", ["a"], ["c"], delayed(right_delay, c=3)),
+        ComputeNode("join", ["b", "c"], ["d"], lambda b, c: {"d": b + c})
+    ], inputs=["seed"])
+
+
+def test_nodes_run_after_their_inputs_and_independent_nodes_overlap():
+    values = {"seed": 0}
+    events = collect(diamond(left_delay=0.05, right_delay=0.01), values)
+    order = [(event["event"], event["stage"]) for event in events]
+    assert order.index(("stage_end", "start")) < order.index(("stage_start", "left"))
+    # right starts before left ends, and finishes first
+    assert order.index(("stage_start", "right")) < order.index(("stage_end", "left"))
+    assert order.index(("stage_end", "right")) < order.index(("stage_end", "left"))
+    assert order[-1] == ("stage_end", "join")
+    assert values["d"] == 5
+
+
+def test_nodes_with_existing_outputs_are_skipped():
+    values = {"seed": 0, "a": 1, "b": 10}
+    events = collect(diamond(), values)
+    assert {event["stage"] for event in events} == {"right", "join"}
+    assert values["d"] == 13
+
+
+def test_failure_cancels_running_nodes():
+    cancelled = asyncio.Event()
+
+    async def slow(a):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return {"c": 3}
+
+    def fail(a):
+        raise RuntimeError("node failed")
+
+    graph = StageGraph([
+        ComputeNode("start", ["seed"], ["a"], delayed(0, a=1)),
+        ComputeNode("bad", ["a"], ["b"], fail),
+        ComputeNode("slow", ["a"], ["c"], slow)
+    ], inputs=["seed"])
+
+    async def run():
+        with pytest.raises(RuntimeError, match="node failed"):
+            async for _ in graph.astream({"seed": 0}):
+                pass
+        await asyncio.sleep(0)
+        return cancelled.is_set()
+
+    assert asyncio.run(run())
+
+
+def test_invalid_graphs_are_rejected():
+    with pytest.raises(ValueError, match="unresolved values: missing"):
+        StageGraph([ComputeNode("a", ["missing"], ["x"], dict)])
+    with pytest.raises(ValueError, match="produced more than once"):
+        StageGraph([ComputeNode("a", [], ["x"], dict), ComputeNode("b", [], ["x"], dict)])
+
+
+def test_without_aliases_the_dropped_outputs():
+    graph = diamond().without("left", {"b": "a"})
+    assert "left" not in graph.nodes
+    values = {"seed": 0}
+    collect(graph, values)
+    assert graph.value(values, "b") == 1
+    assert values["d"] == 4
+    with pytest.raises(ValueError, match="needs aliases"):
+        diamond().without("left", {})
+
+
+def test_independent_of_keeps_only_nodes_not_reading_the_value():
+    graph = StageGraph([
+        ComputeNode("analyze", ["text"], ["analysis"], dict),
+        ComputeNode("template", ["platform"], ["template"], dict),
+        ComputeNode("generate", ["analysis", "template"], ["prompt"], dict),
+        ComputeNode("summary", ["analysis"], ["summary"], dict)
+    ], inputs=["text", "platform"])
+    shared = graph.independent_of("platform")
+    assert set(shared.nodes) == {"analyze", "summary"}
+    assert shared.inputs == ("text",)
+
+
+def test_pipeline_starts_independent_nodes_together(make_pipeline):
+    pipeline, _ = make_pipeline()
+    events = [event for event in pipeline.stream_events("write a post", "Blog", "full") if event["event"] != "token"]
+    order = [(event["event"], event.get("stage")) for event in events]
+    assert order[:2] == [("stage_start", "platform"), ("stage_start", "context")]
+    ended = [stage for event, stage in order if event == "stage_end"]
+    assert ended.index("context") < ended.index("intent") < ended.index("generate")
+    assert set(ended) == set(pipeline.graph_for("full", "Blog").nodes)
+    assert order[-1] == ("final", None)
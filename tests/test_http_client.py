@@ -0,0 +1,44 @@
+"""
+Tests for the shared upstream connection pool
+"""
+
+import pytest
+
+from prompt_engine.config import Settings
+from prompt_engine.core.pipeline import PromptPipeline
+
+STAGES = ("context_analyzer", "interpreter", "generator", "enhancer", "refiner",
+          "insight_extractor", "polisher", "composer")
+
+
+def test_pool_limits_come_from_the_settings(monkeypatch):
+    monkeypatch.setenv("LLM_MAX_CONNECTIONS", "50")
+    monkeypatch.setenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "5")
+    monkeypatch.setenv("LLM_KEEPALIVE_EXPIRY_SECONDS", "12")
+    monkeypatch.setenv("LLM_HTTP2", "false")
+    pool = PromptPipeline(settings=Settings()).connection_pool
+    assert not pool.http2
+    for client in (pool.client, pool.async_client):
+        connections = client._transport._pool
+        assert connections._max_connections == 50
+        assert connections._max_keepalive_connections == 5
+        assert connections._keepalive_expiry == 12
+    pool.close()
+
+
+def test_every_stage_shares_the_pooled_clients(monkeypatch):
+    monkeypatch.setenv("FAST_MODEL_NAME", "gpt-4o-mini")
+    pipeline = PromptPipeline(settings=Settings())
+    pool = pipeline.connection_pool
+    assert len({id(getattr(pipeline, stage).llm) for stage in STAGES}) > 1  # several model configurations
+    for stage in STAGES:
+        llm = getattr(pipeline, stage).llm
+        assert llm.http_client is pool.client
+        assert llm.http_async_client is pool.async_client
+    pool.close()
+
+
+def test_invalid_pool_limits_are_rejected(monkeypatch):
+    monkeypatch.setenv("LLM_MAX_CONNECTIONS", "0")
+    with pytest.raises(ValueError, match="LLM_MAX_CONNECTIONS"):
+        Settings().validate()
@@ -0,0 +1,120 @@
+"""
+Tests for the job manager and its shared store
+"""
+
+import asyncio
+
+from conftest import FakeLLM
+from prompt_engine.config import Settings
+from prompt_engine.core.jobs import JobManager
+from prompt_engine.core.pipeline import PromptPipeline
+
+
+def test_job_runs_and_reports_progress(make_pipeline):
+    pipeline, _ = make_pipeline()
+    jobs = JobManager(pipeline, workers=1)
+    try:
+        job = jobs.submit("write a post", "Blog", "fast")
+        job = jobs.wait(job.id, timeout=10)
+        assert job.status == "succeeded"
+        assert job.to_dict()["progress"]["completedStages"] == job.stages
+        assert job.result["prompt"]
+    finally:
+        jobs.shutdown()
+
+
+def test_jobs_are_visible_to_other_managers_sharing_the_store(make_pipeline, tmp_path):
+    pipeline, _ = make_pipeline(delay=0.05)
+    path = str(tmp_path / "jobs.sqlite")
+    first = JobManager(pipeline, workers=1, path=path)
+    second = JobManager(pipeline, workers=1, path=path, poll_interval=0.01)
+    try:
+        job = first.submit("write a post", "Blog", "fast")
+        assert second.get(job.id) is not None
+        polled = second.wait(job.id, timeout=10)
+        assert polled.status == "succeeded"
+        assert polled.result == first.get(job.id).result
+        assert second.get("unknown") is None
+    finally:
+        first.shutdown()
+        second.shutdown()
+
+
+def test_bounded_shutdown_fails_unfinished_jobs(make_pipeline, tmp_path):
+    pipeline, _ = make_pipeline(delay=0.5)
+    jobs = JobManager(pipeline, workers=1, path=str(tmp_path / "jobs.sqlite"))
+    running = jobs.submit("first post", "Blog", "fast")
+    queued = jobs.submit("second post", "Blog", "fast")
+    jobs.shutdown(wait=True, timeout=0.1)
+    for job in (running, queued):
+        assert job.status == "failed"
+        assert job.result["code"] == "SHUTDOWN"
+    assert "before the job started" in queued.result["error"]
+    assert jobs.store.load(running.id)["status"] == "failed"
+    assert jobs.stats()["queued"] == 0
+
+
+def test_failed_job_result_carries_its_run_id(make_pipeline):
+    pipeline, llm = make_pipeline(RETRY_MAX_ATTEMPTS="1")
+    llm.fail_on = "expert prompt refiner"
+    jobs = JobManager(pipeline, workers=1)
+    try:
+        job = jobs.wait(jobs.submit("write a post", "Blog", "full").id, timeout=10)
+        assert job.status == "failed"
+        assert job.result["runId"] == job.to_dict()["runId"] == job.run_id
+        assert job.result["lastCompletedStage"] == "enhance"
+
+        llm.fail_on = None
+        resumed = pipeline.run("write a post", "Blog", "full", run_id=job.result["runId"])
+        assert resumed["metadata"]["resumedStages"]
+    finally:
+        jobs.shutdown()
+
+
+class LoopRecordingLLM(FakeLLM):
+    """Records the event loop each call runs on."""
+
+    loops: list = []
+
+    async def _acall(self, prompt, stop=None, run_manager=None, **kwargs):
+        self.loops.append(asyncio.get_running_loop())
+        return await super()._acall(prompt, stop, run_manager, **kwargs)
+
+
+def test_async_jobs_run_on_the_callers_loop(monkeypatch):
+    llm = LoopRecordingLLM(delay=0.01, loops=[])
+    jobs = JobManager(PromptPipeline(settings=Settings(), llm=llm), workers=1)
+
+    async def run():
+        job = await jobs.asubmit("write a post", "Blog", "fast")
+        queued = await jobs.asubmit("another post", "Blog", "fast")
+        assert jobs.stats()["queued"] + jobs.stats()["running"] == 2
+        while not (job.done.is_set() and queued.done.is_set()):
+            await asyncio.sleep(0.01)
+        return asyncio.get_running_loop(), job, queued
+
+    loop, job, queued = asyncio.run(run())
+    assert job.status == queued.status == "succeeded"
+    assert llm.loops and all(call_loop is loop for call_loop in llm.loops)
+    assert jobs.stats()["queued"] == jobs.stats()["running"] == 0
+    jobs.shutdown()
+
+
+def test_async_shutdown_fails_unfinished_jobs(make_pipeline):
+    pipeline, _ = make_pipeline(delay=0.5)
+    jobs = JobManager(pipeline, workers=1)
+
+    async def run():
+        running = await jobs.asubmit("first post", "Blog", "fast")
+        queued = await jobs.asubmit("second post", "Blog", "fast")
+        await asyncio.sleep(0.05)
+        await jobs.ashutdown(timeout=0.1)
+        return running, queued
+
+    running, queued = asyncio.run(run())
+    for job in (running, queued):
+        assert job.status == "failed"
+        assert job.result["code"] == "SHUTDOWN"
+    assert "before the job started" in queued.result["error"]
+    assert "before the job finished" in running.result["error"]
+    assert jobs.stats()["queued"] == jobs.stats()["running"] == 0
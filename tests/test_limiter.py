@@ -0,0 +1,104 @@
+"""
+Tests for the upstream limiter and the 429 path
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from prompt_engine.api import create_app
+from prompt_engine.core.limiter import AdaptiveLimiter, OverloadedError
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+def test_waiters_are_served_in_order_and_the_queue_is_bounded():
+    limiter = AdaptiveLimiter(rate=0, initial_limit=1, max_limit=1, max_queue=2)
+    started = []
+
+    async def call(n):
+        await limiter.acquire()
+        started.append(n)
+        await asyncio.sleep(0.01)
+        limiter.release(0.01)
+
+    async def run():
+        await limiter.acquire()  # hold the only slot
+        tasks = [asyncio.ensure_future(call(n)) for n in range(2)]
+        await asyncio.sleep(0.01)
+        assert limiter.stats()["queued"] == 2
+        with pytest.raises(OverloadedError) as overloaded:
+            await limiter.acquire()
+        assert overloaded.value.retry_after >= 1
+        limiter.release(0.01)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert started == [0, 1]
+    assert limiter.stats()["rejected"] == 1
+    assert limiter.stats()["inFlight"] == 0
+
+
+def test_upstream_429_shrinks_the_limit():
+    limiter = AdaptiveLimiter(rate=0, initial_limit=8, max_limit=8)
+
+    async def run():
+        await limiter.acquire()
+        limiter.release(0.1, RateLimitError())
+
+    asyncio.run(run())
+    assert limiter.stats()["limit"] == 4
+    assert limiter.stats()["rateLimited"] == 1
+
+
+def test_full_queue_returns_429_with_retry_after(make_pipeline):
+    pipeline, llm = make_pipeline(LIMITER_MAX_QUEUE="0")
+    client = create_app(pipeline, warmup=False).test_client()
+    response = client.post("/generate-full", json={"input": "write a post", "platform": "Blog"})
+    assert response.status_code == 429
+    assert response.get_json()["code"] == "OVERLOADED"
+    assert int(response.headers["Retry-After"]) >= 1
+    assert llm.calls == 0
+
+
+def test_overloaded_stage_call_fails_the_run_as_overloaded(make_pipeline):
+    pipeline, _ = make_pipeline(delay=0.1, LIMITER_INITIAL_CONCURRENCY="1", LIMITER_MAX_CONCURRENCY="1",
+                                LIMITER_MAX_QUEUE="0", COALESCE_ENABLED="false")
+
+    async def run():
+        return await asyncio.gather(*(pipeline.arun(f"post {n}", "Blog", "fast") for n in range(2)))
+
+    results = asyncio.run(run())
+    assert sorted(result["success"] for result in results) == [False, True]
+    failed = next(result for result in results if not result["success"])
+    assert failed["code"] == "OVERLOADED"
+
+
+def test_fast_calls_grow_the_limit_and_slow_calls_shrink_it():
+    limiter = AdaptiveLimiter(rate=0, initial_limit=2, max_limit=4, latency_threshold=1.0)
+
+    async def run(latencies):
+        for latency in latencies:
+            await limiter.acquire()
+            limiter.release(latency)
+
+    asyncio.run(run([0.1] * 4))
+    assert limiter.stats()["limit"] == 3
+    asyncio.run(run([5.0] * 4))
+    assert limiter.stats()["limit"] == 2
+
+
+def test_token_bucket_paces_call_starts():
+    limiter = AdaptiveLimiter(rate=20, burst=1, initial_limit=4)
+
+    async def run():
+        started = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire()
+            limiter.release(0.0)
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) >= 0.09  # the burst token, then two refills at 20 per second
@@ -0,0 +1,47 @@
+"""
+Tests for the record/replay LLM backends
+"""
+
+import asyncio
+import time
+
+import pytest
+from conftest import FakeLLM
+
+from prompt_engine.config import Settings
+from prompt_engine.core.llm import Cassette, CassetteMissError, RecordingLLM, ReplayLLM
+from prompt_engine.core.pipeline import PromptPipeline
+
+
+def test_replay_reproduces_a_recorded_run_offline(tmp_path):
+    path = str(tmp_path / "cassette.jsonl")
+    recorded = PromptPipeline(settings=Settings(), llm=RecordingLLM(llm=FakeLLM(), cassette=Cassette(path)))
+    first = recorded.run("write a post", "Blog", "full")
+    assert first["success"]
+    assert len(Cassette(path)) == 5
+
+    replayed = PromptPipeline(settings=Settings(), llm=ReplayLLM(cassette=Cassette(path), ttft_ms=0))
+    second = replayed.run("write a post", "Blog", "full")
+    assert second["success"]
+    assert second["prompt"] == first["prompt"]
+
+    missing = replayed.run("a different request", "Blog", "full")
+    assert not missing["success"]
+
+
+def test_replay_injects_latency_and_streams_in_chunks(tmp_path):
+    cassette = Cassette(str(tmp_path / "cassette.jsonl"))
+    cassette.record("hello", "one two three four five six", ttft_ms=5, duration_ms=10)
+    llm = ReplayLLM(cassette=cassette, ttft_ms=100, tokens_per_second=1000)
+
+    async def run():
+        started = time.perf_counter()
+        chunks = [chunk async for chunk in llm.astream("hello")]
+        return chunks, time.perf_counter() - started
+
+    chunks, elapsed = asyncio.run(run())
+    assert "".join(chunks) == "one two three four five six"
+    assert len(chunks) > 1
+    assert elapsed >= 0.1
+    with pytest.raises(CassetteMissError):
+        llm.invoke("never recorded")
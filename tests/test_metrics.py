@@ -0,0 +1,51 @@
+"""
+Tests for metrics shared between worker processes
+"""
+
+import json
+import os
+
+from prompt_engine.core.metrics import MetricsRegistry, SharedMetrics
+
+
+def make_registry():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ["route"])
+    latency = registry.histogram("latency_seconds", "Latency", ["route"], buckets=(0.5, 1.0))
+    in_flight = registry.gauge("in_flight", "Requests in flight")
+    return registry, requests, latency, in_flight
+
+
+def test_render_adds_other_snapshots():
+    registry, requests, latency, in_flight = make_registry()
+    other, other_requests, other_latency, other_in_flight = make_registry()
+    for counter, histogram, gauge in ((requests, latency, in_flight), (other_requests, other_latency, other_in_flight)):
+        counter.inc(route="/generate")
+        histogram.observe(0.3, route="/generate")
+        gauge.inc()
+    other_requests.inc(route="/health")
+
+    text = registry.render([json.loads(json.dumps(other.snapshot()))])
+    assert 'requests_total{route="/generate"} 2' in text
+    assert 'requests_total{route="/health"} 1' in text
+    assert 'latency_seconds_count{route="/generate"} 2' in text
+    assert 'latency_seconds_sum{route="/generate"} 0.6' in text
+    assert "in_flight 2" in text
+
+
+def test_dead_workers_keep_counters_but_not_gauges(tmp_path):
+    directory = str(tmp_path)
+    registry, requests, _, in_flight = make_registry()
+    shared = SharedMetrics(directory, registry)
+    requests.inc(route="/generate")
+    in_flight.inc()
+    with open(os.path.join(directory, "1.json"), "w", encoding="utf-8") as f:
+        json.dump(registry.snapshot(), f)  # an exited worker with the same values
+    SharedMetrics.mark_dead(directory, 1)
+
+    text = shared.render()
+    assert 'requests_total{route="/generate"} 2' in text
+    assert "in_flight 1" in text
+    assert os.path.exists(os.path.join(directory, f"{os.getpid()}.json"))
+    SharedMetrics.reset(directory)
+    assert not os.listdir(directory)
@@ -0,0 +1,48 @@
+"""
+Tests for multi-platform fan-out
+"""
+
+import json
+
+from prompt_engine.api import create_app
+
+
+def test_platform_independent_stages_run_once(make_pipeline):
+    pipeline, llm = make_pipeline()
+    response = pipeline.run_multi("write a post", ["Twitter", "LinkedIn", "Email"], "full")
+    assert response["succeeded"] == 3 and response["failed"] == 0
+    assert llm.calls == 1 + 3 * 4  # context once, then intent..refine per platform
+    for platform, result in response["results"].items():
+        assert result["platform"] == platform
+        assert result["metadata"]["sharedStages"] == ["context"]
+
+
+def test_one_failing_platform_does_not_affect_the_others(make_pipeline):
+    pipeline, llm = make_pipeline(RETRY_MAX_ATTEMPTS="1")
+    llm.fail_on = "LinkedIn post"
+    response = pipeline.run_multi("write a post", ["Twitter", "LinkedIn"], "fast")
+    assert response["succeeded"] == 1 and response["failed"] == 1
+    assert response["results"]["Twitter"]["success"]
+    assert not response["results"]["LinkedIn"]["success"]
+
+
+def test_unknown_platform_fails_alone(make_pipeline):
+    pipeline, _ = make_pipeline()
+    response = pipeline.run_multi("write a post", ["Blog", "Nope"], "fast")
+    assert response["results"]["Blog"]["success"]
+    assert "Invalid platform" in response["results"]["Nope"]["error"]
+
+
+def test_streamed_endpoint_yields_one_projected_result_per_platform(make_pipeline):
+    pipeline, _ = make_pipeline()
+    client = create_app(pipeline, warmup=False).test_client()
+    response = client.post("/generate-multi", json={
+        "input": "write a post", "platforms": ["Twitter", "Blog"], "depth": "fast",
+        "stream": True, "fields": "success,prompt"
+    })
+    assert response.mimetype == "application/x-ndjson"
+    results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert sorted(result["platform"] for result in results) == ["Blog", "Twitter"]
+    for result in results:
+        assert set(result) == {"success", "prompt", "platform"}
+        assert result["success"] and result["prompt"]
@@ -0,0 +1,34 @@
+"""
+Tests for the platform registry
+"""
+
+SKIPPING_PLATFORMS = '''
+default = "Short"
+
+[platforms.Short]
+slug = "short"
+template = "Write a short post about {user_input}."
+skip_stages = { enhance = { enhanced_prompt = "base_prompt" } }
+
+[platforms.Short.context]
+character_limit = 280
+'''
+
+
+def test_bundled_platforms_run_every_stage(make_pipeline):
+    pipeline, llm = make_pipeline()
+    result = pipeline.run("write a post", "Twitter", "full")
+    assert llm.calls == 5
+    assert result["enhancedPrompt"] != result["basePrompt"]
+
+
+def test_skip_stages_drops_the_stage(make_pipeline, tmp_path):
+    path = tmp_path / "platforms.toml"
+    path.write_text(SKIPPING_PLATFORMS, encoding="utf-8")
+    pipeline, llm = make_pipeline(PLATFORMS_PATH=str(path))
+    assert pipeline.platforms.names() == ["Short"]
+    result = pipeline.run("write a post", "Short", "full")
+    assert result["success"]
+    assert llm.calls == 4
+    assert "enhance" not in result["metadata"]["stages"]
+    assert result["enhancedPrompt"] == result["basePrompt"]
@@ -0,0 +1,46 @@
+"""
+Tests for per-stage model routing
+"""
+
+from prompt_engine.config import Settings
+from prompt_engine.core.pipeline import PromptPipeline
+
+
+def build(monkeypatch, **env):
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return PromptPipeline(settings=Settings())
+
+
+def test_fast_stages_use_the_fast_model_and_overrides_win(monkeypatch):
+    pipeline = build(monkeypatch, MODEL_NAME="gpt-4o", FAST_MODEL_NAME="gpt-4o-mini",
+                     STAGE_REFINE_MODEL="gpt-4.1", STAGE_GENERATE_TEMPERATURE="0.9",
+                     STAGE_CONTEXT_MAX_TOKENS="128")
+    models = {stage.NAME: stage.llm.model_name for stage in (
+        pipeline.context_analyzer, pipeline.interpreter, pipeline.generator, pipeline.enhancer, pipeline.refiner,
+        pipeline.insight_extractor, pipeline.polisher, pipeline.composer
+    )}
+    assert models == {
+        "context": "gpt-4o-mini", "intent": "gpt-4o-mini", "insight": "gpt-4o-mini", "refine": "gpt-4.1",
+        "generate": "gpt-4o", "enhance": "gpt-4o", "polish": "gpt-4o", "compose": "gpt-4o"
+    }
+    assert pipeline.generator.llm.temperature == 0.9
+    assert pipeline.context_analyzer.llm.max_tokens == 128
+    assert pipeline.context_analyzer.llm.temperature == 0.0  # STAGE_DEFAULTS
+    pipeline.connection_pool.close()
+
+
+def test_stages_with_the_same_configuration_share_an_llm(monkeypatch):
+    pipeline = build(monkeypatch, MODEL_NAME="gpt-4o")
+    assert pipeline.refiner.llm is pipeline.polisher.llm is pipeline.composer.llm
+    assert pipeline.refiner.llm is not pipeline.generator.llm  # different max_tokens
+    pipeline.connection_pool.close()
+
+
+def test_routed_model_is_part_of_the_cache_key(monkeypatch):
+    inputs = {"user_input": "write a post"}
+    default = build(monkeypatch, MODEL_NAME="gpt-4o", CACHE_ENABLED="true", CACHE_PATH="")
+    routed = build(monkeypatch, FAST_MODEL_NAME="gpt-4o-mini")
+    assert default.context_analyzer._cache_key(inputs) != routed.context_analyzer._cache_key(inputs)
+    default.connection_pool.close()
+    routed.connection_pool.close()
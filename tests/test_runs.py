@@ -0,0 +1,137 @@
+"""
+Tests for resumable Server-Sent Events runs
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from prompt_engine.api import create_app
+from prompt_engine.api.asgi import create_asgi_app
+from prompt_engine.core.runs import RunInProgressError, RunRegistry
+
+
+async def numbered_events(count, gate=None):
+    for index in range(count):
+        yield {"event": "token", "text": str(index)}
+    if gate is not None:
+        await gate.wait()
+
+
+async def collect(registry, run_id, after=None):
+    return [numbered async for numbered in registry.subscribe(run_id, after)]
+
+
+async def finish(registry, run_id):
+    while not registry.get(run_id).done:
+        await asyncio.sleep(0)
+
+
+def parse_messages(body):
+    """Split an SSE body into (id, event) pairs."""
+    messages = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        messages.append((fields["id"], fields["event"]))
+    return messages
+
+
+def test_resume_replays_only_events_after_the_last_seen_one():
+    async def scenario():
+        registry = RunRegistry()
+        await registry.astart(numbered_events(5), "run")
+        await finish(registry, "run")
+        return await collect(registry, "run", after=2)
+
+    assert asyncio.run(scenario()) == [(3, {"event": "token", "text": "3"}), (4, {"event": "token", "text": "4"})]
+
+
+def test_resume_past_the_buffer_reports_the_gap():
+    async def scenario():
+        registry = RunRegistry(buffer_size=3)
+        await registry.astart(numbered_events(10), "run")
+        await finish(registry, "run")
+        return await collect(registry, "run", after=1)
+
+    events = asyncio.run(scenario())
+    assert events[0] == (6, {"event": "gap", "from": 2, "to": 6})
+    assert [seq for seq, _ in events[1:]] == [7, 8, 9]
+
+
+def test_live_run_id_cannot_be_reused_until_it_finishes():
+    async def scenario():
+        registry = RunRegistry()
+        gate = asyncio.Event()
+        await registry.astart(numbered_events(1, gate), "run")
+        with pytest.raises(RunInProgressError):
+            await registry.astart(numbered_events(2), "run")
+        gate.set()
+        await finish(registry, "run")
+        await registry.astart(numbered_events(2), "run")
+        return await collect(registry, "run")
+
+    assert [seq for seq, _ in asyncio.run(scenario())] == [0, 1]
+
+
+def test_flask_sse_resumes_after_last_event_id(make_pipeline):
+    pipeline, _ = make_pipeline()
+    client = create_app(pipeline, warmup=False).test_client()
+    payload = {"input": "write a post", "platform": "Blog", "depth": "fast", "stream": "sse", "runId": "sse-run"}
+
+    response = client.post('/generate', json=payload)
+    assert response.headers["X-Run-Id"] == "sse-run"
+    messages = parse_messages(response.get_data(as_text=True))
+    assert messages[-1][1] == "final"
+    assert [message_id for message_id, _ in messages] == [f"sse-run:{seq}" for seq in range(len(messages))]
+
+    resumed = client.get('/runs/sse-run/events', headers={"Last-Event-ID": "sse-run:2"})
+    assert parse_messages(resumed.get_data(as_text=True)) == messages[3:]
+
+    missing = client.get('/runs/other/events')
+    assert missing.status_code == 404
+    assert missing.get_json()["code"] == "RUN_NOT_FOUND"
+
+
+def test_flask_rejects_a_second_sse_run_with_a_live_run_id(make_pipeline):
+    pipeline, _ = make_pipeline(delay=0.5)
+    client = create_app(pipeline, warmup=False).test_client()
+    payload = {"input": "write a post", "platform": "Blog", "depth": "fast", "stream": "sse", "runId": "busy"}
+
+    first = client.post('/generate', json=payload, buffered=False)
+    second = client.post('/generate', json=payload)
+    assert second.status_code == 409
+    assert second.get_json()["code"] == "RUN_IN_PROGRESS"
+    first.close()
+
+
+def test_asgi_rejects_a_second_sse_run_with_a_live_run_id(make_pipeline):
+    pipeline, _ = make_pipeline(delay=0.2)
+    app = create_asgi_app(pipeline)
+    payload = json.dumps({"input": "write a post", "platform": "Blog", "depth": "fast",
+                          "stream": "sse", "runId": "busy"}).encode("utf-8")
+
+    async def request():
+        messages = [{"type": "http.request", "body": payload, "more_body": False}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {"type": "http", "method": "POST", "path": "/generate", "query_string": b"", "headers": []}
+        await app(scope, receive, send)
+        return sent[0]["status"], b"".join(message.get("body", b"") for message in sent[1:])
+
+    async def scenario():
+        first = asyncio.ensure_future(request())
+        await asyncio.sleep(0.05)
+        second = await request()
+        return await first, second
+
+    (first_status, first_body), (second_status, second_body) = asyncio.run(scenario())
+    assert first_status == 200 and b"event: final" in first_body
+    assert second_status == 409
+    assert json.loads(second_body)["code"] == "RUN_IN_PROGRESS"
@@ -0,0 +1,37 @@
+"""
+Tests for near-duplicate input lookup
+"""
+
+from prompt_engine.core.similarity import MinHashIndex, normalize_input
+
+
+def test_normalization_ignores_case_punctuation_and_spacing():
+    assert normalize_input("Write a LinkedIn post   about AI!") == normalize_input("write a linkedin post about AI")
+
+
+def test_near_duplicates_match_and_different_inputs_do_not():
+    index = MinHashIndex(threshold=0.8)
+    index.add("Write a LinkedIn post announcing our new AI-powered analytics dashboard for retail teams", "stored")
+    assert index.lookup("write a linkedin post announcing our new AI powered analytics dashboard for retail teams!") == "stored"
+    assert index.lookup("Write a LinkedIn post announcing our new AI-powered analytics dashboard for retail stores") == "stored"
+    assert index.lookup("Draft a cold email to a supplier about delayed shipments") is None
+    assert index.stats()["matches"] == 2
+
+
+def test_least_recently_used_entries_are_evicted():
+    index = MinHashIndex(max_entries=2)
+    index.add("first input about gardening tools", 1)
+    index.add("second input about kitchen knives", 2)
+    assert index.lookup("first input about gardening tools") == 1  # now most recently used
+    index.add("third input about mountain bikes", 3)
+    assert index.lookup("second input about kitchen knives") is None
+    assert index.lookup("first input about gardening tools") == 1
+    assert index.stats()["entries"] == 2
+
+
+def test_near_duplicate_reuses_the_stored_analysis(make_pipeline):
+    pipeline, llm = make_pipeline()
+    assert pipeline.run("Write a blog post about our product launch", "Blog", "full")["success"]
+    calls = llm.calls
+    assert pipeline.run("write a blog post about our product launch!", "Blog", "full")["success"]
+    assert llm.calls - calls == calls - 1  # every stage except context ran again
@@ -0,0 +1,36 @@
+"""
+Tests for coalescing identical concurrent runs
+"""
+
+import asyncio
+
+
+def run_concurrently(pipeline, *calls):
+    async def gather():
+        return await asyncio.gather(*(pipeline.arun(*args, **kwargs) for args, kwargs in calls))
+
+    return asyncio.run(gather())
+
+
+def test_identical_concurrent_runs_share_one_execution(make_pipeline):
+    pipeline, llm = make_pipeline(delay=0.05)
+    first, second = run_concurrently(
+        pipeline, (("Write a post!", "Blog", "fast"), {}), (("write a post", "Blog", "fast"), {})
+    )
+    assert llm.calls == 2  # one execution of the two fast-profile stages
+    assert first["prompt"] == second["prompt"]
+    assert (first["input"], second["input"]) == ("Write a post!", "write a post")
+
+
+def test_runs_with_a_run_id_are_not_coalesced(make_pipeline):
+    pipeline, llm = make_pipeline(delay=0.05)
+    run_concurrently(
+        pipeline, (("write a post", "Blog", "fast"), {}), (("write a post", "Blog", "fast"), {"run_id": "retry-1"})
+    )
+    assert llm.calls == 4
+
+
+def test_coalescing_can_be_disabled(make_pipeline):
+    pipeline, llm = make_pipeline(delay=0.05, COALESCE_ENABLED="false")
+    run_concurrently(pipeline, *[(("write a post", "Blog", "fast"), {})] * 2)
+    assert llm.calls == 4
@@ -0,0 +1,67 @@
+"""
+Tests for stage calls: hedging slow calls
+"""
+
+import asyncio
+
+import pytest
+
+from conftest import FakeLLM
+from prompt_engine.core.metrics import STAGE_HEDGES
+from prompt_engine.core.resilience import HedgeBudget
+from prompt_engine.core.stage import PipelineStage
+
+
+class EchoStage(PipelineStage):
+    NAME = "echo"
+    PROMPT_TEMPLATE = "{text}"
+    INPUT_VARIABLES = ["text"]
+
+
+def hedging_stage(llm):
+    """A stage that hedges every call still running after 1ms."""
+    stage = EchoStage(llm, hedge_budget=HedgeBudget(ratio=1.0, quantile=0.5, min_samples=1))
+    stage.latencies.add(0.001)
+    return stage
+
+
+def test_hedge_outcome_when_one_call_succeeds():
+    llm = FakeLLM(delay=0.05)
+    before = STAGE_HEDGES.value(stage="echo", result="lost") + STAGE_HEDGES.value(stage="echo", result="won")
+    assert asyncio.run(hedging_stage(llm)._hedged_ainvoke({"text": "hello"})) == "OUT(hello)"
+    after = STAGE_HEDGES.value(stage="echo", result="lost") + STAGE_HEDGES.value(stage="echo", result="won")
+    assert after == before + 1
+
+
+def test_hedge_outcome_when_both_calls_fail():
+    llm = FakeLLM(delay=0.05, fail_on="boom")
+    failed, lost = STAGE_HEDGES.value(stage="echo", result="failed"), STAGE_HEDGES.value(stage="echo", result="lost")
+    with pytest.raises(RuntimeError):
+        asyncio.run(hedging_stage(llm)._hedged_ainvoke({"text": "boom"}))
+    assert llm.calls == 2
+    assert STAGE_HEDGES.value(stage="echo", result="failed") == failed + 1
+    assert STAGE_HEDGES.value(stage="echo", result="lost") == lost
+
+
+class SlowFirstLLM(FakeLLM):
+    """The first call takes ``first_delay`` seconds, later calls ``delay``."""
+
+    first_delay: float = 0.3
+
+    async def _acall(self, prompt, stop=None, run_manager=None, **kwargs):
+        delay = self.first_delay if self.calls == 0 else self.delay
+        self.calls += 1
+        await asyncio.sleep(delay)
+        return "OUT(" + prompt + ")"
+
+
+def test_slow_primary_that_loses_still_counts_toward_the_threshold():
+    stage = EchoStage(SlowFirstLLM(delay=0.01), hedge_budget=HedgeBudget(ratio=1.0, quantile=0.5, min_samples=1))
+    stage.latencies.add(0.05)
+    threshold = stage.hedge_budget.threshold(stage.latencies)
+    won = STAGE_HEDGES.value(stage="echo", result="won")
+
+    assert asyncio.run(stage._hedged_ainvoke({"text": "hello"})) == "OUT(hello)"
+    assert STAGE_HEDGES.value(stage="echo", result="won") == won + 1
+    assert len(stage.latencies) == 3  # the hedge, and the cancelled primary's time so far
+    assert stage.hedge_budget.threshold(stage.latencies) >= threshold
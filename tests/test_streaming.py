@@ -0,0 +1,26 @@
+"""
+Tests for token-level streaming out of the pipeline stages
+"""
+
+
+def test_every_llm_stage_streams_tokens_that_add_up_to_its_output(make_pipeline):
+    pipeline, _ = make_pipeline()
+    events = list(pipeline.stream_events("write a post", "Blog", "full"))
+    tokens = {}
+    for event in events:
+        if event["event"] == "token":
+            tokens.setdefault(event["stage"], []).append(event["text"])
+    assert set(tokens) == {"context", "intent", "generate", "enhance", "refine"}
+    assert all(len(chunks) > 1 for chunks in tokens.values())
+    assert events[-1]["event"] == "final"
+    assert "".join(tokens["refine"]) == events[-1]["result"]["prompt"]
+
+
+def test_text_stream_forwards_the_final_prompt_token_by_token(make_pipeline):
+    pipeline, _ = make_pipeline()
+    chunks = list(pipeline.stream("write a post", "Blog", "fast"))
+    header = "\n=== Enhanced Prompt for Blog ===\n\n"
+    assert header in chunks
+    prompt_chunks = chunks[chunks.index(header) + 1:]
+    assert len(prompt_chunks) > 1
+    assert "".join(prompt_chunks) == pipeline.run("write a post", "Blog", "fast")["prompt"]